@@ -242,6 +242,8 @@ export default function App(){
   const [searchNavIndex, setSearchNavIndex] = useState(0)
   const searchRef = useRef(null)
   const reportedTermsRef = useRef(new Set())
+  const pendingTermsRef = useRef([])
+  const reportTimerRef = useRef(null)
   const [controlsFocused, setControlsFocused] = useState(false)
   const [atTop, setAtTop] = useState(true)
 
@@ -719,22 +721,56 @@ export default function App(){
   const few = !loading && !empty && filtered.length < 3 && search.trim()
   const askHref = search.trim() ? `/ask/?q=${encodeURIComponent(search.trim())}` : '/ask/'
 
-  // Log automático de termos sem resultado (>=3 chars) evitando envio repetido
-  useEffect(()=>{
-    const term = search.trim()
-    if (!term || term.length < 3) return
-    if (!empty) return
-    if (reportedTermsRef.current.has(term.toLowerCase())) return
-    reportedTermsRef.current.add(term.toLowerCase())
-    const controller = new AbortController()
+  // Log automático de termos sem resultado (>=3 chars) evitando envio repetido.
+  // Os termos são acumulados e enviados juntos num único POST ({terms: [...]})
+  // depois de 3s sem digitar.
+  const flushReportedTerms = useCallback((beacon = false) => {
+    clearTimeout(reportTimerRef.current)
+    reportTimerRef.current = null
+    const terms = pendingTermsRef.current
+    if (!terms.length) return
+    pendingTermsRef.current = []
+    terms.forEach(t => reportedTermsRef.current.add(t.toLowerCase()))
+    const body = JSON.stringify({ terms })
+    if (beacon && navigator.sendBeacon) {
+      navigator.sendBeacon('/api/search-log/', new Blob([body], { type: 'application/json' }))
+      return
+    }
     fetch('/api/search-log/', {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({ term, results_count: 0 }),
-      signal: controller.signal
+      body,
+      keepalive: true
     }).catch(()=>{})
-    return () => controller.abort()
-  }, [empty, search])
+  }, [])
+
+  useEffect(()=>{
+    const term = search.trim()
+    if (!term || term.length < 3) return
+    if (!empty) return
+    const key = term.toLowerCase()
+    if (reportedTermsRef.current.has(key)) return
+    // Só o último termo de cada pausa vale: os prefixos digitados no caminho
+    // ("intub", "intuba"...) substituem a entrada pendente em vez de somar.
+    const pending = pendingTermsRef.current
+    const last = (pending[pending.length - 1] || '').toLowerCase()
+    if (last && (key.startsWith(last) || last.startsWith(key))) {
+      pending[pending.length - 1] = term
+    } else {
+      pending.push(term)
+    }
+    clearTimeout(reportTimerRef.current)
+    reportTimerRef.current = setTimeout(() => flushReportedTerms(), 3000)
+  }, [empty, search, flushReportedTerms])
+
+  useEffect(()=>{
+    const onHide = () => flushReportedTerms(true)
+    window.addEventListener('pagehide', onHide)
+    return () => {
+      window.removeEventListener('pagehide', onHide)
+      flushReportedTerms(true)
+    }
+  }, [flushReportedTerms])
 
   const skeletonCount = isMobile ? 4 : 6
   const controlsSpacerHeight = fixedControlsHeight || (isMobile ? 112 : 88)
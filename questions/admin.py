@@ -1,7 +1,8 @@
 from django.contrib import admin
 from django.utils.html import format_html, format_html_join
 from django.db import connection
-from .models import Category, Tag, Rule, RuleCard, RuleBullet, Question, SearchLog, AskedTerm, ChecklistSubmission, ChecklistDigestLog
+from .exports import FORMAT_CSV, FORMAT_NDJSON, SPEC_BY_MODEL, export_response
+from .models import Category, Tag, Rule, RuleCard, RuleBullet, Question, SearchLog, SearchTermDaily, AskedTerm, ChecklistSubmission, ChecklistDigestLog, Synonym
 
 # --- Utilitário: detectar se o banco tem tabelas de timezone populadas ---
 _HAS_TZ_SUPPORT = None
@@ -20,9 +21,24 @@ def has_timezone_support():
         _HAS_TZ_SUPPORT = False
     return _HAS_TZ_SUPPORT
 
+# --- Exportação em streaming dos registros selecionados (questions/exports.py) ---
+
+@admin.action(description="Exportar selecionados (CSV)")
+def export_selected_csv(modeladmin, request, queryset):
+    return export_response(SPEC_BY_MODEL[modeladmin.model], queryset, FORMAT_CSV)
+
+
+@admin.action(description="Exportar selecionados (NDJSON)")
+def export_selected_ndjson(modeladmin, request, queryset):
+    return export_response(SPEC_BY_MODEL[modeladmin.model], queryset, FORMAT_NDJSON)
+
+
+EXPORT_ACTIONS = [export_selected_csv, export_selected_ndjson]
+
 @admin.register(Question)
 class QuestionAdmin(admin.ModelAdmin):
     list_display = ('id', 'created_at', 'status', 'category', 'short_text')
+    actions = EXPORT_ACTIONS
     list_filter = ('status', 'created_at')
     search_fields = ('text', 'ip_hash')
 
@@ -53,6 +69,13 @@ class TagAdmin(admin.ModelAdmin):
     search_fields = ("name",)
     prepopulated_fields = {"slug": ("name",)}
 
+@admin.register(Synonym)
+class SynonymAdmin(admin.ModelAdmin):
+    list_display = ("term", "expansion", "bidirectional", "is_active", "updated_at")
+    list_editable = ("bidirectional", "is_active")
+    list_filter = ("is_active", "bidirectional")
+    search_fields = ("term", "expansion")
+
 @admin.register(Rule)
 class RuleAdmin(admin.ModelAdmin):
     list_display = ("title", "category", "is_published", "order", "updated_at")
@@ -114,6 +137,7 @@ class RuleBulletAdmin(admin.ModelAdmin):
 @admin.register(SearchLog)
 class SearchLogAdmin(admin.ModelAdmin):
     list_display = ("term", "results_count", "created_at")
+    actions = EXPORT_ACTIONS
     search_fields = ("term", "user_agent")
     list_filter = ("results_count", "created_at")
     ordering = ("-created_at",)
@@ -133,9 +157,24 @@ class SearchLogAdmin(admin.ModelAdmin):
             self.date_hierarchy = old_date_hierarchy
 
 
+@admin.register(SearchTermDaily)
+class SearchTermDailyAdmin(admin.ModelAdmin):
+    """Rollup diário (ver `rollup_search_terms`): filtros por data sem varrer o SearchLog bruto."""
+    list_display = ("day", "term", "count", "distinct_ips")
+    search_fields = ("term_norm", "term")
+    ordering = ("-day", "-count")
+    # DateField: não depende de CONVERT_TZ como o date_hierarchy do SearchLog.
+    date_hierarchy = "day"
+    readonly_fields = ("day", "term_norm", "term", "count", "distinct_ips")
+
+    def has_add_permission(self, request):
+        return False
+
+
 @admin.register(AskedTerm)
 class AskedTermAdmin(admin.ModelAdmin):
     list_display = ("term", "count", "last_seen", "first_seen")
+    actions = EXPORT_ACTIONS
     search_fields = ("term",)
     list_filter = ("count",)
     ordering = ("-count", "term")
@@ -145,6 +184,7 @@ class AskedTermAdmin(admin.ModelAdmin):
 @admin.register(ChecklistSubmission)
 class ChecklistSubmissionAdmin(admin.ModelAdmin):
     list_display = ("id", "created_at", "doctor_name", "unit")
+    actions = EXPORT_ACTIONS
     search_fields = ("doctor_name", "unit", "text")
     list_filter = ("unit", "created_at")
     readonly_fields = ("created_at", "ip_hash", "user_agent")
@@ -0,0 +1,167 @@
+"""Contadores de `AskedTerm` (palavras das perguntas enviadas em /ask).
+
+`upsert_asked_terms` grava todos os termos de uma pergunta num único INSERT com
+incremento atômico no banco, sem ler antes:
+
+- MariaDB/MySQL: `INSERT … ON DUPLICATE KEY UPDATE count = count + VALUES(count)`;
+- SQLite/PostgreSQL: `INSERT … ON CONFLICT (term_norm) DO UPDATE SET count = count + excluded.count`.
+
+Submissões simultâneas com o mesmo termo não perdem incrementos (não há
+read-modify-write em Python).
+
+`rebuild_asked_terms` recalcula a tabela inteira a partir de `Question` (comando
+`rebuild_asked_terms`), para quando a regra de tokenização (`question_terms`)
+mudar: lê as perguntas em lotes por id, conta os lotes num pool de processos
+(map), junta os contadores (reduce) e grava com upserts em lote.
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from django.db import connection, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import AskedTerm, Question
+from .term_counts import count_question_terms, merge_term_counts, question_terms
+
+# Linhas por INSERT (5 parâmetros cada; folga para o limite de variáveis do SQLite).
+BATCH = 500
+
+
+def _upsert_sql(vendor, rows):
+    table = connection.ops.quote_name(AskedTerm._meta.db_table)
+    values = ", ".join(["(%s, %s, %s, %s, %s)"] * rows)
+    insert = f"INSERT INTO {table} (term, term_norm, count, first_seen, last_seen) VALUES {values}"
+    if vendor == "mysql":
+        return (
+            f"{insert} ON DUPLICATE KEY UPDATE count = count + VALUES(count), "
+            "last_seen = GREATEST(last_seen, VALUES(last_seen))"
+        )
+    greatest = "MAX" if vendor == "sqlite" else "GREATEST"
+    return (
+        f"{insert} ON CONFLICT (term_norm) DO UPDATE SET count = {table}.count + excluded.count, "
+        f"last_seen = {greatest}({table}.last_seen, excluded.last_seen)"
+    )
+
+
+def upsert_asked_terms(counts, now=None):
+    """Soma `counts` ({term_norm: (grafia, incremento)}) aos contadores de AskedTerm.
+
+    Um INSERT por lote de até `BATCH` termos (1 por pergunta na prática).
+    """
+    if not counts:
+        return
+    now = now or timezone.now()
+    vendor = connection.vendor
+    if vendor not in ("mysql", "sqlite", "postgresql"):
+        _upsert_fallback(counts, now)
+        return
+    stamp = connection.ops.adapt_datetimefield_value(now)
+    items = sorted(counts.items())  # ordem fixa: evita deadlock entre INSERTs concorrentes
+    with connection.cursor() as cursor:
+        for i in range(0, len(items), BATCH):
+            chunk = items[i:i + BATCH]
+            params = []
+            for norm, (term, n) in chunk:
+                params += [term, norm, n, stamp, stamp]
+            cursor.execute(_upsert_sql(vendor, len(chunk)), params)
+
+
+def _upsert_fallback(counts, now):
+    # Outros bancos: ainda atômico por termo (F()), mas 1-2 queries por termo.
+    for norm, (term, n) in sorted(counts.items()):
+        with transaction.atomic():
+            updated = AskedTerm.objects.filter(term_norm=norm).update(
+                count=F("count") + n, last_seen=Greatest(F("last_seen"), Value(now))
+            )
+            if not updated:
+                AskedTerm.objects.create(term=term, term_norm=norm, count=n, first_seen=now, last_seen=now)
+
+
+def record_question_terms(text, now=None):
+    """Conta os termos de uma pergunta (cada termo 1 vez por pergunta)."""
+    terms = question_terms(text)
+    upsert_asked_terms({norm: (term, 1) for norm, term in terms.items()}, now)
+
+
+# ---- reconstrução a partir de Question ----
+
+def _iter_question_chunks(chunk_size, upto):
+    last_pk = 0
+    while True:
+        chunk = list(
+            Question.objects.filter(pk__gt=last_pk, pk__lte=upto)
+            .order_by("pk")
+            .values_list("pk", "text", "created_at")[:chunk_size]
+        )
+        if not chunk:
+            return
+        last_pk = chunk[-1][0]
+        yield [(text, created_at) for _, text, created_at in chunk]
+
+
+def _map_chunks(chunks, workers):
+    """Conta os lotes (em `workers` processos) e entrega os parciais na ordem dos lotes.
+
+    No máximo 2 lotes por processo ficam em voo: a memória não cresce com o total
+    de perguntas, só com o vocabulário.
+    """
+    if workers <= 1:
+        for rows in chunks:
+            yield len(rows), count_question_terms(rows)
+        return
+    # spawn: processos novos, sem herdar a conexão aberta com o banco. O map só
+    # usa `questions.term_counts` (sem Django), então não precisa de django.setup().
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+        pending = []
+        for rows in chunks:
+            pending.append((len(rows), pool.submit(count_question_terms, rows)))
+            if len(pending) >= workers * 2:
+                n, future = pending.pop(0)
+                yield n, future.result()
+        for n, future in pending:
+            yield n, future.result()
+
+
+def _write_rebuilt(totals, batch_size):
+    keys = set(totals)
+    bulk_kwargs = {"update_conflicts": True, "update_fields": ["term", "count", "first_seen", "last_seen"]}
+    if connection.features.supports_update_conflicts_with_target:
+        bulk_kwargs["unique_fields"] = ["term_norm"]
+    items = sorted(totals.items())
+    for i in range(0, len(items), batch_size):
+        with transaction.atomic():
+            AskedTerm.objects.bulk_create(
+                [
+                    AskedTerm(term=term, term_norm=norm, count=n, first_seen=first, last_seen=last)
+                    for norm, (term, n, first, last) in items[i:i + batch_size]
+                ],
+                **bulk_kwargs,
+            )
+    stale = [k for k in AskedTerm.objects.values_list("term_norm", flat=True).iterator() if k not in keys]
+    for i in range(0, len(stale), batch_size):
+        AskedTerm.objects.filter(term_norm__in=stale[i:i + batch_size]).delete()
+    return len(stale)
+
+
+def rebuild_asked_terms(*, workers=1, chunk_size=2000, batch_size=1000, dry_run=False, progress=None):
+    """Recalcula AskedTerm a partir de todas as perguntas (até o maior id atual).
+
+    Retorna {"questions", "terms", "deleted"}. `progress(perguntas_lidas)` é
+    chamado a cada lote reduzido.
+    """
+    upto = Question.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+    totals = {}
+    seen = 0
+    for n, part in _map_chunks(_iter_question_chunks(chunk_size, upto), workers):
+        merge_term_counts(totals, part)
+        seen += n
+        if progress:
+            progress(seen)
+    deleted = 0
+    if not dry_run:
+        deleted = _write_rebuilt(totals, batch_size)
+    return {"questions": seen, "terms": len(totals), "deleted": deleted}
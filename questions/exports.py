@@ -0,0 +1,159 @@
+"""Exportações em streaming (CSV / NDJSON, opcionalmente gzip) para a equipe.
+
+Cada modelo exportável tem um `ExportSpec` em `EXPORTS` (colunas, campo de data
+para o filtro de período e nome do arquivo). `export_response` devolve um
+`StreamingHttpResponse`: as linhas são lidas em lotes por chave primária
+(`WHERE id < :último ORDER BY id DESC LIMIT n`, como em
+`asked_terms._iter_question_chunks`), formatadas e enviadas em blocos de ~64 KB.
+A memória do worker fica limitada a um lote, qualquer que seja o total, e o
+primeiro byte sai antes de o banco terminar de ler a tabela.
+
+Usado pela view `export_data` (`/inbox/export/<nome>/`) e pelas ações do admin.
+"""
+
+import csv
+import datetime
+import zlib
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .models import AskedTerm, ChecklistSubmission, Question, SearchLog
+
+DEFAULT_CHUNK_SIZE = 2000
+# Bytes acumulados antes de entregar um bloco ao servidor (menos writes no socket).
+FLUSH_BYTES = 64 * 1024
+
+FORMAT_CSV = "csv"
+FORMAT_NDJSON = "ndjson"
+FORMATS = {
+    FORMAT_CSV: "text/csv; charset=utf-8",
+    FORMAT_NDJSON: "application/x-ndjson; charset=utf-8",
+}
+
+
+@dataclass(frozen=True)
+class ExportSpec:
+    name: str
+    model: type
+    fields: tuple
+    date_field: str
+    filename: str
+
+
+EXPORTS = {
+    spec.name: spec
+    for spec in (
+        ExportSpec("questions", Question, ("id", "created_at", "status", "category", "text"),
+                   "created_at", "perguntas"),
+        ExportSpec("checklists", ChecklistSubmission, ("id", "created_at", "doctor_name", "unit", "text"),
+                   "created_at", "checklists"),
+        ExportSpec("search-log", SearchLog, ("id", "created_at", "term", "term_norm", "results_count"),
+                   "created_at", "buscas"),
+        ExportSpec("asked-terms", AskedTerm, ("id", "term", "term_norm", "count", "first_seen", "last_seen"),
+                   "last_seen", "termos-perguntas"),
+    )
+}
+
+SPEC_BY_MODEL = {spec.model: spec for spec in EXPORTS.values()}
+
+
+def parse_day(value):
+    """`AAAA-MM-DD` → date; vazio → None; inválido → ValueError."""
+    value = (value or "").strip()
+    return datetime.date.fromisoformat(value) if value else None
+
+
+def filter_period(qs, field, start=None, end=None):
+    """Restringe `qs` aos dias locais [start, end] (inclusive), em faixa sobre o índice."""
+    if start:
+        qs = qs.filter(**{f"{field}__gte": timezone.make_aware(
+            datetime.datetime.combine(start, datetime.time.min))})
+    if end:
+        qs = qs.filter(**{f"{field}__lt": timezone.make_aware(
+            datetime.datetime.combine(end + datetime.timedelta(days=1), datetime.time.min))})
+    return qs
+
+
+def iter_rows(qs, fields, chunk_size=None):
+    """Tuplas de `fields` em ordem decrescente de id, lidas em lotes por keyset.
+
+    Ao contrário de `.iterator()`, não depende de cursor no servidor (o driver do
+    MariaDB carrega o resultado inteiro do SELECT em memória).
+    """
+    chunk_size = chunk_size or getattr(settings, "EXPORT_CHUNK_SIZE", DEFAULT_CHUNK_SIZE)
+    base = qs.order_by("-pk").values_list("pk", *fields)
+    last_pk = None
+    while True:
+        chunk = list((base if last_pk is None else base.filter(pk__lt=last_pk))[:chunk_size])
+        if not chunk:
+            return
+        last_pk = chunk[-1][0]
+        for row in chunk:
+            yield row[1:]
+        if len(chunk) < chunk_size:
+            return
+
+
+class _Echo:
+    """Pseudo-arquivo para o csv.writer: `write` devolve a linha em vez de guardá-la."""
+
+    def write(self, value):
+        return value
+
+
+def _csv_lines(fields, rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def _ndjson_lines(fields, rows):
+    encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    for row in rows:
+        yield encoder.encode(dict(zip(fields, row))) + "\n"
+
+
+def _blocks(lines):
+    buf, size = [], 0
+    for line in lines:
+        data = line.encode("utf-8")
+        buf.append(data)
+        size += len(data)
+        if size >= FLUSH_BYTES:
+            yield b"".join(buf)
+            buf, size = [], 0
+    if buf:
+        yield b"".join(buf)
+
+
+def _gzip(blocks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: formato gzip
+    for block in blocks:
+        out = compressor.compress(block)
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+def export_response(spec, qs, fmt=FORMAT_CSV, compress=False, chunk_size=None):
+    """StreamingHttpResponse com `qs` (do modelo de `spec`) em `fmt`, `.gz` se `compress`."""
+    rows = iter_rows(qs, spec.fields, chunk_size)
+    lines = _ndjson_lines(spec.fields, rows) if fmt == FORMAT_NDJSON else _csv_lines(spec.fields, rows)
+    body = _blocks(lines)
+    filename = f"{spec.filename}.{fmt}"
+    if compress:
+        body = _gzip(body)
+        filename += ".gz"
+        # Arquivo .gz baixado como está (sem Content-Encoding, que o navegador descomprimiria).
+        content_type = "application/gzip"
+    else:
+        content_type = FORMATS[fmt]
+    resp = StreamingHttpResponse(body, content_type=content_type)
+    resp["Content-Disposition"] = f'attachment; filename="{filename}"'
+    resp["Cache-Control"] = "no-store"
+    return resp
@@ -0,0 +1,97 @@
+"""Busca textual das inboxes (perguntas e checklists) pelo índice full-text do banco.
+
+Criado na migração 0011: FULLTEXT no MariaDB/MySQL, FTS5 (conteúdo externo,
+mantido por triggers) no SQLite. Cada palavra da busca vira um prefixo
+obrigatório (`+palavra*` / `"palavra"*`), sem acento e sem caixa; o filtro entra
+no queryset como `id IN (SELECT … MATCH …)` e combina com os demais filtros e
+com a paginação keyset.
+
+Sem o índice (outro banco, SQLite sem FTS5) ou só com palavras curtas demais
+para o FULLTEXT do MariaDB (`innodb_ft_min_token_size`, 3), cai no `icontains`.
+"""
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .text import tokenize
+
+MYSQL_MIN_TOKEN = 3
+
+QUESTION_FIELDS = ("text",)
+CHECKLIST_FIELDS = ("doctor_name", "unit", "text")
+
+_MYSQL_INDEXES = {
+    "questions_question": "questions_question_text_ft",
+    "questions_checklistsubmission": "questions_checklist_search_ft",
+}
+
+_available = {}
+
+
+def _has_index(table):
+    key = (connection.alias, connection.settings_dict.get("NAME"), table)
+    if key not in _available:
+        with connection.cursor() as cursor:
+            if connection.vendor == "sqlite":
+                cursor.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [f"{table}_fts"]
+                )
+            elif connection.vendor == "mysql":
+                cursor.execute(
+                    "SELECT 1 FROM information_schema.statistics WHERE table_schema = DATABASE() "
+                    "AND table_name = %s AND index_name = %s",
+                    [table, _MYSQL_INDEXES[table]],
+                )
+            else:
+                _available[key] = False
+                return False
+            _available[key] = cursor.fetchone() is not None
+    return _available[key]
+
+
+def _fulltext_ids(table, fields, tokens):
+    """RawSQL com os ids que casam com todos os `tokens`, ou None sem índice utilizável."""
+    if not tokens or not _has_index(table):
+        return None
+    if connection.vendor == "sqlite":
+        fts = f"{table}_fts"
+        expr = " AND ".join(f'"{t}"*' for t in tokens)
+        return RawSQL(f"SELECT rowid FROM {fts} WHERE {fts} MATCH %s", [expr])
+    tokens = [t for t in tokens if len(t) >= MYSQL_MIN_TOKEN]
+    if not tokens:
+        return None
+    expr = " ".join(f"+{t}*" for t in tokens)
+    cols = ", ".join(fields)
+    # Tabela derivada: o `UPDATE … WHERE id IN (…)` da triagem em lote não pode
+    # ler da própria tabela numa subquery direta no MariaDB/MySQL (erro 1093).
+    return RawSQL(
+        f"SELECT id FROM (SELECT id FROM {table} WHERE MATCH({cols}) AGAINST (%s IN BOOLEAN MODE)) AS ft",
+        [expr],
+    )
+
+
+def _icontains(fields, query):
+    q = Q()
+    for field in fields:
+        q |= Q(**{f"{field}__icontains": query})
+    return q
+
+
+def search(qs, query, fields):
+    """Filtra `qs` pelas palavras de `query` nos `fields` do modelo."""
+    query = (query or "").strip()
+    if not query:
+        return qs
+    ids = _fulltext_ids(qs.model._meta.db_table, fields, tokenize(query))
+    if ids is None:
+        return qs.filter(_icontains(fields, query))
+    return qs.filter(pk__in=ids)
+
+
+def search_questions(qs, query):
+    return search(qs, query, QUESTION_FIELDS)
+
+
+def search_checklists(qs, query):
+    return search(qs, query, CHECKLIST_FIELDS)
@@ -0,0 +1,196 @@
+import io
+import json
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from questions.models import Rule, RuleBullet, RuleCard
+from questions.rules_cache import clear_snapshot
+from questions.serializers import serialize_rules, serialize_rules_prefetch
+from questions.views import api_rules
+
+
+def _read_status_kb(field):
+    """Lê um campo de /proc/self/status em kB (Linux); None se indisponível."""
+    try:
+        for line in Path('/proc/self/status').read_text().splitlines():
+            if line.startswith(field + ':'):
+                return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _reset_peak_rss():
+    """Zera o pico de RSS do processo (Linux >= 4.0); False se não suportado."""
+    try:
+        Path('/proc/self/clear_refs').write_text('5')
+        return True
+    except OSError:
+        return False
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark de /api/rules/ (snapshot em memória x streaming) e dos serializers\n"
+        "da árvore (Prefetch x values_list).\n"
+        "Cria um banco de TESTE temporário, importa a fixture (rules_seed.json por padrão),\n"
+        "opcionalmente replica o manual N vezes e mede, por modo: queries, tempo até o primeiro\n"
+        "byte, tempo total, pico de alocações Python (tracemalloc) e pico de RSS do processo.\n\n"
+        "Uso:\n"
+        "  DB_ENGINE=sqlite python manage.py bench_rules_api --scale 20 --repeat 5\n"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fixture', default='rules_seed.json')
+        parser.add_argument('--scale', type=int, default=1, help='Replica o manual N vezes (default 1).')
+        parser.add_argument('--repeat', type=int, default=5, help='Execuções por modo (mediana).')
+
+    def handle(self, *args, **opts):
+        fixture = Path(opts['fixture'])
+        if not fixture.is_file():
+            fixture = Path(settings.BASE_DIR) / fixture
+        if not fixture.is_file():
+            raise CommandError(f"Fixture não encontrada: {opts['fixture']}")
+
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            call_command('seed_rules', fixture=str(fixture), stdout=io.StringIO())
+            if opts['scale'] > 1:
+                self._scale_corpus(opts['scale'])
+            self.stdout.write(self.style.NOTICE(
+                f"Corpus: {Rule.objects.count()} regras, {RuleCard.objects.count()} cards, "
+                f"{RuleBullet.objects.count()} bullets"
+            ))
+            self._report(self.run_benchmarks(max(1, opts['repeat'])))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    # ---- cenários ----
+    def benchmarks(self):
+        factory = RequestFactory()
+
+        def snapshot_cold():
+            clear_snapshot()
+            return api_rules(factory.get('/api/rules/', {'stream': '0'}))
+
+        def snapshot_warm():
+            return api_rules(factory.get('/api/rules/', {'stream': '0'}))
+
+        def streaming():
+            return api_rules(factory.get('/api/rules/', {'stream': '1'}))
+
+        def serializer_prefetch():
+            return serialize_rules_prefetch()
+
+        def serializer_values():
+            return serialize_rules()
+
+        return [
+            ('serializer prefetch', serializer_prefetch),
+            ('serializer values', serializer_values),
+            ('snapshot (frio)', snapshot_cold),
+            ('snapshot (quente)', snapshot_warm),
+            ('streaming', streaming),
+        ]
+
+    def run_benchmarks(self, repeat):
+        rows = []
+        for name, fn in self.benchmarks():
+            samples = [self._measure(fn) for _ in range(repeat)]
+            rows.append({
+                'name': name,
+                'queries': samples[-1]['queries'],
+                'ttfb_ms': statistics.median(s['ttfb_ms'] for s in samples),
+                'total_ms': statistics.median(s['total_ms'] for s in samples),
+                'bytes': samples[-1]['bytes'],
+                'py_peak_kb': max(s['py_peak_kb'] for s in samples),
+                'rss_peak_kb': max((s['rss_peak_kb'] for s in samples if s['rss_peak_kb'] is not None), default=None),
+            })
+        return rows
+
+    def _measure(self, fn):
+        rss_before = _read_status_kb('VmRSS')
+        can_reset = _reset_peak_rss()
+        tracemalloc.start()
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            resp = fn()
+            ttfb = None
+            size = 0
+            if getattr(resp, 'streaming', False):
+                for chunk in resp.streaming_content:
+                    if ttfb is None:
+                        ttfb = time.perf_counter()
+                    size += len(chunk)
+            elif hasattr(resp, 'content'):
+                ttfb = time.perf_counter()
+                size = len(resp.content)
+            else:
+                # cenário de serializer: payload Python, sem resposta HTTP
+                ttfb = time.perf_counter()
+            total = time.perf_counter()
+            _, py_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        if not size and not hasattr(resp, 'content'):
+            size = len(json.dumps({'results': resp}, cls=DjangoJSONEncoder).encode('utf-8'))
+        hwm = _read_status_kb('VmHWM') if can_reset else None
+        return {
+            'queries': len(queries),
+            'ttfb_ms': (ttfb - started) * 1000,
+            'total_ms': (total - started) * 1000,
+            'bytes': size,
+            'py_peak_kb': py_peak / 1024,
+            'rss_peak_kb': (hwm - rss_before) if (hwm is not None and rss_before is not None) else None,
+        }
+
+    def _report(self, rows):
+        header = f"{'modo':<22}{'queries':>8}{'TTFB ms':>10}{'total ms':>10}{'bytes':>10}{'py pico kB':>12}{'RSS +kB':>10}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for r in rows:
+            rss = f"{r['rss_peak_kb']:>10}" if r['rss_peak_kb'] is not None else f"{'n/d':>10}"
+            self.stdout.write(
+                f"{r['name']:<22}{r['queries']:>8}{r['ttfb_ms']:>10.2f}{r['total_ms']:>10.2f}{r['bytes']:>10}"
+                f"{r['py_peak_kb']:>12.1f}{rss}"
+            )
+
+    # ---- utilitários ----
+    def _scale_corpus(self, times):
+        """Replica regras/cards/bullets (e vínculos de tags) `times - 1` vezes."""
+        through = RuleBullet.tags.through
+        rules = list(Rule.objects.all())
+        cards = list(RuleCard.objects.all())
+        bullets = list(RuleBullet.objects.all())
+        links = list(through.objects.values_list('rulebullet_id', 'tag_id'))
+        for i in range(1, times):
+            rule_map = {}
+            for r in rules:
+                copy = Rule.objects.create(
+                    title=f"{r.title} ({i})", slug=f"{r.slug}-x{i}", category_id=r.category_id,
+                    body=r.body, is_published=r.is_published, order=r.order + 1000 * i,
+                )
+                rule_map[r.id] = copy.id
+            card_map = {}
+            for c in cards:
+                copy = RuleCard.objects.create(
+                    rule_id=rule_map[c.rule_id], title=c.title, order=c.order, is_published=c.is_published,
+                )
+                card_map[c.id] = copy.id
+            new_bullets = RuleBullet.objects.bulk_create(
+                [RuleBullet(card_id=card_map[b.card_id], text=b.text, order=b.order) for b in bullets]
+            )
+            bullet_map = {old.id: new.id for old, new in zip(bullets, new_bullets)}
+            through.objects.bulk_create(
+                [through(rulebullet_id=bullet_map[b], tag_id=t) for b, t in links]
+            )
@@ -0,0 +1,29 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from questions.rules_cache import compact_changes
+
+
+class Command(BaseCommand):
+    help = (
+        "Compacta o diário de alterações do manual (RulesChange).\n"
+        "Apaga entradas mais antigas que --keep-days; clientes com `since` anterior\n"
+        "ao ponto de compactação passam a receber `resync` em /api/rules/changes/.\n\n"
+        "Uso (cron diário):\n"
+        "  python manage.py compact_rules_changes --keep-days 30\n"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep-days', type=int, default=30, help='Dias de histórico mantidos (default 30).')
+
+    def handle(self, *args, **opts):
+        keep_days = opts['keep_days']
+        if keep_days < 0:
+            raise CommandError('--keep-days deve ser >= 0.')
+        before = timezone.now() - datetime.timedelta(days=keep_days)
+        deleted, through = compact_changes(before)
+        self.stdout.write(self.style.SUCCESS(
+            f"{deleted} alteração(ões) removida(s); diário compactado até a versão {through}."
+        ))
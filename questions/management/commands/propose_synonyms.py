@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+
+from questions.models import Synonym
+from questions.search.index import get_rules_index
+from questions.search.synonyms import propose_synonyms
+
+
+class Command(BaseCommand):
+    help = (
+        "Sugere siglas/sinônimos para termos buscados sem resultado (SearchLog/AskedTerm).\n"
+        "Candidatos: expressões do manual cujas iniciais formam o termo. Com --create,\n"
+        "grava os pares como Synonym INATIVOS para revisão no admin.\n\n"
+        "Uso:\n"
+        "  python manage.py propose_synonyms --days 90 --min-count 3\n"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=90, help='Janela do SearchLog (default 90).')
+        parser.add_argument('--min-count', type=int, default=2, help='Frequência mínima do termo (default 2).')
+        parser.add_argument('--limit', type=int, default=50)
+        parser.add_argument('--create', action='store_true', help='Cria os pares como Synonym inativos.')
+
+    def handle(self, *args, **opts):
+        rows = propose_synonyms(
+            get_rules_index(),
+            days=opts['days'],
+            min_count=opts['min_count'],
+            limit=opts['limit'],
+        )
+        if not rows:
+            self.stdout.write(self.style.WARNING('Nenhum candidato.'))
+            return
+        header = f"{'termo':<20}{'buscas':>8}  {'candidato':<40}{'motivo':<14}{'apoio':>6}{'hits':>6}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        created = 0
+        for r in rows:
+            self.stdout.write(
+                f"{r['term']:<20}{r['count']:>8}  {r['candidate']:<40}{r['reason']:<14}"
+                f"{r['support']:>6}{r['hits']:>6}"
+            )
+            if opts['create']:
+                _, was_created = Synonym.objects.get_or_create(
+                    term=r['term'][:120], expansion=r['candidate'][:200],
+                    defaults={'is_active': False},
+                )
+                created += int(was_created)
+        if opts['create']:
+            self.stdout.write(self.style.SUCCESS(f"{created} sinônimo(s) criado(s) como inativos."))
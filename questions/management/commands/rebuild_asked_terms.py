@@ -0,0 +1,52 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from questions.asked_terms import rebuild_asked_terms
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula AskedTerm a partir de todas as perguntas (Question.text).\n"
+        "Use depois de mudar a regra de tokenização (questions.asked_terms.question_terms).\n"
+        "Lê as perguntas em lotes por id, conta os lotes em paralelo (--workers processos)\n"
+        "e grava com upserts em lote; termos que deixaram de existir são apagados.\n"
+        "first_seen/last_seen vêm de Question.created_at.\n\n"
+        "Perguntas enviadas durante a execução podem ter a contagem sobrescrita:\n"
+        "rode fora do horário de pico.\n\n"
+        "Uso:\n"
+        "  python manage.py rebuild_asked_terms --workers 4\n"
+        "  python manage.py rebuild_asked_terms --dry-run\n"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                            help='Processos de tokenização (default: nº de CPUs; 1 = sem pool).')
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Perguntas por lote (default 2000).')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Termos por upsert (default 1000).')
+        parser.add_argument('--dry-run', action='store_true', help='Só conta; não grava.')
+
+    def handle(self, *args, **opts):
+        if opts['workers'] < 1 or opts['chunk_size'] < 1 or opts['batch_size'] < 1:
+            raise CommandError('--workers, --chunk-size e --batch-size devem ser >= 1.')
+        started = time.monotonic()
+        verbose = opts['verbosity'] >= 2
+
+        def progress(seen):
+            if verbose:
+                self.stdout.write(f"  {seen} pergunta(s) processada(s)...")
+
+        result = rebuild_asked_terms(
+            workers=opts['workers'],
+            chunk_size=opts['chunk_size'],
+            batch_size=opts['batch_size'],
+            dry_run=opts['dry_run'],
+            progress=progress,
+        )
+        elapsed = time.monotonic() - started
+        prefix = "[dry-run] " if opts['dry_run'] else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}{result['questions']} pergunta(s), {result['terms']} termo(s), "
+            f"{result['deleted']} termo(s) obsoleto(s) removido(s) em {elapsed:.1f}s."
+        ))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from questions.search_rollup import prune_search_log, rollup_search_terms
+
+
+class Command(BaseCommand):
+    help = (
+        "Agrega as buscas sem resultado (SearchLog) no rollup diário SearchTermDaily.\n"
+        "Incremental: processa só o que entrou desde a última execução.\n"
+        "Com --prune-days, apaga depois o SearchLog bruto já agregado mais antigo que N dias.\n\n"
+        "Uso (cron a cada 15 min / diário):\n"
+        "  python manage.py rollup_search_terms\n"
+        "  python manage.py rollup_search_terms --prune-days 7\n"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prune-days', type=int, default=None,
+                            help='Apaga SearchLog já agregado de antes de hoje - N dias (mínimo 2).')
+
+    def handle(self, *args, **opts):
+        prune_days = opts['prune_days']
+        if prune_days is not None and prune_days < 2:
+            raise CommandError('--prune-days deve ser >= 2.')
+        result = rollup_search_terms()
+        days = ", ".join(d.isoformat() for d in result["days"]) or "nenhum"
+        self.stdout.write(self.style.SUCCESS(
+            f"{result['rows']} busca(s) nova(s); dias recalculados: {days}; marca d'água #{result['watermark']}."
+        ))
+        if prune_days is not None:
+            deleted, keep_from = prune_search_log(prune_days)
+            self.stdout.write(self.style.SUCCESS(
+                f"{deleted} SearchLog(s) removido(s); bruto mantido a partir de {keep_from.isoformat()}."
+            ))
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.6 on 2026-10-17 18:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0003_checklistdigestlog'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RulesVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Versão do manual',
+                'verbose_name_plural': 'Versão do manual',
+            },
+        ),
+    ]
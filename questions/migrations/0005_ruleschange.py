@@ -0,0 +1,37 @@
+# Generated by Django 5.2.6 on 2026-10-17 18:13
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0004_rulesversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='rulesversion',
+            name='compacted_through',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='RulesChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField()),
+                ('kind', models.CharField(choices=[('rule', 'Regra'), ('card', 'Card'), ('bullet', 'Bullet'), ('tag', 'Tag'), ('category', 'Categoria')], max_length=16)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('rule_id', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('action', models.CharField(choices=[('upsert', 'Criado/alterado'), ('delete', 'Removido')], default='upsert', max_length=8)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Alteração do manual',
+                'verbose_name_plural': 'Alterações do manual',
+                'ordering': ['version', 'id'],
+                'indexes': [models.Index(fields=['version'], name='questions_r_version_cd4833_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,106 @@
+"""Índices full-text nativos do banco para a busca de regras.
+
+- MariaDB/MySQL: índices FULLTEXT em bullets (texto), cards, regras (título) e tags.
+- SQLite: tabela FTS5 `questions_rulebullet_fts`, um documento por bullet com os
+  mesmos campos do índice em memória (texto, tags, título do card e da regra),
+  mantida por triggers. Se o SQLite não tiver FTS5, nada é criado (a busca cai
+  no backend em Python).
+
+Usado por `questions.search.backends` quando RULES_SEARCH_BACKEND=db.
+"""
+
+from django.db import migrations
+
+MYSQL_FORWARD = [
+    "ALTER TABLE questions_rulebullet ADD FULLTEXT INDEX questions_rulebullet_text_ft (text)",
+    "ALTER TABLE questions_rulecard ADD FULLTEXT INDEX questions_rulecard_title_ft (title)",
+    "ALTER TABLE questions_rule ADD FULLTEXT INDEX questions_rule_title_ft (title)",
+    "ALTER TABLE questions_tag ADD FULLTEXT INDEX questions_tag_name_ft (name)",
+]
+MYSQL_BACKWARD = [
+    "ALTER TABLE questions_rulebullet DROP INDEX questions_rulebullet_text_ft",
+    "ALTER TABLE questions_rulecard DROP INDEX questions_rulecard_title_ft",
+    "ALTER TABLE questions_rule DROP INDEX questions_rule_title_ft",
+    "ALTER TABLE questions_tag DROP INDEX questions_tag_name_ft",
+]
+
+# Tags de um bullet separadas por espaço (mesma fonte do índice em memória).
+_SQLITE_TAGS = (
+    "(SELECT coalesce(group_concat(t.name, ' '), '') FROM questions_rulebullet_tags bt "
+    "JOIN questions_tag t ON t.id = bt.tag_id WHERE bt.rulebullet_id = {bullet})"
+)
+_SQLITE_INSERT = (
+    "INSERT INTO questions_rulebullet_fts(rowid, text, tags, card_title, rule_title, card_id, rule_id) "
+    "SELECT b.id, b.text, " + _SQLITE_TAGS.format(bullet="b.id") + ", c.title, r.title, c.id, r.id "
+    "FROM questions_rulebullet b JOIN questions_rulecard c ON c.id = b.card_id "
+    "JOIN questions_rule r ON r.id = c.rule_id"
+)
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE questions_rulebullet_fts USING fts5("
+    "text, tags, card_title, rule_title, card_id UNINDEXED, rule_id UNINDEXED, "
+    "tokenize = 'unicode61 remove_diacritics 2')",
+    _SQLITE_INSERT,
+    "CREATE TRIGGER questions_rulebullet_fts_ai AFTER INSERT ON questions_rulebullet BEGIN "
+    + _SQLITE_INSERT + " WHERE b.id = NEW.id; END",
+    "CREATE TRIGGER questions_rulebullet_fts_au AFTER UPDATE ON questions_rulebullet BEGIN "
+    "DELETE FROM questions_rulebullet_fts WHERE rowid = OLD.id; "
+    + _SQLITE_INSERT + " WHERE b.id = NEW.id; END",
+    "CREATE TRIGGER questions_rulebullet_fts_ad AFTER DELETE ON questions_rulebullet BEGIN "
+    "DELETE FROM questions_rulebullet_fts WHERE rowid = OLD.id; END",
+    "CREATE TRIGGER questions_rulecard_fts_au AFTER UPDATE OF title, rule_id ON questions_rulecard BEGIN "
+    "UPDATE questions_rulebullet_fts SET card_title = NEW.title, rule_id = NEW.rule_id, "
+    "rule_title = (SELECT title FROM questions_rule WHERE id = NEW.rule_id) WHERE card_id = NEW.id; END",
+    "CREATE TRIGGER questions_rule_fts_au AFTER UPDATE OF title ON questions_rule BEGIN "
+    "UPDATE questions_rulebullet_fts SET rule_title = NEW.title WHERE rule_id = NEW.id; END",
+    "CREATE TRIGGER questions_rulebullet_tags_fts_ai AFTER INSERT ON questions_rulebullet_tags BEGIN "
+    "UPDATE questions_rulebullet_fts SET tags = " + _SQLITE_TAGS.format(bullet="NEW.rulebullet_id")
+    + " WHERE rowid = NEW.rulebullet_id; END",
+    "CREATE TRIGGER questions_rulebullet_tags_fts_ad AFTER DELETE ON questions_rulebullet_tags BEGIN "
+    "UPDATE questions_rulebullet_fts SET tags = " + _SQLITE_TAGS.format(bullet="OLD.rulebullet_id")
+    + " WHERE rowid = OLD.rulebullet_id; END",
+    "CREATE TRIGGER questions_tag_fts_au AFTER UPDATE OF name ON questions_tag BEGIN "
+    "UPDATE questions_rulebullet_fts SET tags = " + _SQLITE_TAGS.format(bullet="questions_rulebullet_fts.rowid")
+    + " WHERE rowid IN (SELECT rulebullet_id FROM questions_rulebullet_tags WHERE tag_id = NEW.id); END",
+]
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS questions_tag_fts_au",
+    "DROP TRIGGER IF EXISTS questions_rulebullet_tags_fts_ad",
+    "DROP TRIGGER IF EXISTS questions_rulebullet_tags_fts_ai",
+    "DROP TRIGGER IF EXISTS questions_rule_fts_au",
+    "DROP TRIGGER IF EXISTS questions_rulecard_fts_au",
+    "DROP TRIGGER IF EXISTS questions_rulebullet_fts_ad",
+    "DROP TRIGGER IF EXISTS questions_rulebullet_fts_au",
+    "DROP TRIGGER IF EXISTS questions_rulebullet_fts_ai",
+    "DROP TABLE IF EXISTS questions_rulebullet_fts",
+]
+
+
+def _sqlite_has_fts5(schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("PRAGMA compile_options")
+        return any(row[0] == "ENABLE_FTS5" for row in cursor.fetchall())
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        if vendor == "sqlite" and not _sqlite_has_fts5(schema_editor):
+            return
+        for sql in statements_by_vendor.get(vendor, ()):
+            schema_editor.execute(sql, params=None)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0005_ruleschange'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({"mysql": MYSQL_FORWARD, "sqlite": SQLITE_FORWARD}),
+            _run({"mysql": MYSQL_BACKWARD, "sqlite": SQLITE_BACKWARD}),
+        ),
+    ]
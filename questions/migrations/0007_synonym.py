@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-17 18:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0006_rules_fulltext'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ruleschange',
+            name='kind',
+            field=models.CharField(choices=[('rule', 'Regra'), ('card', 'Card'), ('bullet', 'Bullet'), ('tag', 'Tag'), ('category', 'Categoria'), ('synonym', 'Sinônimo')], max_length=16),
+        ),
+        migrations.CreateModel(
+            name='Synonym',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(db_index=True, help_text='Sigla ou termo digitado (ex.: PCR).', max_length=120)),
+                ('expansion', models.CharField(help_text='Forma equivalente usada no manual (ex.: parada cardiorrespiratória).', max_length=200)),
+                ('bidirectional', models.BooleanField(default=True, help_text='Buscar pela forma equivalente também encontra o termo.')),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Sinônimo',
+                'verbose_name_plural': 'Sinônimos',
+                'ordering': ['term', 'expansion'],
+                'constraints': [models.UniqueConstraint(fields=('term', 'expansion'), name='uniq_synonym_term_expansion')],
+            },
+        ),
+    ]
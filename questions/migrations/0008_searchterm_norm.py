@@ -0,0 +1,123 @@
+"""`term_norm` (sem acento, casefold) em SearchLog e AskedTerm.
+
+O preenchimento roda em lotes por pk (migração não atômica: cada lote é sua
+própria transação, sem travar a tabela inteira no MariaDB). Em AskedTerm, grafias que
+caem na mesma chave ("Intubação", "intubacao", "INTUBAÇÃO") viram uma linha só:
+somam `count`, ficam com o menor `first_seen`, o maior `last_seen` e a grafia
+mais frequente em `term`.
+"""
+
+from django.db import migrations, models, transaction
+
+from questions.text import normalize_term
+
+BATCH = 2000
+
+
+def _norm(term):
+    return normalize_term(term)[:200]
+
+
+def backfill_searchlog(apps, schema_editor):
+    SearchLog = apps.get_model("questions", "SearchLog")
+    last_pk = 0
+    while True:
+        rows = list(SearchLog.objects.filter(pk__gt=last_pk).order_by("pk").only("pk", "term")[:BATCH])
+        if not rows:
+            break
+        for row in rows:
+            row.term_norm = _norm(row.term)
+        with transaction.atomic():
+            SearchLog.objects.bulk_update(rows, ["term_norm"], batch_size=500)
+        last_pk = rows[-1].pk
+
+
+def backfill_askedterm(apps, schema_editor):
+    AskedTerm = apps.get_model("questions", "AskedTerm")
+    # Só normas com mais de uma grafia: maior `count` individual já visto (para
+    # escolher a grafia mais frequente); o resto fica no banco, não em memória.
+    best_single = {}
+    last_pk = 0
+    while True:
+        rows = list(AskedTerm.objects.filter(pk__gt=last_pk).order_by("pk")[:BATCH])
+        if not rows:
+            break
+        last_pk = rows[-1].pk
+        norms = {_norm(r.term) for r in rows}
+        # Linhas de lotes anteriores já têm `term_norm`: são as que ficam.
+        kept = {
+            k.term_norm: k
+            for k in AskedTerm.objects.filter(term_norm__in=norms, pk__lt=rows[0].pk)
+        }
+        fresh = []
+        merged = {}
+        drop = []
+        for row in rows:
+            norm = _norm(row.term)
+            main = kept.get(norm)
+            if main is None:
+                row.term_norm = norm
+                kept[norm] = row
+                fresh.append(row)
+                continue
+            best = best_single.get(norm, main.count)
+            if row.count > best:
+                main.term = row.term
+            best_single[norm] = max(best, row.count)
+            main.count += row.count
+            main.first_seen = min(main.first_seen, row.first_seen)
+            main.last_seen = max(main.last_seen, row.last_seen)
+            merged[main.pk] = main
+            drop.append(row.pk)
+
+        # Grava as linhas que ficam antes de apagar as duplicadas, na mesma
+        # transação: uma falha no meio não perde contagens.
+        with transaction.atomic():
+            AskedTerm.objects.bulk_update(fresh, ["term_norm"], batch_size=500)
+            AskedTerm.objects.bulk_update(
+                list(merged.values()), ["term", "term_norm", "count", "first_seen", "last_seen"], batch_size=500
+            )
+            if drop:
+                AskedTerm.objects.filter(pk__in=drop).delete()
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('questions', '0007_synonym'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='searchlog',
+            name='term_norm',
+            field=models.CharField(blank=True, editable=False, max_length=200),
+        ),
+        migrations.AddField(
+            model_name='askedterm',
+            name='term_norm',
+            field=models.CharField(blank=True, editable=False, max_length=200),
+        ),
+        migrations.RunPython(backfill_searchlog, migrations.RunPython.noop),
+        migrations.RunPython(backfill_askedterm, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='askedterm',
+            name='term_norm',
+            field=models.CharField(editable=False, max_length=200, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='askedterm',
+            name='term',
+            field=models.CharField(max_length=200),
+        ),
+        migrations.RemoveIndex(
+            model_name='searchlog',
+            name='questions_s_term_35b520_idx',
+        ),
+        migrations.AddIndex(
+            model_name='searchlog',
+            index=models.Index(fields=['term_norm', 'created_at'], name='questions_s_term_no_1c499b_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.6 on 2026-10-17 18:31
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0008_searchterm_norm'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchRollupState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_log_id', models.PositiveBigIntegerField(default=0)),
+                ('pruned_before', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Estado do rollup de buscas',
+                'verbose_name_plural': 'Estado do rollup de buscas',
+            },
+        ),
+        migrations.CreateModel(
+            name='SearchTermDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('term_norm', models.CharField(max_length=200)),
+                ('term', models.CharField(max_length=200)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('distinct_ips', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Busca sem resultado (por dia)',
+                'verbose_name_plural': 'Buscas sem resultado (por dia)',
+                'ordering': ['-day', '-count'],
+                'constraints': [models.UniqueConstraint(fields=('day', 'term_norm'), name='uniq_searchtermdaily_day_term')],
+            },
+        ),
+    ]
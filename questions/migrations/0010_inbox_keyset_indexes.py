@@ -0,0 +1,27 @@
+# Generated by Django 5.2.6 on 2026-10-17 18:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0009_searchtermdaily'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='checklistsubmission',
+            index=models.Index(fields=['created_at', 'id'], name='questions_c_created_a57fc5_idx'),
+        ),
+        # O índice simples em created_at só sai depois do composto existir.
+        migrations.AlterField(
+            model_name='checklistsubmission',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['status', 'id'], name='questions_q_status_63b972_idx'),
+        ),
+    ]
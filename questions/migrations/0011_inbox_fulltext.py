@@ -0,0 +1,86 @@
+"""Índices full-text para a busca das inboxes (perguntas e checklists).
+
+- MariaDB/MySQL: FULLTEXT em `Question.text` e em
+  (`ChecklistSubmission.doctor_name`, `unit`, `text`).
+- SQLite: tabelas FTS5 de conteúdo externo (não duplicam o texto, só o índice),
+  `questions_question_fts` e `questions_checklistsubmission_fts`, mantidas por
+  triggers a cada insert/update/delete. Sem FTS5 no SQLite, nada é criado (a
+  busca cai no `icontains`).
+
+Usado por `questions.inbox_search`.
+"""
+
+from django.db import migrations
+
+MYSQL_FORWARD = [
+    "ALTER TABLE questions_question ADD FULLTEXT INDEX questions_question_text_ft (text)",
+    "ALTER TABLE questions_checklistsubmission ADD FULLTEXT INDEX questions_checklist_search_ft "
+    "(doctor_name, unit, text)",
+]
+MYSQL_BACKWARD = [
+    "ALTER TABLE questions_question DROP INDEX questions_question_text_ft",
+    "ALTER TABLE questions_checklistsubmission DROP INDEX questions_checklist_search_ft",
+]
+
+
+def _sqlite_fts(table, columns):
+    fts = f"{table}_fts"
+    cols = ", ".join(columns)
+    new = ", ".join(f"new.{c}" for c in columns)
+    old = ", ".join(f"old.{c}" for c in columns)
+    delete_old = f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+    insert_new = f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); "
+    forward = [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({cols}, content='{table}', content_rowid='id', "
+        "tokenize = 'unicode61 remove_diacritics 2')",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN {insert_new}END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN {delete_old}END",
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN {delete_old}{insert_new}END",
+    ]
+    backward = [
+        f"DROP TRIGGER IF EXISTS {fts}_au",
+        f"DROP TRIGGER IF EXISTS {fts}_ad",
+        f"DROP TRIGGER IF EXISTS {fts}_ai",
+        f"DROP TABLE IF EXISTS {fts}",
+    ]
+    return forward, backward
+
+
+_QUESTION_FORWARD, _QUESTION_BACKWARD = _sqlite_fts("questions_question", ["text"])
+_CHECKLIST_FORWARD, _CHECKLIST_BACKWARD = _sqlite_fts(
+    "questions_checklistsubmission", ["doctor_name", "unit", "text"]
+)
+SQLITE_FORWARD = _QUESTION_FORWARD + _CHECKLIST_FORWARD
+SQLITE_BACKWARD = _CHECKLIST_BACKWARD + _QUESTION_BACKWARD
+
+
+def _sqlite_has_fts5(schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("PRAGMA compile_options")
+        return any(row[0] == "ENABLE_FTS5" for row in cursor.fetchall())
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        if vendor == "sqlite" and not _sqlite_has_fts5(schema_editor):
+            return
+        for sql in statements_by_vendor.get(vendor, ()):
+            schema_editor.execute(sql, params=None)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('questions', '0010_inbox_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({"mysql": MYSQL_FORWARD, "sqlite": SQLITE_FORWARD}),
+            _run({"mysql": MYSQL_BACKWARD, "sqlite": SQLITE_BACKWARD}),
+        ),
+    ]
@@ -4,6 +4,8 @@ from django.utils.text import slugify
 
 import hashlib
 
+from .text import normalize_term
+
 def hash_ip(ip: str) -> str:
     if not ip:
         return ''
@@ -24,6 +26,12 @@ class Question(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_NEW)
     ip_hash = models.CharField(max_length=64, blank=True)
 
+    class Meta:
+        indexes = [
+            # Inbox filtrada por status, paginada por id decrescente (keyset).
+            models.Index(fields=["status", "id"]),
+        ]
+
     def set_ip(self, ip):
         self.ip_hash = hash_ip(ip)
 
@@ -122,11 +130,43 @@ class RuleBullet(models.Model):
         return (self.text[:80] + "…") if len(self.text) > 80 else self.text
 
 
+class Synonym(models.Model):
+    """Sinônimo/sigla para a busca de regras (ex.: "PCR" ↔ "parada cardiorrespiratória").
+
+    Compilado num mapa em memória a cada versão do manual
+    (`questions.search.synonyms`); salvar um sinônimo incrementa a versão.
+    """
+    term = models.CharField(max_length=120, db_index=True, help_text="Sigla ou termo digitado (ex.: PCR).")
+    expansion = models.CharField(
+        max_length=200, help_text="Forma equivalente usada no manual (ex.: parada cardiorrespiratória)."
+    )
+    bidirectional = models.BooleanField(
+        default=True, help_text="Buscar pela forma equivalente também encontra o termo."
+    )
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Sinônimo"
+        verbose_name_plural = "Sinônimos"
+        ordering = ["term", "expansion"]
+        constraints = [
+            models.UniqueConstraint(fields=["term", "expansion"], name="uniq_synonym_term_expansion"),
+        ]
+
+    def __str__(self):
+        arrow = "↔" if self.bidirectional else "→"
+        return f"{self.term} {arrow} {self.expansion}"
+
+
 class SearchLog(models.Model):
     """Registro de termos de busca que retornaram poucos ou nenhum resultado.
     Foco: ajudar priorização editorial. Não armazenar IP puro (hash).
+    `term_norm` (sem acento, casefold) é a chave de dedup e de agregação.
     """
     term = models.CharField(max_length=200, db_index=True)
+    term_norm = models.CharField(max_length=200, blank=True, editable=False)
     results_count = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(default=timezone.now, db_index=True)
     ip_hash = models.CharField(max_length=64, blank=True)
@@ -135,11 +175,15 @@ class SearchLog(models.Model):
     class Meta:
         ordering = ["-created_at"]
         indexes = [
-            models.Index(fields=["term", "created_at"]),
+            models.Index(fields=["term_norm", "created_at"]),
         ]
         verbose_name = "Busca sem resultado"
         verbose_name_plural = "Buscas sem resultado"
 
+    def save(self, *args, **kwargs):
+        self.term_norm = normalize_term(self.term)[:200]
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.term} ({self.results_count})"
 
@@ -151,8 +195,10 @@ class AskedTerm(models.Model):
     Regras:
       - Considera apenas palavras com >=4 caracteres alfanuméricos (unicode).
       - Cada palavra é contada no máximo 1 vez por pergunta (se repetir na mesma frase não incrementa duas vezes).
+      - Uma linha por `term_norm` (sem acento, casefold); `term` guarda a primeira grafia vista.
     """
-    term = models.CharField(max_length=200, unique=True, db_index=True)
+    term = models.CharField(max_length=200)
+    term_norm = models.CharField(max_length=200, unique=True, editable=False)
     count = models.PositiveIntegerField(default=0, db_index=True)
     first_seen = models.DateTimeField(default=timezone.now)
     last_seen = models.DateTimeField(default=timezone.now)
@@ -165,10 +211,56 @@ class AskedTerm(models.Model):
             models.Index(fields=["count"]),
         ]
 
+    def save(self, *args, **kwargs):
+        if not self.term_norm:
+            self.term_norm = normalize_term(self.term)[:200]
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.term} ×{self.count}"
 
 
+class SearchTermDaily(models.Model):
+    """Rollup diário de `SearchLog`: um registro por (dia, termo normalizado).
+
+    Mantido por `python manage.py rollup_search_terms` (incremental, a partir do
+    último `SearchLog.id` processado em `SearchRollupState`). Relatórios leem
+    daqui; o `SearchLog` bruto pode ser podado depois de agregado.
+    """
+    day = models.DateField()
+    term_norm = models.CharField(max_length=200)
+    term = models.CharField(max_length=200)  # grafia mais frequente no dia
+    count = models.PositiveIntegerField(default=0)
+    distinct_ips = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-day", "-count"]
+        constraints = [
+            models.UniqueConstraint(fields=["day", "term_norm"], name="uniq_searchtermdaily_day_term"),
+        ]
+        verbose_name = "Busca sem resultado (por dia)"
+        verbose_name_plural = "Buscas sem resultado (por dia)"
+
+    def __str__(self):
+        return f"{self.day} {self.term} ({self.count})"
+
+
+class SearchRollupState(models.Model):
+    """Marca d'água do rollup de `SearchLog` (linha única, pk=1)."""
+
+    last_log_id = models.PositiveBigIntegerField(default=0)
+    # Dias anteriores a este já não têm SearchLog bruto (podados).
+    pruned_before = models.DateField(null=True, blank=True)
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = "Estado do rollup de buscas"
+        verbose_name_plural = "Estado do rollup de buscas"
+
+    def __str__(self):
+        return f"#{self.last_log_id} ({self.updated_at:%Y-%m-%d %H:%M})"
+
+
 class ChecklistSubmission(models.Model):
     """Registro de checklist enviado a partir da view /checklists/.
 
@@ -179,12 +271,16 @@ class ChecklistSubmission(models.Model):
     doctor_name = models.CharField(max_length=120)
     unit = models.CharField(max_length=120)
     text = models.TextField()
-    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
     ip_hash = models.CharField(max_length=64, blank=True)
     user_agent = models.CharField(max_length=300, blank=True)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Faixa do dia + paginação keyset por (created_at, id) na inbox.
+            models.Index(fields=["created_at", "id"]),
+        ]
         verbose_name = "Envio de checklist"
         verbose_name_plural = "Envios de checklist"
 
@@ -220,4 +316,72 @@ class ChecklistDigestLog(models.Model):
         ]
 
     def __str__(self):
-        return f"Digest {self.date} ({self.slot}) — {self.status}"
\ No newline at end of file
+        return f"Digest {self.date} ({self.slot}) — {self.status}"
+
+class RulesVersion(models.Model):
+    """Versão de conteúdo do manual (Rule/RuleCard/RuleBullet/Tag/Category).
+
+    Linha única (pk=1) incrementada pelos signals em `questions.signals` sempre que
+    o conteúdo publicado pode ter mudado. Serve de chave para os snapshots/índices
+    em memória de cada worker: ler a versão custa uma query trivial por PK.
+    """
+
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+    # Entradas de RulesChange com versão <= este valor já foram apagadas (compactação).
+    compacted_through = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Versão do manual"
+        verbose_name_plural = "Versão do manual"
+
+    def __str__(self):
+        return f"v{self.version} ({self.updated_at:%Y-%m-%d %H:%M})"
+
+
+class RulesChange(models.Model):
+    """Diário de alterações do manual, uma linha por nó alterado em cada versão.
+
+    Alimenta `/api/rules/changes/?since=N` (sync incremental do app) e a
+    reindexação parcial da busca. Linhas de tipo tag/categoria são só marcadores:
+    o efeito delas nos bullets/regras é registrado em linhas próprias.
+    """
+
+    KIND_RULE = 'rule'
+    KIND_CARD = 'card'
+    KIND_BULLET = 'bullet'
+    KIND_TAG = 'tag'
+    KIND_CATEGORY = 'category'
+    KIND_SYNONYM = 'synonym'
+    KIND_CHOICES = [
+        (KIND_RULE, 'Regra'),
+        (KIND_CARD, 'Card'),
+        (KIND_BULLET, 'Bullet'),
+        (KIND_TAG, 'Tag'),
+        (KIND_CATEGORY, 'Categoria'),
+        (KIND_SYNONYM, 'Sinônimo'),
+    ]
+    ACTION_UPSERT = 'upsert'
+    ACTION_DELETE = 'delete'
+    ACTION_CHOICES = [
+        (ACTION_UPSERT, 'Criado/alterado'),
+        (ACTION_DELETE, 'Removido'),
+    ]
+
+    version = models.PositiveBigIntegerField()
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    rule_id = models.PositiveBigIntegerField(null=True, blank=True)
+    action = models.CharField(max_length=8, choices=ACTION_CHOICES, default=ACTION_UPSERT)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["version", "id"]
+        indexes = [
+            models.Index(fields=["version"]),
+        ]
+        verbose_name = "Alteração do manual"
+        verbose_name_plural = "Alterações do manual"
+
+    def __str__(self):
+        return f"v{self.version} {self.action} {self.kind}#{self.object_id}"
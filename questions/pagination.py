@@ -0,0 +1,125 @@
+"""Paginação por cursor (keyset/seek) para as inboxes da equipe.
+
+Em vez de `LIMIT/OFFSET` + `COUNT(*)` (`Paginator`), cada página filtra a partir
+da chave da última linha vista, na ordem de um índice composto:
+
+    WHERE (created_at, id) < (:created_at, :id) ORDER BY created_at DESC, id DESC LIMIT n+1
+
+O custo é o mesmo na página 1 e na 500. Os cursores (`next`/`prev` na URL) são
+opacos: JSON com a chave de ordenação e a direção, em base64 url-safe. Cursor
+inválido volta para a primeira página. O total só é contado sob demanda
+(`approximate_count`, com teto).
+"""
+
+import base64
+import datetime
+import json
+from dataclasses import dataclass
+
+from django.db.models import Q
+
+DEFAULT_COUNT_CAP = 10000
+
+
+@dataclass
+class KeysetPage:
+    object_list: list
+    has_next: bool
+    has_previous: bool
+    next_cursor: str | None
+    previous_cursor: str | None
+
+
+def _encode_value(value):
+    if isinstance(value, datetime.datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(key, direction):
+    payload = json.dumps({"k": [_encode_value(v) for v in key], "d": direction}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, size):
+    """(chave, direção) do cursor, ou None se inválido."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        key = [_decode_value(v) for v in payload["k"]]
+        direction = payload["d"]
+    except (ValueError, TypeError, KeyError):
+        return None
+    if len(key) != size or direction not in ("n", "p"):
+        return None
+    return key, direction
+
+
+def _seek(fields, key, op):
+    """Q de (f1, f2, ...) `op` (k1, k2, ...) expandido em ORs (portável entre bancos)."""
+    q = Q()
+    for i, field in enumerate(fields):
+        term = Q(**{f"{field}__{op}": key[i]})
+        for prev_field, prev_value in zip(fields[:i], key[:i]):
+            term &= Q(**{prev_field: prev_value})
+        q |= term
+    return q
+
+
+def keyset_page(qs, fields, *, per_page, after=None, before=None):
+    """Página de `qs` em ordem decrescente de `fields` (o último deve ser único, ex. id).
+
+    `after`/`before`: cursores `next`/`prev` recebidos da página anterior.
+    """
+    fields = tuple(fields)
+    desc = [f"-{f}" for f in fields]
+    asc = list(fields)
+    cursor = decode_cursor(after, len(fields)) or decode_cursor(before, len(fields))
+
+    if cursor is None:
+        rows = list(qs.order_by(*desc)[:per_page + 1])
+        has_previous = False
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+    elif cursor[1] == "n":
+        rows = list(qs.filter(_seek(fields, cursor[0], "lt")).order_by(*desc)[:per_page + 1])
+        has_previous = True
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+    else:
+        rows = list(qs.filter(_seek(fields, cursor[0], "gt")).order_by(*asc)[:per_page + 1])
+        has_next = True
+        has_previous = len(rows) > per_page
+        rows = rows[:per_page][::-1]
+
+    if not rows and cursor is not None:
+        # Cursor apontando para além do fim (linhas apagadas): recomeça.
+        return keyset_page(qs, fields, per_page=per_page)
+
+    def key_of(obj):
+        return [getattr(obj, f) for f in fields]
+
+    return KeysetPage(
+        object_list=rows,
+        has_next=has_next,
+        has_previous=has_previous,
+        next_cursor=encode_cursor(key_of(rows[-1]), "n") if has_next else None,
+        previous_cursor=encode_cursor(key_of(rows[0]), "p") if has_previous else None,
+    )
+
+
+def approximate_count(qs, cap=DEFAULT_COUNT_CAP):
+    """Total de `qs` limitado a `cap` (`COUNT` sobre um `LIMIT cap+1`).
+
+    Retorna (total, is_capped): acima do teto a UI mostra "mais de N".
+    """
+    total = qs.order_by()[:cap + 1].count()
+    return min(total, cap), total > cap
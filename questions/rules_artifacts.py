@@ -0,0 +1,157 @@
+"""Artefatos pré-comprimidos de `/api/rules/` servidos pelo nginx (X-Accel-Redirect).
+
+Para cada versão do manual o snapshot (`rules_cache.get_rules_snapshot`) é gravado
+uma única vez em `settings.RULES_ARTIFACTS_DIR`, com nome pelo sha256 do conteúdo:
+
+    rules-<sha256>.json      (identity)
+    rules-<sha256>.json.gz   (gzip -9)
+    rules-<sha256>.json.br   (brotli q11, se o pacote `brotli` estiver instalado)
+
+A view continua decidindo versão/ETag/304; para o corpo ela só devolve
+`X-Accel-Redirect` para a variante aceita pelo cliente e o nginx entrega o arquivo
+com sendfile, sem comprimir nada em Python a cada request. Como o nome depende só
+do conteúdo, vários workers gravando ao mesmo tempo produzem os mesmos bytes
+(a escrita é atômica via rename).
+"""
+
+import gzip
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+
+try:  # opcional: sem o pacote, só há as variantes identity e gzip
+    import brotli
+except ImportError:  # pragma: no cover - depende do ambiente
+    brotli = None
+
+ENCODING_BR = "br"
+ENCODING_GZIP = "gzip"
+ENCODING_IDENTITY = "identity"
+SUFFIXES = {ENCODING_IDENTITY: "", ENCODING_GZIP: ".gz", ENCODING_BR: ".br"}
+# Artefatos de versões antigas ficam um tempo no disco: um request que já recebeu
+# o X-Accel-Redirect ainda pode estar sendo servido pelo nginx.
+STALE_SECONDS = 3600
+
+# Snapshot digest -> {encoding: nome do arquivo}, por worker.
+_PUBLISHED = {}
+_PUBLISH_LOCK = threading.Lock()
+
+
+def artifacts_dir():
+    return Path(settings.RULES_ARTIFACTS_DIR)
+
+
+def available_encodings():
+    encodings = [ENCODING_GZIP, ENCODING_IDENTITY]
+    if brotli is not None:
+        encodings.insert(0, ENCODING_BR)
+    return encodings
+
+
+def _compress(encoding, body):
+    if encoding == ENCODING_BR:
+        return brotli.compress(body, quality=11, mode=brotli.MODE_TEXT)
+    if encoding == ENCODING_GZIP:
+        # mtime=0: mesmo conteúdo → mesmos bytes em qualquer worker.
+        return gzip.compress(body, compresslevel=9, mtime=0)
+    return body
+
+
+def _write_atomic(path, data):
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _prune(directory, keep_prefix):
+    cutoff = time.time() - STALE_SECONDS
+    for path in directory.glob("rules-*.json*"):
+        if path.name.startswith(keep_prefix):
+            continue
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except OSError:
+            pass
+
+
+def _missing(directory, files):
+    return any(not (directory / name).exists() for name in files.values())
+
+
+def publish_rules_artifacts(snap):
+    """Garante no disco as variantes do snapshot; retorna {encoding: nome do arquivo}.
+
+    O `_prune` de outro worker apaga arquivos por mtime, então o cache do worker é
+    conferido no disco a cada chamada e os arquivos reaproveitados têm o mtime
+    renovado. Retorna None se, mesmo assim, alguma variante não estiver no disco
+    (a view então responde com o corpo pelo Python).
+    """
+    directory = artifacts_dir()
+    files = _PUBLISHED.get(snap.digest)
+    if files is not None and not _missing(directory, files):
+        return files
+    with _PUBLISH_LOCK:
+        files = _PUBLISHED.get(snap.digest)
+        if files is not None and not _missing(directory, files):
+            return files
+        directory.mkdir(parents=True, exist_ok=True)
+        base = f"rules-{snap.digest}.json"
+        files = {}
+        for encoding in available_encodings():
+            name = base + SUFFIXES[encoding]
+            path = directory / name
+            try:
+                os.utime(path)
+            except FileNotFoundError:
+                _write_atomic(path, _compress(encoding, snap.body))
+            files[encoding] = name
+        _prune(directory, base)
+        _PUBLISHED.clear()
+        if _missing(directory, files):
+            return None
+        _PUBLISHED[snap.digest] = files
+    return files
+
+
+def _accepted(header):
+    """Codificações aceitas no Accept-Encoding (q > 0), ignorando parâmetros inválidos."""
+    accepted = set()
+    for part in (header or "").split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if q > 0:
+            accepted.add(name)
+    return accepted
+
+
+def choose_encoding(accept_encoding, encodings):
+    """Melhor variante disponível para o cliente (br > gzip > identity)."""
+    accepted = _accepted(accept_encoding)
+    for encoding in (ENCODING_BR, ENCODING_GZIP):
+        if encoding in encodings and (encoding in accepted or "*" in accepted):
+            return encoding
+    return ENCODING_IDENTITY
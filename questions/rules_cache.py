@@ -0,0 +1,255 @@
+"""Versão de conteúdo do manual + snapshot compilado de `/api/rules/`.
+
+O manual muda poucas vezes por mês, mas `/api/rules/` é chamado a cada abertura da
+página. Em vez de refazer o Prefetch de 4 níveis por request, cada worker guarda o
+JSON já serializado (bytes) junto com um ETag forte, e só reconstrói quando a
+versão em `RulesVersion` muda (bump via signals em `questions.signals`).
+
+A chave do snapshot é (version, updated_at): se uma transação que incrementou a
+versão sofrer rollback, o próximo bump terá outro `updated_at` e não reaproveita
+um snapshot montado com dados que nunca foram commitados.
+"""
+
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import RulesChange, RulesVersion
+from .serializers import (
+    serialize_rule_detail,
+    serialize_rules,
+    serialize_rules_changes,
+    serialize_rules_index,
+)
+
+RULES_VERSION_PK = 1
+
+
+def current_version():
+    """Retorna (version, updated_at) atuais; (0, None) se nunca houve bump."""
+    row = (
+        RulesVersion.objects.filter(pk=RULES_VERSION_PK)
+        .values_list("version", "updated_at")
+        .first()
+    )
+    return row if row else (0, None)
+
+
+def bump_version(changes=()):
+    """Incrementa a versão do manual e registra `changes` no diário (`RulesChange`).
+
+    `changes`: [(kind, object_id, rule_id, action)] — os nós afetados. A versão é
+    incrementada com UPDATE atômico (F) na mesma transação da alteração; o lock
+    da linha serializa escritores, então as versões ficam contíguas e na ordem de
+    commit. O corpo roda em `transaction.atomic()`: mesmo em autocommit o lock
+    vale até a leitura da versão e a gravação do diário, sem outro bump no meio.
+    Retorna a nova versão.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        updated = RulesVersion.objects.filter(pk=RULES_VERSION_PK).update(
+            version=F("version") + 1,
+            updated_at=now,
+        )
+        if not updated:
+            try:
+                with transaction.atomic():
+                    RulesVersion.objects.create(pk=RULES_VERSION_PK, version=1, updated_at=now)
+            except IntegrityError:
+                # Outro processo criou a linha em paralelo: basta incrementar.
+                RulesVersion.objects.filter(pk=RULES_VERSION_PK).update(
+                    version=F("version") + 1,
+                    updated_at=now,
+                )
+        version = current_version()[0]
+        rows = [
+            RulesChange(
+                version=version,
+                kind=kind,
+                object_id=object_id,
+                rule_id=rule_id,
+                action=action,
+                created_at=now,
+            )
+            for kind, object_id, rule_id, action in changes
+        ]
+        RulesChange.objects.bulk_create(rows)
+    return version
+
+
+# Tipos do diário que representam nós do manual (os demais são marcadores).
+NODE_KINDS = (RulesChange.KIND_RULE, RulesChange.KIND_CARD, RulesChange.KIND_BULLET)
+
+
+def changes_between(old_key, new_key):
+    """Regras alteradas entre duas versões (pelo diário), ou None se não dá para saber.
+
+    `old_key`/`new_key` são pares (version, updated_at) de `current_version()`.
+    None quando o intervalo foi compactado, há versões sem registro, algum nó
+    alterado não tem regra conhecida, ou `old_key` não é a versão que está no
+    diário (ex.: montada dentro de uma transação que sofreu rollback) — quem
+    consome faz rebuild completo.
+    """
+    old_version, old_stamp = old_key
+    new_version = new_key[0]
+    if new_version < old_version:
+        return None
+    if new_version == old_version:
+        return set() if old_key == new_key else None
+    if old_version < current_compacted_through():
+        return None
+    rows = RulesChange.objects.filter(version__gte=old_version, version__lte=new_version)
+    seen_versions = set()
+    changed = set()
+    for version, kind, rule_id, created_at in rows.values_list("version", "kind", "rule_id", "created_at"):
+        if version == old_version:
+            if created_at != old_stamp:
+                return None
+            continue
+        seen_versions.add(version)
+        if kind not in NODE_KINDS:
+            continue
+        if rule_id is None:
+            return None
+        changed.add(rule_id)
+    if old_version and old_stamp is None:
+        return None
+    if len(seen_versions) != new_version - old_version:
+        return None
+    return changed
+
+
+def rules_changes_since(since):
+    """Payload de `/api/rules/changes/?since=N` para a versão atual.
+
+    `resync: true` quando o diário não cobre o intervalo (compactado, ou `since`
+    maior que a versão atual — banco restaurado) ou o delta é grande demais:
+    o cliente deve recarregar `/api/rules/` inteiro.
+    """
+    version = current_version()[0]
+    if since > version or since < current_compacted_through():
+        return {"since": since, "version": version, "resync": True}
+    rows = RulesChange.objects.filter(version__gt=since, version__lte=version).values_list(
+        "kind", "object_id"
+    )
+    return serialize_rules_changes(since, version, rows)
+
+
+def compact_changes(before):
+    """Apaga do diário as alterações anteriores a `before` (datetime).
+
+    Clientes com `since` anterior ao ponto de compactação recebem `resync`.
+    Retorna (linhas apagadas, compacted_through).
+    """
+    with transaction.atomic():
+        cutoff = (
+            RulesChange.objects.filter(created_at__lt=before)
+            .order_by("-version")
+            .values_list("version", flat=True)
+            .first()
+        )
+        if cutoff is None:
+            return 0, current_compacted_through()
+        deleted, _ = RulesChange.objects.filter(version__lte=cutoff).delete()
+        RulesVersion.objects.filter(pk=RULES_VERSION_PK, compacted_through__lt=cutoff).update(
+            compacted_through=cutoff
+        )
+        return deleted, max(cutoff, current_compacted_through())
+
+
+def current_compacted_through():
+    return (
+        RulesVersion.objects.filter(pk=RULES_VERSION_PK)
+        .values_list("compacted_through", flat=True)
+        .first()
+    ) or 0
+
+
+def version_etag(key):
+    """ETag derivado só da versão (sem precisar serializar o conteúdo).
+
+    Fraco, porque não é um hash dos bytes: usado no modo streaming de `/api/rules/`.
+    """
+    version, updated_at = key
+    stamp = int(updated_at.timestamp() * 1000) if updated_at else 0
+    return f'W/"rules-{version}-{stamp}"'
+
+
+@dataclass(frozen=True)
+class RulesSnapshot:
+    key: tuple
+    version: int
+    body: bytes
+    etag: str
+    digest: str
+
+
+# Snapshots da versão atual, por nome ("rules", "index", "rule:<slug>"...).
+# Trocar de versão descarta todos de uma vez.
+_SNAPSHOTS = {}
+_SNAPSHOTS_KEY = None
+_SNAPSHOT_LOCK = threading.Lock()
+
+
+def _build_snapshot(name, key, payload):
+    body = json.dumps(payload, cls=DjangoJSONEncoder).encode("utf-8")
+    digest = hashlib.sha256(body).hexdigest()
+    version = key[0]
+    prefix = name.split(":", 1)[0]
+    return RulesSnapshot(
+        key=key, version=version, body=body, etag=f'"{prefix}-{version}-{digest[:20]}"', digest=digest
+    )
+
+
+def get_snapshot(name, build_payload):
+    """Snapshot `name` da versão atual do manual (1 query se já em cache).
+
+    `build_payload()` devolve o objeto a serializar, ou None quando não há
+    conteúdo (ex.: slug inexistente) — nesse caso nada é guardado e retorna None.
+    """
+    global _SNAPSHOTS, _SNAPSHOTS_KEY
+    key = current_version()
+    if _SNAPSHOTS_KEY == key:
+        snap = _SNAPSHOTS.get(name)
+        if snap is not None:
+            return snap
+    with _SNAPSHOT_LOCK:
+        if _SNAPSHOTS_KEY != key:
+            _SNAPSHOTS = {}
+            _SNAPSHOTS_KEY = key
+        snap = _SNAPSHOTS.get(name)
+        if snap is None:
+            payload = build_payload()
+            if payload is None:
+                return None
+            snap = _build_snapshot(name, key, payload)
+            _SNAPSHOTS[name] = snap
+    return snap
+
+
+def get_rules_snapshot():
+    """Snapshot do payload completo de `/api/rules/`."""
+    return get_snapshot("rules", lambda: {"results": serialize_rules()})
+
+
+def get_rules_index_snapshot():
+    """Snapshot do resumo de `/api/rules/index/` (sem cards/bullets)."""
+    return get_snapshot("index", lambda: {"results": serialize_rules_index()})
+
+
+def get_rule_detail_snapshot(slug):
+    """Snapshot de `/api/rules/<slug>/`, ou None se a regra não existe/não está publicada."""
+    return get_snapshot(f"rule:{slug}", lambda: serialize_rule_detail(slug))
+
+
+def clear_snapshot():
+    global _SNAPSHOTS, _SNAPSHOTS_KEY
+    with _SNAPSHOT_LOCK:
+        _SNAPSHOTS = {}
+        _SNAPSHOTS_KEY = None
@@ -0,0 +1,6 @@
+"""Busca server-side nas regras publicadas (bullets, títulos de card/regra e tags).
+
+Os índices vivem em memória em cada worker e são reconstruídos (de forma
+incremental quando possível) sempre que a versão do manual muda; ver
+`questions.rules_cache`.
+"""
@@ -0,0 +1,172 @@
+"""Backends de busca: onde as palavras da consulta viram ids de bullets.
+
+- `python` (padrão): índice invertido em memória (`questions.search.index`),
+  com prefixo, correção de digitação e BM25F próprios.
+- `db`: índice full-text nativo do banco, criado na migração 0006:
+  FTS5 no SQLite (tabela `questions_rulebullet_fts`, mantida por triggers) ou
+  FULLTEXT no MariaDB/MySQL. Nenhum índice é mantido na memória do worker: útil
+  quando o manual (ou vários manuais) não cabe confortavelmente em cada processo.
+
+Escolha via `settings.RULES_SEARCH_BACKEND`. Os backends do banco recebem os
+tokens já normalizados (`questions.text.tokenize`) e devolvem {bullet_id: score};
+publicação, agrupamento e ordem do manual continuam com a camada de cima (um
+`RulesIndex` parcial, só das regras com hits, montado a cada consulta fora do cache).
+
+O backend vale só para `/api/rules/search/`: sugestões (`suggest_rules`), facetas
+(`rules_facets`) e destaques (`match_rules`) continuam no índice em memória,
+carregado no primeiro uso dessas rotas mesmo com `db`.
+"""
+
+from django.conf import settings
+from django.db import connection
+
+from .bm25 import get_boosts
+
+BACKEND_PYTHON = "python"
+BACKEND_DB = "db"
+
+SQLITE_FTS_TABLE = "questions_rulebullet_fts"
+
+
+class SearchBackend:
+    """Interface: `match(tokens, prefix_last, require_all)` → {bullet_id: score}."""
+
+    name = ""
+    # True quando a busca usa o índice em memória (e o payload completo da engine).
+    uses_index = False
+
+    def match(self, tokens, *, prefix_last, require_all):
+        raise NotImplementedError
+
+
+class PythonBackend(SearchBackend):
+    name = BACKEND_PYTHON
+    uses_index = True
+
+    def match(self, tokens, *, prefix_last, require_all):
+        from .engine import bm25_scorer
+        from .index import get_rules_index
+
+        index = get_rules_index()
+        groups = [
+            index.expand(t, prefix=(prefix_last and i == len(tokens) - 1))
+            for i, t in enumerate(tokens)
+        ]
+        matched = index.matching(groups, require_all=require_all)
+        scores = bm25_scorer(index).score(groups) if matched else {}
+        return {bid: scores.get(bid, 0.0) for bid in matched}
+
+
+class SqliteFtsBackend(SearchBackend):
+    """FTS5: um documento por bullet (texto, tags, título do card e da regra)."""
+
+    name = "sqlite-fts5"
+    columns = ("text", "tags", "card_title", "rule_title")
+
+    @staticmethod
+    def available():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [SQLITE_FTS_TABLE]
+            )
+            return cursor.fetchone() is not None
+
+    def match(self, tokens, *, prefix_last, require_all):
+        if not tokens:
+            return {}
+        terms = [
+            f'"{t}"*' if (prefix_last and i == len(tokens) - 1) else f'"{t}"'
+            for i, t in enumerate(tokens)
+        ]
+        expr = (" AND " if require_all else " OR ").join(terms)
+        boosts = get_boosts()
+        # bm25() do FTS5 recebe um peso por coluna indexada; menor = melhor.
+        weights = ", ".join(str(float(boosts[c])) for c in self.columns)
+        sql = (
+            f"SELECT rowid, bm25({SQLITE_FTS_TABLE}, {weights}) FROM {SQLITE_FTS_TABLE} "
+            f"WHERE {SQLITE_FTS_TABLE} MATCH %s"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [expr])
+            return {bid: -rank for bid, rank in cursor.fetchall()}
+
+
+class MysqlFulltextBackend(SearchBackend):
+    """FULLTEXT do MariaDB/MySQL, em modo booleano, uma consulta por token.
+
+    Cada token casa com o texto do bullet, o título do card, o título da regra ou
+    o nome de uma tag do bullet (índices separados, unidos aqui). A relevância do
+    MATCH no texto vira o score, ponderado pelos pesos de `RULES_SEARCH_BOOSTS`.
+    Atenção: o MariaDB ignora tokens menores que `innodb_ft_min_token_size` (3).
+    """
+
+    name = "mysql-fulltext"
+
+    @staticmethod
+    def available():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM information_schema.statistics WHERE table_schema = DATABASE() "
+                "AND table_name = 'questions_rulebullet' AND index_name = 'questions_rulebullet_text_ft'"
+            )
+            return cursor.fetchone() is not None
+
+    @staticmethod
+    def _token_query(term, boosts):
+        """SQL e parâmetros que pontuam os bullets que casam com um termo booleano."""
+        against = "AGAINST (%s IN BOOLEAN MODE)"
+        sql = (
+            f"SELECT b.id, MATCH(b.text) {against} * %s FROM questions_rulebullet b "
+            f"WHERE MATCH(b.text) {against} "
+            f"UNION ALL SELECT b.id, %s FROM questions_rulebullet b "
+            f"JOIN questions_rulecard c ON c.id = b.card_id WHERE MATCH(c.title) {against} "
+            f"UNION ALL SELECT b.id, %s FROM questions_rulebullet b "
+            f"JOIN questions_rulecard c ON c.id = b.card_id "
+            f"JOIN questions_rule r ON r.id = c.rule_id WHERE MATCH(r.title) {against} "
+            f"UNION ALL SELECT bt.rulebullet_id, %s FROM questions_rulebullet_tags bt "
+            f"JOIN questions_tag t ON t.id = bt.tag_id WHERE MATCH(t.name) {against}"
+        )
+        params = [
+            term, boosts["text"], term,
+            boosts["card_title"], term,
+            boosts["rule_title"], term,
+            boosts["tags"], term,
+        ]
+        return sql, params
+
+    def _token_scores(self, cursor, term, boosts):
+        cursor.execute(*self._token_query(term, boosts))
+        scores = {}
+        for bid, score in cursor.fetchall():
+            scores[bid] = scores.get(bid, 0.0) + float(score or 0.0)
+        return scores
+
+    def match(self, tokens, *, prefix_last, require_all):
+        if not tokens:
+            return {}
+        boosts = get_boosts()
+        combined = None
+        with connection.cursor() as cursor:
+            for i, token in enumerate(tokens):
+                term = f"{token}*" if (prefix_last and i == len(tokens) - 1) else token
+                scores = self._token_scores(cursor, term, boosts)
+                if combined is None:
+                    combined = scores
+                elif require_all:
+                    combined = {b: combined[b] + s for b, s in scores.items() if b in combined}
+                else:
+                    for b, s in scores.items():
+                        combined[b] = combined.get(b, 0.0) + s
+                if require_all and not combined:
+                    break
+        return combined or {}
+
+
+def get_search_backend():
+    """Backend configurado; cai no Python se o banco não tiver o índice full-text."""
+    if getattr(settings, "RULES_SEARCH_BACKEND", BACKEND_PYTHON) == BACKEND_DB:
+        if connection.vendor == "sqlite" and SqliteFtsBackend.available():
+            return SqliteFtsBackend()
+        if connection.vendor == "mysql" and MysqlFulltextBackend.available():
+            return MysqlFulltextBackend()
+    return PythonBackend()
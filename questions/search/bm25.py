@@ -0,0 +1,115 @@
+"""Ranking BM25 (variante BM25F com pesos por campo) sobre os bullets do índice.
+
+Campos de um bullet e seus pesos padrão (configuráveis em
+`settings.RULES_SEARCH_BOOSTS`):
+
+- text: texto do bullet;
+- tags: nomes das tags do bullet;
+- card_title: título do card;
+- rule_title: título da regra.
+
+A frequência de um termo num bullet é a soma ponderada das frequências em cada
+campo, e o comprimento do documento é a soma ponderada dos comprimentos. Como
+nada disso depende da consulta, as tabelas (comprimentos, IDF) e o "impacto" de
+cada termo em cada bullet são pré-calculados uma vez por versão do manual; a
+consulta só soma impactos em um vetor (`array`) do tamanho do corpus.
+"""
+
+import math
+from array import array
+
+from django.conf import settings
+
+from ..text import tokenize
+
+DEFAULT_BOOSTS = {
+    "text": 1.0,
+    "tags": 1.5,
+    "card_title": 1.5,
+    "rule_title": 2.0,
+}
+DEFAULT_K1 = 1.2
+DEFAULT_B = 0.75
+
+
+def get_boosts():
+    boosts = dict(DEFAULT_BOOSTS)
+    boosts.update(getattr(settings, "RULES_SEARCH_BOOSTS", None) or {})
+    return boosts
+
+
+class Bm25Scorer:
+    def __init__(self, doc_ids, doc_lengths, idf, postings, impacts):
+        self.doc_ids = doc_ids            # posição → bullet id
+        self.doc_lengths = doc_lengths    # array('d') por posição
+        self.idf = idf                    # termo → IDF
+        self.postings = postings          # termo → array('I') de posições
+        self.impacts = impacts            # termo → array('d') alinhado a postings
+        self.positions = {bid: pos for pos, bid in enumerate(doc_ids)}
+
+    @classmethod
+    def from_index(cls, index, *, boosts=None, k1=None, b=None):
+        boosts = boosts or get_boosts()
+        k1 = getattr(settings, "RULES_SEARCH_BM25_K1", DEFAULT_K1) if k1 is None else k1
+        b = getattr(settings, "RULES_SEARCH_BM25_B", DEFAULT_B) if b is None else b
+
+        doc_ids = sorted(index.bullets, key=lambda bid: index.bullets[bid].sort_key)
+        doc_lengths = array("d")
+        term_freqs = {}  # termo → {posição: tf ponderado}
+        for pos, bid in enumerate(doc_ids):
+            doc = index.bullets[bid]
+            fields = (
+                ("text", tokenize(doc.text)),
+                ("tags", tokenize(" ".join(doc.tags))),
+                ("card_title", tokenize(index.cards[doc.card_id].title)),
+                ("rule_title", tokenize(index.rules[doc.rule_id].title)),
+            )
+            length = 0.0
+            for field, tokens in fields:
+                weight = boosts.get(field, 1.0)
+                length += weight * len(tokens)
+                for t in tokens:
+                    per_doc = term_freqs.setdefault(t, {})
+                    per_doc[pos] = per_doc.get(pos, 0.0) + weight
+            doc_lengths.append(length)
+
+        n_docs = len(doc_ids)
+        avg_len = (sum(doc_lengths) / n_docs) if n_docs else 0.0
+        idf = {}
+        postings = {}
+        impacts = {}
+        for t, per_doc in term_freqs.items():
+            df = len(per_doc)
+            idf[t] = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+            pos_arr = array("I", sorted(per_doc))
+            imp_arr = array("d")
+            for pos in pos_arr:
+                tf = per_doc[pos]
+                norm = k1 * (1.0 - b + b * (doc_lengths[pos] / avg_len if avg_len else 0.0))
+                imp_arr.append(idf[t] * tf * (k1 + 1.0) / (tf + norm))
+            postings[t] = pos_arr
+            impacts[t] = imp_arr
+        return cls(doc_ids, doc_lengths, idf, postings, impacts)
+
+    def score(self, term_groups):
+        """Pontua os bullets para uma consulta.
+
+        `term_groups`: uma lista por palavra da consulta com os termos do índice que
+        a representam (ex.: expansões de prefixo). Dentro de um grupo vale o maior
+        impacto por bullet; entre grupos os scores somam. Retorna {bullet_id: score}.
+        """
+        totals = array("d", bytes(8 * len(self.doc_ids)))
+        for terms in term_groups:
+            if len(terms) == 1:
+                t = next(iter(terms))
+                for pos, w in zip(self.postings.get(t, ()), self.impacts.get(t, ())):
+                    totals[pos] += w
+                continue
+            best = {}
+            for t in terms:
+                for pos, w in zip(self.postings.get(t, ()), self.impacts.get(t, ())):
+                    if w > best.get(pos, 0.0):
+                        best[pos] = w
+            for pos, w in best.items():
+                totals[pos] += w
+        return {self.doc_ids[pos]: s for pos, s in enumerate(totals) if s > 0.0}
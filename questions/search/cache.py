@@ -0,0 +1,127 @@
+"""Cache LRU de resultados da busca de regras, por versão do manual.
+
+Na troca de plantão muita gente busca os mesmos poucos termos em minutos. A
+chave é a consulta normalizada (tokens + se a última palavra é prefixo + opções),
+e o cache inteiro pertence a uma versão do manual: quando a versão muda
+(qualquer edição), as entradas antigas são descartadas de uma vez.
+
+Limites: `settings.RULES_SEARCH_CACHE_SIZE` entradas (0 desliga) e
+`settings.RULES_SEARCH_CACHE_TTL` segundos por entrada.
+
+Instrumentação: `stats()` devolve os contadores (hits, misses, evictions,
+expirations, invalidations) e cada evento dispara o signal `query_cache_event`
+(`event`, `stats`) para quem quiser exportar métricas.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.dispatch import Signal
+
+DEFAULT_SIZE = 512
+DEFAULT_TTL = 300
+
+EVENT_HIT = "hit"
+EVENT_MISS = "miss"
+EVENT_EVICTION = "eviction"
+EVENT_EXPIRATION = "expiration"
+EVENT_INVALIDATION = "invalidation"
+
+# Enviado com sender=QueryCache, event=<EVENT_*> e stats=<dict de contadores>.
+query_cache_event = Signal()
+
+
+class QueryCache:
+    def __init__(self, maxsize=None, ttl=None, clock=time.monotonic):
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._clock = clock
+        self._entries = OrderedDict()  # chave → (expira_em, valor)
+        self._version = None
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(
+            ("hits", "misses", "evictions", "expirations", "invalidations"), 0
+        )
+
+    @property
+    def maxsize(self):
+        if self._maxsize is not None:
+            return self._maxsize
+        return int(getattr(settings, "RULES_SEARCH_CACHE_SIZE", DEFAULT_SIZE))
+
+    @property
+    def ttl(self):
+        if self._ttl is not None:
+            return self._ttl
+        return float(getattr(settings, "RULES_SEARCH_CACHE_TTL", DEFAULT_TTL))
+
+    def _emit(self, event, counter):
+        self._counters[counter] += 1
+        if query_cache_event.receivers:
+            query_cache_event.send(sender=QueryCache, event=event, stats=self.stats())
+
+    def _sync_version(self, version):
+        # chamado com o lock
+        if version != self._version:
+            if self._entries:
+                self._entries.clear()
+                self._emit(EVENT_INVALIDATION, "invalidations")
+            self._version = version
+
+    def get(self, version, key):
+        """Valor em cache para `key` na `version` do manual, ou None."""
+        if self.maxsize <= 0:
+            return None
+        with self._lock:
+            self._sync_version(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self._emit(EVENT_MISS, "misses")
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self._emit(EVENT_EXPIRATION, "expirations")
+                self._emit(EVENT_MISS, "misses")
+                return None
+            self._entries.move_to_end(key)
+            self._emit(EVENT_HIT, "hits")
+            return value
+
+    def set(self, version, key, value):
+        maxsize = self.maxsize
+        if maxsize <= 0:
+            return
+        with self._lock:
+            self._sync_version(version)
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > maxsize:
+                self._entries.popitem(last=False)
+                self._emit(EVENT_EVICTION, "evictions")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+
+    def reset_stats(self):
+        with self._lock:
+            for name in self._counters:
+                self._counters[name] = 0
+
+    def stats(self):
+        lookups = self._counters["hits"] + self._counters["misses"]
+        return {
+            **self._counters,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hit_rate": round(self._counters["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Cache de `/api/rules/search/` (um por worker).
+search_cache = QueryCache()
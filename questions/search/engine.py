@@ -0,0 +1,297 @@
+"""Ponto de entrada da busca de regras usado pelas views (`/api/rules/search/`)."""
+
+import time
+
+from ..models import RuleBullet
+from ..rules_cache import current_version
+from ..text import tokenize
+from .backends import BACKEND_PYTHON, get_search_backend
+from .bm25 import Bm25Scorer
+from .cache import search_cache
+from .facets import FacetIndex
+from .highlight import DEFAULT_SNIPPET_CHARS, MAX_SNIPPET_CHARS, PositionIndex, snippet
+from .index import RulesIndex, get_rules_index
+from .spelling import SpellingDictionary
+from .suggest import Suggester
+from .synonyms import SynonymMap
+
+ORDER_RELEVANCE = "relevance"
+ORDER_MANUAL = "manual"
+MATCH_ALL = "all"
+MATCH_ANY = "any"
+
+
+def bm25_scorer(index):
+    return index.derived("bm25", Bm25Scorer.from_index)
+
+
+def spelling_dictionary(index):
+    return index.derived("spelling", SpellingDictionary.from_index)
+
+
+def suggester(index):
+    return index.derived("suggest", Suggester.from_index)
+
+
+def facet_index(index):
+    return index.derived("facets", FacetIndex.from_index)
+
+
+def synonym_map(index):
+    return index.derived("synonyms", SynonymMap.from_db)
+
+
+def position_index(index):
+    return index.derived("positions", PositionIndex.from_index)
+
+
+def _corrections(index, tokens, groups):
+    """Corrige as palavras que não casaram com nenhum termo do índice.
+
+    Retorna (tokens_corrigidos, grupos_corrigidos) ou None se nada mudou.
+    """
+    fixed_tokens = list(tokens)
+    fixed_groups = list(groups)
+    changed = False
+    speller = None
+    for i, (token, group) in enumerate(zip(tokens, groups)):
+        if group:
+            continue
+        speller = speller or spelling_dictionary(index)
+        fix = speller.correct(token)
+        if fix and fix != token and fix in index.postings:
+            fixed_tokens[i] = fix
+            fixed_groups[i] = [fix]
+            changed = True
+    return (fixed_tokens, fixed_groups) if changed else None
+
+
+def _apply_synonyms(index, tokens, groups, units):
+    """Conjuntos de bullets por unidade (palavra ou expressão) com os sinônimos.
+
+    Cada unidade casa com a forma digitada OU com qualquer alternativa (todas as
+    palavras da alternativa). Para o BM25, os termos das alternativas entram no
+    grupo da primeira palavra da unidade. Retorna (grupos, conjuntos, expansões).
+    """
+    scoring = [list(g) for g in groups]
+    sets = []
+    expanded = []
+    for start, end, alternatives in units:
+        unit = index.matching(groups[start:end], require_all=True)
+        if alternatives:
+            unit = set(unit)
+            for alt in alternatives:
+                alt_groups = [index.expand(t) for t in alt]
+                unit |= index.matching(alt_groups, require_all=True)
+                scoring[start].extend(t for g in alt_groups for t in g if t not in scoring[start])
+            expanded.append({
+                "tokens": " ".join(tokens[start:end]),
+                "alternatives": [" ".join(alt) for alt in alternatives],
+            })
+        sets.append(unit)
+    return scoring, sets, expanded
+
+
+def _resolve(index, query, match, correct, synonyms=True):
+    """Bullets que casam com a consulta, com sinônimos e correção de digitação.
+
+    Retorna (tokens, grupos, bullets, did_you_mean, corrected, expanded).
+    """
+    tokens, groups = index.query_terms(query)
+    require_all = match != MATCH_ANY
+    expanded = []
+    units = synonym_map(index).units(tokens) if synonyms else []
+    if any(alternatives for _, _, alternatives in units):
+        groups, sets, expanded = _apply_synonyms(index, tokens, groups, units)
+        matched = index.matching_sets(sets, require_all=require_all)
+    else:
+        matched = index.matching(groups, require_all=require_all)
+
+    did_you_mean = None
+    corrected = False
+    fixed = _corrections(index, tokens, groups) if correct else None
+    if fixed is not None:
+        did_you_mean = " ".join(fixed[0])
+        if not matched:
+            fixed_matched = index.matching(fixed[1], require_all=require_all)
+            if fixed_matched:
+                tokens, groups = fixed
+                matched = fixed_matched
+                corrected = True
+    return tokens, groups, matched, did_you_mean, corrected, expanded
+
+
+def search_rules(query, *, order=ORDER_RELEVANCE, match=MATCH_ALL, correct=True, synonyms=True):
+    """Executa a consulta e devolve o payload JSON da busca.
+
+    - match="all": bullets com todas as palavras; "any": com qualquer uma.
+    - order="relevance": regras por score BM25; "manual": ordem do manual.
+    - correct=True: palavras desconhecidas geram `did_you_mean`; se a consulta
+      original não trouxe nada, os resultados já vêm da consulta corrigida
+      (`corrected: true`).
+    - synonyms=True: siglas/sinônimos cadastrados (`Synonym`) valem como a forma
+      digitada; as expansões aplicadas vêm em `expanded`.
+
+    Com `RULES_SEARCH_BACKEND=db` a busca vai para o índice full-text do banco
+    (ver `questions.search.backends`); nesse modo não há correção de digitação
+    nem sinônimos (`synonyms` é ignorado e `expanded` vem sempre vazio). O
+    payload tem as mesmas chaves nos dois backends (`backend` diz qual respondeu).
+    Só esta função usa o backend: `suggest_rules`, `rules_facets` e `match_rules`
+    sempre consultam o índice em memória.
+
+    O resultado fica no cache LRU `search_cache` pela consulta normalizada
+    (tokens + prefixo + opções) dentro da versão atual do manual; `cached`
+    indica se veio de lá.
+    """
+    started = time.perf_counter()
+    backend = get_search_backend()
+    if backend.uses_index:
+        index = get_rules_index()
+        version_key = index.version_key
+    else:
+        index = None
+        version_key = current_version()
+    typing = not query[-1:].isspace()
+    cache_key = (backend.name, tuple(tokenize(query)), typing, order, match, correct, synonyms)
+    payload = search_cache.get(version_key, cache_key)
+    cached = payload is not None
+    if not cached:
+        if index is None:
+            payload = _search_rules_db(backend, query, order, match, version_key)
+        else:
+            payload = _search_rules_index(index, query, order, match, correct, synonyms)
+        search_cache.set(version_key, cache_key, payload)
+    return {
+        "q": query,
+        **payload,
+        "cached": cached,
+        "took_ms": round((time.perf_counter() - started) * 1000, 3),
+    }
+
+
+def _search_rules_index(index, query, order, match, correct, synonyms):
+    tokens, groups, matched, did_you_mean, corrected, expanded = _resolve(
+        index, query, match, correct, synonyms
+    )
+
+    scores = None
+    if order == ORDER_RELEVANCE and matched:
+        all_scores = bm25_scorer(index).score(groups)
+        scores = {bid: all_scores.get(bid, 0.0) for bid in matched}
+
+    return {
+        "tokens": tokens,
+        "order": order,
+        "match": match,
+        "version": index.version_key[0] if index.version_key else 0,
+        "did_you_mean": did_you_mean,
+        "corrected": corrected,
+        "expanded": expanded,
+        "total_hits": len(matched),
+        "results": index.group(matched, scores),
+        "backend": BACKEND_PYTHON,
+    }
+
+
+def _search_rules_db(backend, query, order, match, version_key):
+    tokens = tokenize(query)
+    typing = not query[-1:].isspace()
+    scores = backend.match(tokens, prefix_last=typing, require_all=match != MATCH_ANY)
+    # Índice parcial só das regras com hits: filtra o que não está publicado e
+    # reaproveita o agrupamento/ordem do manual do índice em memória.
+    rule_ids = set(
+        RuleBullet.objects.filter(pk__in=list(scores)).values_list("card__rule_id", flat=True)
+    ) if scores else set()
+    index = RulesIndex.for_rules(rule_ids, version_key)
+    matched = {bid for bid in scores if bid in index.bullets}
+    return {
+        "tokens": tokens,
+        "order": order,
+        "match": match,
+        "version": version_key[0],
+        "did_you_mean": None,
+        "corrected": False,
+        "expanded": [],
+        "total_hits": len(matched),
+        "results": index.group(matched, scores if order == ORDER_RELEVANCE else None),
+        "backend": backend.name,
+    }
+
+
+def suggest_rules(prefix, *, limit=8):
+    """Completações (termos e títulos de regras) para o texto digitado."""
+    index = get_rules_index()
+    return {
+        "prefix": prefix,
+        "version": index.version_key[0] if index.version_key else 0,
+        "results": suggester(index).suggest(prefix, limit),
+    }
+
+
+def rules_facets(query="", *, match=MATCH_ALL):
+    """Contagens por tipo de tag, tag e categoria dos bullets que casam com `query`.
+
+    Consulta vazia conta o manual inteiro. Mesma interpretação da busca (última
+    palavra como prefixo), sem correção de digitação.
+    """
+    started = time.perf_counter()
+    index = get_rules_index()
+    facets = facet_index(index)
+    tokens = []
+    matched = None
+    if query.strip():
+        tokens, groups = index.query_terms(query)
+        matched = index.matching(groups, require_all=match != MATCH_ANY) if tokens else None
+    payload = {
+        "q": query,
+        "tokens": tokens,
+        "match": match,
+        "version": index.version_key[0] if index.version_key else 0,
+    }
+    payload.update(facets.counts(matched))
+    payload["took_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    return payload
+
+
+def match_rules(
+    query, *, match=MATCH_ALL, correct=True, synonyms=True, snippet_chars=DEFAULT_SNIPPET_CHARS
+):
+    """Destaques e snippets dos bullets que casam com `query`, na ordem do manual.
+
+    Para cada bullet: `matches` (offsets [início, fim] no texto completo) e
+    `snippet` (trecho de ~`snippet_chars` caracteres com os destaques relativos a
+    ele). Bullets que casaram só por tag/título do card ou da regra vêm com
+    `matches` vazio e o snippet do começo do texto.
+    """
+    started = time.perf_counter()
+    index = get_rules_index()
+    tokens, groups, matched, did_you_mean, corrected, expanded = _resolve(
+        index, query, match, correct, synonyms
+    )
+    positions = position_index(index)
+    width = max(20, min(int(snippet_chars), MAX_SNIPPET_CHARS))
+    terms = {t for g in groups for t in g}
+
+    results = []
+    for bid in sorted(matched, key=lambda b: index.bullets[b].sort_key):
+        doc = index.bullets[bid]
+        spans = positions.spans(bid, terms)
+        results.append({
+            "id": bid,
+            "rule_id": doc.rule_id,
+            "card_id": doc.card_id,
+            "matches": [[s, e] for s, e in spans],
+            "snippet": snippet(doc.text, spans, width),
+        })
+    return {
+        "q": query,
+        "tokens": tokens,
+        "match": match,
+        "version": index.version_key[0] if index.version_key else 0,
+        "did_you_mean": did_you_mean,
+        "corrected": corrected,
+        "expanded": expanded,
+        "total_hits": len(results),
+        "results": results,
+        "took_ms": round((time.perf_counter() - started) * 1000, 3),
+    }
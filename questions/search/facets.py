@@ -0,0 +1,121 @@
+"""Contagens por faceta (tipo de tag, tag, categoria) para `/api/rules/facets/`.
+
+Os bullets do índice recebem uma posição densa na ordem do manual, e cada
+faceta vira um bitset (`int` do Python) com os bits dos seus bullets. Como a
+ordem do manual agrupa os bullets por regra, cada regra ocupa uma faixa contínua
+de bits e tem sua máscara pré-calculada. Para uma consulta:
+
+- bullets da faceta = popcount(bitset da faceta & bitset da consulta);
+- regras da faceta = quantas máscaras de regra intersectam esse resultado.
+
+Nada disso toca o banco depois de construído (uma query em Tag e uma em
+Category por versão do manual); nenhum GROUP BY sobre a tabela M2M bullet↔tag.
+"""
+
+from ..models import Category, Tag
+
+KIND_LABELS = dict(Tag.KIND_CHOICES)
+
+
+def _bitset(bits, size):
+    """Bitset com os `bits` ligados (montado num bytearray: O(n), sem ints intermediários)."""
+    buf = bytearray((size + 7) // 8)
+    for bit in bits:
+        buf[bit >> 3] |= 1 << (bit & 7)
+    return int.from_bytes(buf, "little")
+
+
+class FacetIndex:
+    def __init__(self, positions, rule_masks, tags, kinds, categories):
+        # positions: {bullet_id: bit}; rule_masks: [máscara por regra]
+        self.positions = positions
+        self.rule_masks = rule_masks
+        self.all_bits = (1 << len(positions)) - 1
+        # tags: [(nome, slug, kind, bitset)]; kinds: {kind: bitset};
+        # categories: [(nome, slug, bitset)]
+        self.tags = tags
+        self.kinds = kinds
+        self.categories = categories
+
+    @classmethod
+    def from_index(cls, index):
+        ordered = sorted(index.bullets.values(), key=lambda d: d.sort_key)
+        positions = {}
+        rule_masks = []
+        tag_positions = {}
+        category_positions = {}
+        current_rule = None
+        rule_start = 0
+        for bit, doc in enumerate(ordered):
+            positions[doc.id] = bit
+            if doc.rule_id != current_rule:
+                if current_rule is not None:
+                    rule_masks.append(((1 << bit) - 1) ^ ((1 << rule_start) - 1))
+                current_rule, rule_start = doc.rule_id, bit
+            for name in doc.tags:
+                tag_positions.setdefault(name, []).append(bit)
+            category = index.rules[doc.rule_id].category
+            if category:
+                category_positions.setdefault(category, []).append(bit)
+        if current_rule is not None:
+            rule_masks.append(((1 << len(ordered)) - 1) ^ ((1 << rule_start) - 1))
+        size = len(ordered)
+        tag_bits = {name: _bitset(bits, size) for name, bits in tag_positions.items()}
+        category_bits = {name: _bitset(bits, size) for name, bits in category_positions.items()}
+
+        tags = []
+        kinds = {kind: 0 for kind in KIND_LABELS}
+        for name, slug, kind in Tag.objects.filter(name__in=list(tag_bits)).values_list(
+            "name", "slug", "kind"
+        ):
+            bits = tag_bits[name]
+            tags.append((name, slug, kind, bits))
+            kinds[kind] = kinds.get(kind, 0) | bits
+        tags.sort(key=lambda t: t[0])
+
+        categories = sorted(
+            (name, slug, category_bits[name])
+            for name, slug in Category.objects.filter(name__in=list(category_bits)).values_list(
+                "name", "slug"
+            )
+        )
+        return cls(positions, rule_masks, tags, kinds, categories)
+
+    def bits_for(self, bullet_ids):
+        positions = self.positions
+        return _bitset((positions[bid] for bid in bullet_ids), len(positions))
+
+    def _counts(self, bits):
+        if not bits:
+            return 0, 0
+        return bits.bit_count(), sum(1 for mask in self.rule_masks if bits & mask)
+
+    def counts(self, bullet_ids=None):
+        """Contagens de bullets/regras por faceta, restritas a `bullet_ids` (None = todos)."""
+        selected = self.all_bits if bullet_ids is None else self.bits_for(bullet_ids)
+        total_bullets, total_rules = self._counts(selected)
+
+        kinds = []
+        for kind, label in KIND_LABELS.items():
+            bullets, rules = self._counts(self.kinds.get(kind, 0) & selected)
+            kinds.append({"kind": kind, "label": label, "bullets": bullets, "rules": rules})
+
+        tags = []
+        for name, slug, kind, bits in self.tags:
+            bullets, rules = self._counts(bits & selected)
+            if bullets:
+                tags.append({"name": name, "slug": slug, "kind": kind, "bullets": bullets, "rules": rules})
+        tags.sort(key=lambda t: -t["bullets"])
+
+        categories = []
+        for name, slug, bits in self.categories:
+            bullets, rules = self._counts(bits & selected)
+            if bullets:
+                categories.append({"name": name, "slug": slug, "bullets": bullets, "rules": rules})
+
+        return {
+            "total": {"bullets": total_bullets, "rules": total_rules},
+            "kinds": kinds,
+            "tags": tags,
+            "categories": categories,
+        }
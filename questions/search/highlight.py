@@ -0,0 +1,91 @@
+"""Posições dos termos nos bullets, para destacar trechos e montar snippets no servidor.
+
+Para cada bullet guardamos, por termo normalizado (`questions.text.normalize_term`),
+os offsets (início, fim) das palavras no texto ORIGINAL — com acento e caixa —
+num `array` de inteiros. Destacar uma busca vira só um lookup por termo da
+consulta: o cliente recebe os offsets prontos e não varre texto nenhum.
+
+As posições são calculadas uma vez por versão do índice (`RulesIndex.derived`).
+"""
+
+import bisect
+from array import array
+
+from ..text import word_spans
+
+DEFAULT_SNIPPET_CHARS = 160
+MAX_SNIPPET_CHARS = 400
+# Quanto do snippet fica antes do primeiro destaque (contexto à esquerda).
+SNIPPET_LEAD = 0.25
+
+
+class PositionIndex:
+    def __init__(self, positions):
+        # {bullet_id: {termo: array('I', [ini0, fim0, ini1, fim1, ...])}}
+        self.positions = positions
+
+    @classmethod
+    def from_index(cls, index):
+        positions = {}
+        for doc in index.bullets.values():
+            by_term = {}
+            for key, start, end in word_spans(doc.text):
+                by_term.setdefault(key, array("I")).extend((start, end))
+            positions[doc.id] = by_term
+        return cls(positions)
+
+    def spans(self, bullet_id, terms):
+        """Offsets [(início, fim)] das ocorrências de `terms` no texto, em ordem."""
+        by_term = self.positions.get(bullet_id, {})
+        out = []
+        for term in terms:
+            offsets = by_term.get(term)
+            if offsets:
+                out.extend(zip(offsets[::2], offsets[1::2]))
+        out.sort()
+        return out
+
+
+def _window(spans, length, width):
+    """Início da janela de `width` caracteres que cobre mais destaques."""
+    lead = int(width * SNIPPET_LEAD)
+    ends = [e for _, e in spans]
+    best_start, best_count = 0, -1
+    for i, (start, _) in enumerate(spans):
+        win_start = max(0, min(start - lead, length - width))
+        win_end = win_start + width
+        count = bisect.bisect_right(ends, win_end) - i
+        if count > best_count:
+            best_start, best_count = win_start, count
+    return best_start
+
+
+def snippet(text, spans, width=DEFAULT_SNIPPET_CHARS):
+    """Trecho de ~`width` caracteres em torno dos destaques, sem cortar palavras.
+
+    Retorna {"text", "start", "end", "highlights"}: `start`/`end` são offsets no
+    texto original (start > 0 ou end < len(text) indicam reticências) e
+    `highlights` são relativos ao trecho.
+    """
+    length = len(text)
+    if length <= width:
+        start, end = 0, length
+    else:
+        start = _window(spans, length, width) if spans else 0
+        end = start + width
+        first = spans[0][0] if spans else end
+        # Não corta palavras nas bordas (sem passar do primeiro destaque).
+        if start > 0 and text[start - 1].isalnum():
+            space = text.find(" ", start, first)
+            if space != -1:
+                start = space + 1
+        if end < length and text[end].isalnum():
+            space = text.rfind(" ", start, end)
+            if space > start:
+                end = space
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+    highlights = [[s - start, e - start] for s, e in spans if s >= start and e <= end]
+    return {"text": text[start:end], "start": start, "end": end, "highlights": highlights}
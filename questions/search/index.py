@@ -0,0 +1,323 @@
+"""Índice invertido em memória das regras publicadas.
+
+Cada bullet é um documento. Os termos de um bullet são os do próprio texto, das
+suas tags e também do título do card e da regra a que pertence — assim
+"recusa paciente" encontra bullets que falam de "paciente" dentro da regra
+"Recusa de atendimento". Os termos passam por `questions.text.tokenize`
+(sem acento, casefold, sem stopwords).
+
+O índice é por worker e chaveado pela versão do manual. Quando a versão muda e
+as regras alteradas são conhecidas (`rules_cache.changes_between`), só essas
+regras são reindexadas; caso contrário o índice é reconstruído do zero (o manual
+inteiro são ~1k bullets, 4 queries).
+"""
+
+import bisect
+import threading
+from dataclasses import dataclass
+
+from ..models import Rule, RuleBullet, RuleCard
+from ..rules_cache import changes_between, current_version
+from ..text import tokenize
+
+
+@dataclass(frozen=True)
+class RuleDoc:
+    id: int
+    slug: str
+    title: str
+    category: str
+    sort_key: tuple
+
+
+@dataclass(frozen=True)
+class CardDoc:
+    id: int
+    rule_id: int
+    title: str
+    sort_key: tuple
+
+
+@dataclass(frozen=True)
+class BulletDoc:
+    id: int
+    rule_id: int
+    card_id: int
+    text: str
+    tags: tuple
+    sort_key: tuple
+    terms: frozenset
+
+
+class RulesIndex:
+    def __init__(self):
+        self.version_key = None
+        self.rules = {}
+        self.cards = {}
+        self.bullets = {}
+        self.rule_bullets = {}
+        self.postings = {}
+        self._vocabulary = None
+        self._derived = {}
+
+    # ---- construção ----
+    @classmethod
+    def build(cls, version_key=None):
+        idx = cls()
+        idx.version_key = version_key
+        idx._load_rules(None)
+        return idx
+
+    @classmethod
+    def for_rules(cls, rule_ids, version_key=None):
+        """Índice parcial só com `rule_ids` (publicadas), para agrupar hits vindos do banco."""
+        idx = cls()
+        idx.version_key = version_key
+        idx._load_rules(set(rule_ids))
+        return idx
+
+    def with_rules_reloaded(self, rule_ids, version_key):
+        """Cópia do índice com `rule_ids` reindexadas (copy-on-write: leitores do
+        índice antigo não veem estado parcial)."""
+        new = RulesIndex()
+        new.version_key = version_key
+        new.rules = dict(self.rules)
+        new.cards = dict(self.cards)
+        new.bullets = dict(self.bullets)
+        new.rule_bullets = dict(self.rule_bullets)
+        new.postings = dict(self.postings)
+        new._remove_rules(rule_ids)
+        new._load_rules(rule_ids)
+        return new
+
+    def _remove_bullet(self, bid):
+        doc = self.bullets.pop(bid, None)
+        if doc is None:
+            return None
+        for term in doc.terms:
+            remaining = self.postings.get(term, frozenset()) - {bid}
+            if remaining:
+                self.postings[term] = remaining
+            else:
+                self.postings.pop(term, None)
+        return doc
+
+    def _remove_rules(self, rule_ids):
+        rule_ids = set(rule_ids)
+        for rule_id in rule_ids:
+            self.rules.pop(rule_id, None)
+            self.rule_bullets.pop(rule_id, None)
+        # Pelo doc, não por `rule_bullets`: um bullet movido de regra pode estar
+        # listado na regra antiga e já indexado na nova (ou vice-versa).
+        stale_bullets = [bid for bid, doc in self.bullets.items() if doc.rule_id in rule_ids]
+        for bid in stale_bullets:
+            self._remove_bullet(bid)
+        stale_cards = [cid for cid, c in self.cards.items() if c.rule_id in rule_ids]
+        for cid in stale_cards:
+            del self.cards[cid]
+
+    def _load_rules(self, rule_ids):
+        rules_qs = Rule.objects.filter(is_published=True)
+        cards_qs = RuleCard.objects.filter(is_published=True, rule__is_published=True)
+        bullets_qs = RuleBullet.objects.filter(card__is_published=True, card__rule__is_published=True)
+        tags_qs = RuleBullet.tags.through.objects.filter(
+            rulebullet__card__is_published=True,
+            rulebullet__card__rule__is_published=True,
+        )
+        if rule_ids is not None:
+            rules_qs = rules_qs.filter(pk__in=rule_ids)
+            cards_qs = cards_qs.filter(rule_id__in=rule_ids)
+            bullets_qs = bullets_qs.filter(card__rule_id__in=rule_ids)
+            tags_qs = tags_qs.filter(rulebullet__card__rule_id__in=rule_ids)
+
+        for rid, slug, title, order, category in rules_qs.values_list(
+            "id", "slug", "title", "order", "category__name"
+        ):
+            self.rules[rid] = RuleDoc(rid, slug, title, category or "", (order, title, rid))
+            self.rule_bullets[rid] = []
+
+        for cid, rid, title, order in cards_qs.values_list("id", "rule_id", "title", "order"):
+            self.cards[cid] = CardDoc(cid, rid, title or "", (order, cid))
+
+        added = {}
+        tags_by_bullet = {}
+        for bid, name in tags_qs.order_by("tag__name").values_list("rulebullet_id", "tag__name"):
+            tags_by_bullet.setdefault(bid, []).append(name)
+
+        for bid, cid, text, order in bullets_qs.values_list("id", "card_id", "text", "order"):
+            card = self.cards[cid]
+            rule = self.rules[card.rule_id]
+            tags = tuple(tags_by_bullet.get(bid, ()))
+            terms = frozenset(
+                tokenize(text)
+                + tokenize(" ".join(tags))
+                + tokenize(card.title)
+                + tokenize(rule.title)
+            )
+            moved = self._remove_bullet(bid)
+            if moved is not None and moved.rule_id in self.rule_bullets:
+                # Veio de uma regra que não está sendo reindexada: sai da lista dela
+                # (lista nova; a antiga é compartilhada com o índice anterior).
+                self.rule_bullets[moved.rule_id] = [b for b in self.rule_bullets[moved.rule_id] if b != bid]
+            self.bullets[bid] = BulletDoc(
+                bid, rule.id, cid, text, tags, rule.sort_key + card.sort_key + (order, bid), terms
+            )
+            self.rule_bullets[rule.id].append(bid)
+            for term in terms:
+                added.setdefault(term, []).append(bid)
+
+        for term, bids in added.items():
+            self.postings[term] = self.postings.get(term, frozenset()).union(bids)
+
+    # ---- consulta ----
+    def vocabulary(self):
+        """Termos do índice em ordem (para busca por prefixo com bisect)."""
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.postings)
+        return self._vocabulary
+
+    def derived(self, name, builder):
+        """Estrutura derivada do índice (BM25, sugestões...), calculada uma vez por versão."""
+        value = self._derived.get(name)
+        if value is None:
+            value = builder(self)
+            self._derived[name] = value
+        return value
+
+    def expand(self, term, *, prefix=False):
+        """Termos do índice que representam `term`: ele mesmo ou, como prefixo,
+        todos os termos que começam com ele."""
+        if not prefix:
+            return [term] if term in self.postings else []
+        vocab = self.vocabulary()
+        start = bisect.bisect_left(vocab, term)
+        expanded = []
+        for t in vocab[start:]:
+            if not t.startswith(term):
+                break
+            expanded.append(t)
+        return expanded
+
+    def lookup(self, terms):
+        """União das postings de `terms`."""
+        if len(terms) == 1:
+            return self.postings[terms[0]]
+        matched = set()
+        for t in terms:
+            matched |= self.postings[t]
+        return matched
+
+    def query_terms(self, query):
+        """Tokens da consulta e, para cada um, os termos do índice que o representam.
+
+        A última palavra é tratada como prefixo enquanto o usuário ainda está
+        digitando (consulta sem espaço no fim).
+        """
+        tokens = tokenize(query)
+        typing = not query[-1:].isspace()
+        groups = [
+            self.expand(t, prefix=(typing and i == len(tokens) - 1))
+            for i, t in enumerate(tokens)
+        ]
+        return tokens, groups
+
+    def matching(self, groups, *, require_all=True):
+        """Bullets que casam com todos (ou algum) dos grupos de termos."""
+        if not groups:
+            return set()
+        return self.matching_sets([self.lookup(g) for g in groups], require_all=require_all)
+
+    def matching_sets(self, sets, *, require_all=True):
+        """Combina conjuntos de bullets já resolvidos (um por palavra/expressão)."""
+        if not sets:
+            return set()
+        sets = list(sets)
+        if not require_all:
+            return set().union(*sets)
+        sets.sort(key=len)
+        matched = set(sets[0])
+        for s in sets[1:]:
+            if not matched:
+                break
+            matched &= s
+        return matched
+
+    def match(self, query):
+        """Bullets que contêm todos os termos da consulta."""
+        tokens, groups = self.query_terms(query)
+        return tokens, self.matching(groups)
+
+    def group(self, bullet_ids, scores=None):
+        """Agrupa bullets por regra → card, com contagem de hits.
+
+        Sem `scores` as regras seguem a ordem do manual; com `scores`
+        ({bullet_id: score}) seguem o melhor score de cada regra. Dentro da regra,
+        cards e bullets ficam sempre na ordem do manual.
+        """
+        by_rule = {}
+        for bid in sorted(bullet_ids, key=lambda b: self.bullets[b].sort_key):
+            doc = self.bullets[bid]
+            by_rule.setdefault(doc.rule_id, {}).setdefault(doc.card_id, []).append(bid)
+
+        results = []
+        for rule_id, cards in by_rule.items():
+            rule = self.rules[rule_id]
+            card_objs = []
+            for cid, bids in cards.items():
+                card_obj = {
+                    "id": cid,
+                    "title": self.cards[cid].title,
+                    "hits": len(bids),
+                    "bullet_ids": bids,
+                }
+                if scores is not None:
+                    card_obj["score"] = round(max(scores.get(b, 0.0) for b in bids), 4)
+                card_objs.append(card_obj)
+            rule_obj = {
+                "id": rule.id,
+                "slug": rule.slug,
+                "title": rule.title,
+                "category": rule.category,
+                "hits": sum(c["hits"] for c in card_objs),
+                "cards": card_objs,
+            }
+            if scores is not None:
+                rule_obj["score"] = max(c["score"] for c in card_objs)
+            results.append(rule_obj)
+
+        if scores is not None:
+            # sort estável: empates mantêm a ordem do manual
+            results.sort(key=lambda r: -r["score"])
+        return results
+
+
+_INDEX = None
+_INDEX_LOCK = threading.Lock()
+
+
+def get_rules_index():
+    """Índice da versão atual do manual (1 query por PK quando já está em dia)."""
+    global _INDEX
+    key = current_version()
+    idx = _INDEX
+    if idx is not None and idx.version_key == key:
+        return idx
+    with _INDEX_LOCK:
+        idx = _INDEX
+        if idx is not None and idx.version_key == key:
+            return idx
+        changed = None
+        if idx is not None and idx.version_key is not None:
+            changed = changes_between(idx.version_key, key)
+        if changed is None:
+            idx = RulesIndex.build(key)
+        else:
+            idx = idx.with_rules_reloaded(changed, key)
+        _INDEX = idx
+    return idx
+
+
+def clear_rules_index():
+    global _INDEX
+    with _INDEX_LOCK:
+        _INDEX = None
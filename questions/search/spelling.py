@@ -0,0 +1,107 @@
+"""Correção de digitação no estilo SymSpell (dicionário de deleções pré-calculado).
+
+O vocabulário vem do texto dos bullets e dos títulos das regras publicadas
+(normalizados por `questions.text.tokenize`, com a frequência de cada termo).
+Para cada termo guardamos todas as variantes obtidas apagando até
+`MAX_EDIT_DISTANCE` caracteres dos primeiros `PREFIX_LENGTH` caracteres; na
+consulta geramos as deleções da palavra digitada e cruzamos com esse dicionário.
+O custo de corrigir uma palavra depende só do tamanho dela, não do vocabulário.
+
+Ex.: "recuza" → "recusa", "biosegurança" → "biosseguranca".
+"""
+
+from ..text import tokenize
+
+MAX_EDIT_DISTANCE = 2
+PREFIX_LENGTH = 7
+# Palavras curtas demais geram correções aleatórias ("cena" → "pena").
+MIN_TOKEN_LENGTH = 4
+
+
+def _deletes(word, max_distance):
+    """Todas as strings obtidas removendo até `max_distance` caracteres de `word`."""
+    out = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        nxt = set()
+        for w in frontier:
+            if len(w) <= 1:
+                continue
+            for i in range(len(w)):
+                nxt.add(w[:i] + w[i + 1:])
+        nxt -= out
+        out |= nxt
+        frontier = nxt
+    return out
+
+
+def edit_distance(a, b, max_distance):
+    """Distância de Damerau-Levenshtein (OSA); devolve max_distance + 1 se exceder."""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        row_min = cur[0]
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if prev2 is not None and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+            row_min = min(row_min, cur[j])
+        if row_min > max_distance:
+            return max_distance + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+def max_distance_for(word):
+    return 1 if len(word) <= 5 else MAX_EDIT_DISTANCE
+
+
+class SpellingDictionary:
+    def __init__(self, frequencies):
+        self.frequencies = frequencies  # termo → nº de ocorrências
+        self.deletes = {}               # deleção → [termos]
+        for term in frequencies:
+            for d in _deletes(term[:PREFIX_LENGTH], MAX_EDIT_DISTANCE):
+                self.deletes.setdefault(d, []).append(term)
+
+    @classmethod
+    def from_index(cls, index):
+        frequencies = {}
+        texts = [doc.text for doc in index.bullets.values()]
+        texts.extend(rule.title for rule in index.rules.values())
+        for text in texts:
+            for t in tokenize(text):
+                if len(t) >= MIN_TOKEN_LENGTH and not t.isdigit():
+                    frequencies[t] = frequencies.get(t, 0) + 1
+        return cls(frequencies)
+
+    def correct(self, word):
+        """Melhor correção para `word` (menor distância, depois maior frequência).
+
+        Devolve a própria palavra se ela já está no vocabulário, ou None se não há
+        candidato dentro da distância máxima.
+        """
+        if word in self.frequencies:
+            return word
+        if len(word) < MIN_TOKEN_LENGTH or word.isdigit():
+            return None
+        max_distance = max_distance_for(word)
+        seen = set()
+        best = None
+        best_key = None
+        for d in _deletes(word[:PREFIX_LENGTH], max_distance):
+            for term in self.deletes.get(d, ()):
+                if term in seen:
+                    continue
+                seen.add(term)
+                dist = edit_distance(word, term, max_distance)
+                if dist > max_distance:
+                    continue
+                key = (dist, -self.frequencies[term], term)
+                if best_key is None or key < best_key:
+                    best, best_key = term, key
+        return best
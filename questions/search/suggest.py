@@ -0,0 +1,102 @@
+"""Autocomplete de termos e títulos de regras (`/api/rules/suggest/`).
+
+As entradas ficam em arrays paralelos ordenados pela chave normalizada
+(`questions.text.normalize_term`), com um peso pré-calculado (frequência do
+termo no manual; títulos de regras recebem um bônus). Cada tecla vira um
+`bisect` para achar a faixa de chaves com o prefixo; prefixos de 1–2 letras,
+cujas faixas são grandes, têm o top-N pré-calculado.
+"""
+
+import bisect
+import heapq
+from array import array
+
+from ..text import normalize_term, surface_words
+
+KIND_TERM = "term"
+KIND_RULE = "rule"
+MIN_TERM_LENGTH = 3
+RULE_TITLE_BONUS = 1000
+PRECOMPUTED_PREFIX_LENGTH = 2
+MAX_LIMIT = 20
+
+
+class Suggester:
+    def __init__(self, entries):
+        # entries: [(chave, texto, tipo, slug, peso)]
+        entries = sorted(entries, key=lambda e: (e[0], -e[4]))
+        self.keys = [e[0] for e in entries]
+        self.labels = [e[1] for e in entries]
+        self.kinds = [e[2] for e in entries]
+        self.slugs = [e[3] for e in entries]
+        self.weights = array("l", (e[4] for e in entries))
+        self._top = {}
+        for length in range(1, PRECOMPUTED_PREFIX_LENGTH + 1):
+            for prefix in {k[:length] for k in self.keys if len(k) >= length}:
+                self._top[prefix] = self._rank(prefix, MAX_LIMIT)
+
+    @classmethod
+    def from_index(cls, index):
+        counts = {}
+        surfaces = {}
+        for doc in index.bullets.values():
+            for key, word in surface_words(doc.text):
+                if len(key) < MIN_TERM_LENGTH or key.isdigit():
+                    continue
+                counts[key] = counts.get(key, 0) + 1
+                forms = surfaces.setdefault(key, {})
+                forms[word] = forms.get(word, 0) + 1
+
+        entries = []
+        for key, n in counts.items():
+            forms = surfaces[key]
+            label = max(forms, key=lambda w: (forms[w], w))
+            entries.append((key, label, KIND_TERM, "", n))
+        for rule in index.rules.values():
+            weight = RULE_TITLE_BONUS + len(index.rule_bullets.get(rule.id, ()))
+            entries.append((normalize_term(rule.title), rule.title, KIND_RULE, rule.slug, weight))
+        return cls(entries)
+
+    def _range(self, prefix):
+        lo = bisect.bisect_left(self.keys, prefix)
+        hi = bisect.bisect_left(self.keys, prefix + "\U0010ffff", lo)
+        return lo, hi
+
+    def _rank(self, prefix, limit):
+        lo, hi = self._range(prefix)
+        return heapq.nsmallest(limit, range(lo, hi), key=lambda i: (-self.weights[i], self.keys[i]))
+
+    def suggest(self, prefix, limit=8):
+        """Top `limit` completações para o texto digitado.
+
+        Títulos de regra casam com o texto inteiro; termos completam a última palavra
+        (as anteriores são mantidas no texto sugerido).
+        """
+        limit = max(1, min(int(limit), MAX_LIMIT))
+        norm = normalize_term(prefix)
+        if not norm:
+            return []
+        head, _, last = norm.rpartition(" ")
+        head_raw = prefix.strip().rpartition(" ")[0]
+
+        candidates = self._top.get(norm)
+        if candidates is None:
+            candidates = self._rank(norm, limit)
+        out = [self._entry(i, "") for i in candidates if self.kinds[i] == KIND_RULE or not head]
+
+        if head and last:
+            term_candidates = self._top.get(last)
+            if term_candidates is None:
+                term_candidates = self._rank(last, limit)
+            out.extend(
+                self._entry(i, head_raw) for i in term_candidates if self.kinds[i] == KIND_TERM
+            )
+        out.sort(key=lambda e: -e["weight"])
+        return out[:limit]
+
+    def _entry(self, i, head):
+        text = self.labels[i] if not head else f"{head} {self.labels[i]}"
+        entry = {"text": text, "kind": self.kinds[i], "weight": self.weights[i]}
+        if self.kinds[i] == KIND_RULE:
+            entry["slug"] = self.slugs[i]
+        return entry
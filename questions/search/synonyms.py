@@ -0,0 +1,155 @@
+"""Siglas e sinônimos da terminologia do SAMU aplicados à busca de regras.
+
+Os registros ativos de `Synonym` são compilados, uma vez por versão do manual,
+num dict {tupla de tokens: (alternativas...)} — cada alternativa também é uma
+tupla de tokens normalizados (`questions.text.tokenize`). Na consulta, cada
+posição testa as n-gramas que começam nela (n ≤ maior chave) com lookups O(1):
+
+    "pcr adulto"  → (pcr) ≡ (parada, cardiorrespiratoria)
+    "unidade de suporte avançado" → (unidade, suporte, avancado) ≡ (usa)
+
+`propose_synonyms` sugere pares novos a partir de `SearchLog`/`AskedTerm`
+(ver o comando `propose_synonyms`).
+"""
+
+import datetime
+from collections import Counter
+
+from django.db.models import Count
+from django.utils import timezone
+
+from ..models import AskedTerm, SearchLog, Synonym
+from ..text import tokenize
+
+
+class SynonymMap:
+    def __init__(self, mapping):
+        self.mapping = mapping
+        self.max_len = max((len(k) for k in mapping), default=0)
+
+    @classmethod
+    def from_db(cls, index=None):
+        mapping = {}
+
+        def add(key, alternative):
+            if key and alternative and key != alternative:
+                alts = mapping.setdefault(key, [])
+                if alternative not in alts:
+                    alts.append(alternative)
+
+        for term, expansion, bidirectional in Synonym.objects.filter(is_active=True).values_list(
+            "term", "expansion", "bidirectional"
+        ):
+            key, alternative = tuple(tokenize(term)), tuple(tokenize(expansion))
+            add(key, alternative)
+            if bidirectional:
+                add(alternative, key)
+        return cls({k: tuple(v) for k, v in mapping.items()})
+
+    def units(self, tokens):
+        """Divide os tokens em unidades [(início, fim, alternativas)].
+
+        Em cada posição vale a n-grama mais longa com sinônimos; tokens sem
+        sinônimo viram unidades de um token com alternativas vazias.
+        """
+        out = []
+        i = 0
+        while i < len(tokens):
+            found = None
+            for n in range(min(self.max_len, len(tokens) - i), 0, -1):
+                alternatives = self.mapping.get(tuple(tokens[i:i + n]))
+                if alternatives:
+                    found = (i, i + n, alternatives)
+                    break
+            if found is None:
+                found = (i, i + 1, ())
+            out.append(found)
+            i = found[1]
+        return out
+
+
+# ---- sugestões para a curadoria ----
+
+def _manual_phrases(index, max_words=5):
+    """Iniciais → Counter de expressões do manual (n-gramas de 2..max_words palavras)."""
+    by_initials = {}
+    texts = [doc.text for doc in index.bullets.values()]
+    texts += [card.title for card in index.cards.values()]
+    texts += [rule.title for rule in index.rules.values()]
+    for text in texts:
+        tokens = tokenize(text)
+        for n in range(2, max_words + 1):
+            for i in range(len(tokens) - n + 1):
+                words = tokens[i:i + n]
+                initials = "".join(w[0] for w in words)
+                by_initials.setdefault(initials, Counter())[" ".join(words)] += 1
+    return by_initials
+
+
+def propose_synonyms(index, *, days=90, min_count=2, limit=50):
+    """Candidatos a sinônimo para termos buscados que o manual não cobre.
+
+    Para cada termo frequente (`SearchLog` dos últimos `days` dias + `AskedTerm`)
+    sem hits no índice atual, sugere expressões do manual cujas iniciais formam o
+    termo ("sigla": USA → unidade de suporte avançado).
+
+    Não há sugestão por reformulação (a busca seguinte da mesma pessoa): o
+    `SearchLog` só guarda buscas sem resultado, então a busca que deu certo não
+    fica registrada.
+
+    Retorna [{"term", "count", "candidate", "reason", "support", "hits"}], do mais
+    frequente para o menos; ignora pares já cadastrados.
+    """
+    since = timezone.now() - datetime.timedelta(days=days)
+    counts = Counter()
+    for term, n in (
+        SearchLog.objects.filter(created_at__gte=since)
+        .order_by()
+        .values("term_norm")
+        .annotate(n=Count("id"))
+        .values_list("term_norm", "n")
+    ):
+        counts[term] += n
+    for term, n in AskedTerm.objects.values_list("term_norm", "count"):
+        counts[term] += n
+
+    hit_cache = {}
+
+    def hits(text):
+        if text not in hit_cache:
+            tokens = tokenize(text)
+            hit_cache[text] = len(index.matching([index.expand(t) for t in tokens])) if tokens else 0
+        return hit_cache[text]
+
+    missing = {t: n for t, n in counts.items() if n >= min_count and t and not hits(t)}
+    if not missing:
+        return []
+
+    existing = {
+        (" ".join(tokenize(a)), " ".join(tokenize(b)))
+        for a, b in Synonym.objects.values_list("term", "expansion")
+    }
+    phrases = _manual_phrases(index)
+    candidates = {}
+
+    def add(term, candidate, reason, support):
+        if (term, candidate) in existing or (candidate, term) in existing or candidate == term:
+            return
+        key = (term, candidate)
+        current = candidates.get(key)
+        if current is None or support > current["support"]:
+            candidates[key] = {
+                "term": term,
+                "count": missing[term],
+                "candidate": candidate,
+                "reason": reason,
+                "support": support,
+                "hits": hits(candidate),
+            }
+
+    for term in missing:
+        for phrase, n in phrases.get(term, Counter()).most_common(3):
+            add(term, phrase, "sigla", n)
+
+    ranked = sorted(candidates.values(), key=lambda c: (-c["count"], -c["support"], c["term"], c["candidate"]))
+    return ranked[:limit]
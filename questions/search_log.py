@@ -0,0 +1,206 @@
+"""Gravação dos termos de buscas sem resultado (`SearchLog`).
+
+A telemetria não deve pesar no request do usuário. Com o buffer ligado
+(`settings.SEARCH_LOG_BUFFER_SIZE` > 0), cada worker acumula os termos em
+memória e grava tudo de uma vez (1 SELECT + 1 bulk INSERT):
+
+- quando o buffer chega a `SEARCH_LOG_BUFFER_SIZE` termos;
+- `SEARCH_LOG_BUFFER_SECONDS` depois do primeiro termo pendente (timer);
+- na saída do worker do gunicorn (`samu_q/gunicorn_conf.py`) ou do processo.
+
+A janela de 2h continua valendo: termos já gravados/pendentes neste worker são
+descartados em memória, e o SELECT do flush descarta os que outros workers
+gravaram. Com `SEARCH_LOG_BUFFER_SIZE=0` (padrão) a gravação é síncrona;
+produção liga o buffer pelo `.env.prod`.
+"""
+
+import atexit
+import datetime
+import logging
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+from .models import SearchLog
+
+logger = logging.getLogger(__name__)
+
+DEDUP_WINDOW = datetime.timedelta(hours=2)
+DEFAULT_BUFFER_SIZE = 0
+DEFAULT_BUFFER_SECONDS = 30
+# Teto do mapa de termos recentes em memória (o resto cai no SELECT do flush).
+MAX_RECENT = 20000
+
+
+def _recent_terms(keys, cutoff):
+    """Chaves (`term_norm`) de `keys` já registradas desde `cutoff` — 1 query."""
+    if not keys:
+        return set()
+    return set(
+        SearchLog.objects.filter(term_norm__in=list(keys), created_at__gte=cutoff)
+        .values_list("term_norm", flat=True)
+    )
+
+
+def _search_log(key, term, ip_hash, user_agent, created_at=None):
+    # bulk_create não chama save(): `term_norm` vai preenchido aqui.
+    obj = SearchLog(term=term[:200], term_norm=key[:200], results_count=0, ip_hash=ip_hash, user_agent=user_agent)
+    if created_at is not None:
+        obj.created_at = created_at
+    return obj
+
+
+def write_search_terms(words, ip_hash="", user_agent=""):
+    """Grava já os termos fora da janela de 2h.
+
+    `words`: {`normalize_term(termo)`: termo como digitado}. Retorna (gravados, recentes).
+    """
+    recent = _recent_terms(words, timezone.now() - DEDUP_WINDOW)
+    rows = [_search_log(key, w, ip_hash, user_agent) for key, w in words.items() if key not in recent]
+    ignored = [w for key, w in words.items() if key in recent]
+    SearchLog.objects.bulk_create(rows)
+    return [row.term for row in rows], ignored
+
+
+class SearchLogBuffer:
+    def __init__(self, size=None, seconds=None):
+        self._size = size
+        self._seconds = seconds
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = {}  # chave → SearchLog ainda não gravado
+        self._recent = {}  # chave → datetime em que entrou (janela de 2h)
+        self._timer = None
+
+    @property
+    def size(self):
+        if self._size is not None:
+            return self._size
+        return int(getattr(settings, "SEARCH_LOG_BUFFER_SIZE", DEFAULT_BUFFER_SIZE))
+
+    @property
+    def seconds(self):
+        if self._seconds is not None:
+            return self._seconds
+        return float(getattr(settings, "SEARCH_LOG_BUFFER_SECONDS", DEFAULT_BUFFER_SECONDS))
+
+    @property
+    def enabled(self):
+        return self.size > 0
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, words, ip_hash="", user_agent=""):
+        """Enfileira os termos; retorna (aceitos, recentes) sem tocar no banco.
+
+        Se o buffer encher, grava na hora (no request que encheu).
+        """
+        now = timezone.now()
+        cutoff = now - DEDUP_WINDOW
+        accepted = []
+        ignored = []
+        with self._lock:
+            for key, w in words.items():
+                seen = self._recent.get(key)
+                if seen is not None and seen >= cutoff:
+                    ignored.append(w)
+                    continue
+                self._recent[key] = now
+                self._pending[key] = _search_log(key, w, ip_hash, user_agent, created_at=now)
+                accepted.append(w)
+            full = len(self._pending) >= self.size
+            if self._pending and not full and self._timer is None:
+                self._timer = threading.Timer(self.seconds, self._flush_from_timer)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+        return accepted, ignored
+
+    def _flush_from_timer(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("search log: falha ao gravar o buffer")
+        finally:
+            # Thread própria: não deixa a conexão aberta.
+            connection.close()
+
+    def flush(self):
+        """Grava os pendentes: 1 SELECT (janela de 2h entre workers) + 1 bulk INSERT."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                self._prune(timezone.now() - DEDUP_WINDOW)
+            if not pending:
+                return 0
+            try:
+                recent = _recent_terms(pending, min(o.created_at for o in pending.values()) - DEDUP_WINDOW)
+                rows = [obj for key, obj in pending.items() if key not in recent]
+                with transaction.atomic():
+                    SearchLog.objects.bulk_create(rows)
+            except Exception:
+                # Telemetria: não derruba o request nem acumula sem limite. Os
+                # termos descartados saem de `_recent`, senão ficariam 2h
+                # rejeitados neste worker sem nunca terem sido gravados.
+                logger.exception("search log: descartando %d termos", len(pending))
+                with self._lock:
+                    for key, obj in pending.items():
+                        if self._recent.get(key) == obj.created_at:
+                            del self._recent[key]
+                return 0
+            return len(rows)
+
+    def _prune(self, cutoff):
+        # chamado com o lock
+        recent = self._recent
+        if len(recent) > MAX_RECENT:
+            recent.clear()
+        else:
+            for key in [k for k, seen in recent.items() if seen < cutoff]:
+                del recent[key]
+
+    def clear(self):
+        with self._lock:
+            self._pending.clear()
+            self._recent.clear()
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+
+search_log_buffer = SearchLogBuffer()
+
+
+def record_search_terms(words, ip_hash="", user_agent=""):
+    """Registra termos sem resultado: no buffer do worker ou direto no banco.
+
+    Retorna (aceitos, recentes, bufferizado).
+    """
+    if search_log_buffer.enabled:
+        accepted, ignored = search_log_buffer.add(words, ip_hash, user_agent)
+        return accepted, ignored, True
+    logged, ignored = write_search_terms(words, ip_hash, user_agent)
+    return logged, ignored, False
+
+
+def flush_search_log_buffer():
+    """Grava o que estiver pendente (saída do worker/processo)."""
+    if not len(search_log_buffer):
+        return
+    close_old_connections()
+    try:
+        written = search_log_buffer.flush()
+        logger.info("search log: %d termos gravados na saída", written)
+    finally:
+        connection.close()
+
+
+atexit.register(flush_search_log_buffer)
+
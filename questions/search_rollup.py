@@ -0,0 +1,173 @@
+"""Rollup diário das buscas sem resultado (`SearchLog` → `SearchTermDaily`).
+
+Incremental por marca d'água (`SearchRollupState.last_log_id`): cada execução
+olha só os `SearchLog` com id acima da marca para descobrir os dias tocados e
+recalcula esses dias inteiros a partir do bruto (contagem, IPs distintos e a
+grafia mais frequente por `term_norm`). Recalcular o dia inteiro mantém
+`distinct_ips` exato e absorve linhas que tenham sido gravadas fora de ordem.
+
+Depois de agregado, o bruto pode ser podado (`prune_search_log`). Dias já
+podados não são mais recalculados: linhas atrasadas para eles são somadas ao
+rollup existente.
+"""
+
+import datetime
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from .models import SearchLog, SearchRollupState, SearchTermDaily
+
+STATE_PK = 1
+BATCH = 2000
+REPORT_WINDOWS = (1, 7, 30)
+
+
+def _state(for_update=False):
+    qs = SearchRollupState.objects.select_for_update() if for_update else SearchRollupState.objects
+    state, _ = qs.get_or_create(pk=STATE_PK)
+    return state
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+
+
+def _aggregate(rows):
+    """[(term_norm, term, ip_hash)] → {term_norm: (count, distinct_ips, grafia)}."""
+    acc = {}
+    for norm, term, ip in rows:
+        entry = acc.get(norm)
+        if entry is None:
+            entry = acc[norm] = [0, set(), Counter()]
+        entry[0] += 1
+        if ip:
+            entry[1].add(ip)
+        entry[2][term] += 1
+    return {
+        norm: (count, len(ips), spellings.most_common(1)[0][0])
+        for norm, (count, ips, spellings) in acc.items()
+    }
+
+
+def _day_rows(day, **filters):
+    start, end = _day_start(day), _day_start(day + datetime.timedelta(days=1))
+    return (
+        SearchLog.objects.filter(created_at__gte=start, created_at__lt=end, **filters)
+        .order_by()
+        .values_list("term_norm", "term", "ip_hash")
+        .iterator(chunk_size=BATCH)
+    )
+
+
+def _rebuild_day(day, upto):
+    totals = _aggregate(_day_rows(day, pk__lte=upto))
+    SearchTermDaily.objects.filter(day=day).delete()
+    SearchTermDaily.objects.bulk_create(
+        [
+            SearchTermDaily(day=day, term_norm=norm, term=term, count=count, distinct_ips=ips)
+            for norm, (count, ips, term) in totals.items()
+        ],
+        batch_size=500,
+    )
+
+
+def _merge_day(day, after, upto):
+    """Soma ao rollup de um dia já podado só as linhas novas (IPs distintos aproximados)."""
+    totals = _aggregate(_day_rows(day, pk__gt=after, pk__lte=upto))
+    existing = {row.term_norm: row for row in SearchTermDaily.objects.filter(day=day, term_norm__in=list(totals))}
+    new = []
+    for norm, (count, ips, term) in totals.items():
+        row = existing.get(norm)
+        if row is None:
+            new.append(SearchTermDaily(day=day, term_norm=norm, term=term, count=count, distinct_ips=ips))
+        else:
+            row.count += count
+            row.distinct_ips += ips
+    SearchTermDaily.objects.bulk_update(existing.values(), ["count", "distinct_ips"], batch_size=500)
+    SearchTermDaily.objects.bulk_create(new, batch_size=500)
+
+
+def rollup_search_terms():
+    """Agrega os `SearchLog` novos desde a última execução.
+
+    Retorna {"rows": linhas novas de SearchLog, "days": [dias recalculados], "watermark": id}.
+    """
+    with transaction.atomic():
+        state = _state(for_update=True)
+        after = state.last_log_id
+        upto = SearchLog.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+        if upto <= after:
+            return {"rows": 0, "days": [], "watermark": after}
+
+        days = set()
+        rows = 0
+        for created_at in (
+            SearchLog.objects.filter(pk__gt=after, pk__lte=upto)
+            .order_by()
+            .values_list("created_at", flat=True)
+            .iterator(chunk_size=BATCH)
+        ):
+            days.add(timezone.localdate(created_at))
+            rows += 1
+
+        for day in sorted(days):
+            if state.pruned_before and day < state.pruned_before:
+                _merge_day(day, after, upto)
+            else:
+                _rebuild_day(day, upto)
+
+        state.last_log_id = upto
+        state.updated_at = timezone.now()
+        state.save(update_fields=["last_log_id", "updated_at"])
+    return {"rows": rows, "days": sorted(days), "watermark": upto}
+
+
+def prune_search_log(keep_days):
+    """Apaga o `SearchLog` já agregado de dias anteriores a hoje - `keep_days`.
+
+    Só remove linhas até a marca d'água (nunca o que o rollup ainda não viu).
+    Retorna (linhas apagadas, primeiro dia mantido).
+    """
+    keep_from = timezone.localdate() - datetime.timedelta(days=keep_days)
+    state = _state()
+    qs = SearchLog.objects.filter(created_at__lt=_day_start(keep_from), pk__lte=state.last_log_id)
+    deleted = 0
+    while True:
+        ids = list(qs.order_by("pk").values_list("pk", flat=True)[:BATCH])
+        if not ids:
+            break
+        deleted += SearchLog.objects.filter(pk__in=ids).delete()[0]
+    if state.pruned_before is None or keep_from > state.pruned_before:
+        SearchRollupState.objects.filter(pk=STATE_PK).update(pruned_before=keep_from)
+    return deleted, keep_from
+
+
+def top_missing_terms(days, limit=30):
+    """Termos sem resultado mais buscados nos últimos `days` dias (hoje incluso).
+
+    [{"term_norm", "label", "total", "ips", "days"}]; `ips` soma os IPs distintos
+    de cada dia (pessoas-dia, não pessoas únicas no período).
+    """
+    since = timezone.localdate() - datetime.timedelta(days=days - 1)
+    daily = SearchTermDaily.objects.filter(day__gte=since)
+    top = list(
+        daily.order_by()
+        .values("term_norm")
+        .annotate(total=Sum("count"), ips=Sum("distinct_ips"), days=Count("id"))
+        .order_by("-total", "term_norm")[:limit]
+    )
+    # Rótulo: a grafia do dia com mais buscas do termo (cada linha diária já
+    # guarda a grafia mais frequente do dia). Uma query para os `limit` termos.
+    labels = {}
+    for norm, term in (
+        daily.filter(term_norm__in=[t["term_norm"] for t in top])
+        .order_by("term_norm", "-count", "-day")
+        .values_list("term_norm", "term")
+    ):
+        labels.setdefault(norm, term)
+    for t in top:
+        t["label"] = labels.get(t["term_norm"], t["term_norm"])
+    return top
@@ -0,0 +1,273 @@
+"""Serialização da árvore de regras publicada (Rule → Cards → Bullets → Tags).
+
+Mantém o schema consumido pelo React (`frontend/src/App.jsx`) em um único lugar,
+para que `/api/rules/` e os snapshots em `questions.rules_cache` gerem exatamente
+o mesmo JSON.
+"""
+
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Prefetch, Q
+
+from .models import Rule, RuleCard, RuleBullet, RulesChange
+
+
+def published_rules_queryset():
+    # carrega tudo já ordenado (Rule → Cards → Bullets → Tags)
+    return (
+        Rule.objects.filter(is_published=True)
+        .select_related("category")
+        .prefetch_related(
+            Prefetch(
+                "cards",
+                queryset=RuleCard.objects.filter(is_published=True)
+                .order_by("order", "id")
+                .prefetch_related(
+                    Prefetch(
+                        "bullets",
+                        queryset=RuleBullet.objects.all()
+                        .order_by("order", "id")
+                        .prefetch_related("tags"),
+                    )
+                ),
+            )
+        )
+        .order_by("order", "title")
+    )
+
+
+def serialize_rule(r):
+    rule_obj = {
+        "id": r.id,
+        "title": r.title,
+        "slug": r.slug,
+        "category": r.category.name if r.category else "",
+        "cards": [],
+    }
+    for c in r.cards.all():
+        card_obj = {
+            "id": c.id,
+            "title": c.title or "",
+            "bullets": [],
+        }
+        for b in c.bullets.all():
+            card_obj["bullets"].append(
+                {
+                    "id": b.id,
+                    "text": b.text,
+                    "tags": [t.name for t in b.tags.all()],
+                }
+            )
+        rule_obj["cards"].append(card_obj)
+    return rule_obj
+
+
+def serialize_rules_prefetch():
+    """Versão com Prefetch (instancia os models); mantida como referência/benchmark."""
+    return [serialize_rule(r) for r in published_rules_queryset()]
+
+
+def _published_rule_rows():
+    return (
+        Rule.objects.filter(is_published=True)
+        .order_by("order", "title")
+        .values_list("id", "title", "slug", "category__name")
+    )
+
+
+def _flat_tree(rule_rows, rule_ids):
+    """Monta a árvore com uma query por nível (cards, bullets, tags) e join em Python.
+
+    `rule_rows`: [(id, title, slug, category)] já na ordem do manual.
+    `rule_ids`: lista de ids ou subquery (`values("id")`) das mesmas regras.
+    Sem instanciar models: só tuplas de `values_list`, agrupadas por id em dicts.
+    """
+    cards_by_rule = {}
+    bullets_by_card = {}
+    for card_id, rule_id, title in (
+        RuleCard.objects.filter(rule_id__in=rule_ids, is_published=True)
+        .order_by("order", "id")
+        .values_list("id", "rule_id", "title")
+    ):
+        bullets = bullets_by_card[card_id] = []
+        cards_by_rule.setdefault(rule_id, []).append(
+            {"id": card_id, "title": title or "", "bullets": bullets}
+        )
+
+    tags_by_bullet = {}
+    for bullet_id, name in (
+        RuleBullet.tags.through.objects.filter(
+            rulebullet__card__rule_id__in=rule_ids, rulebullet__card__is_published=True
+        )
+        .order_by("tag__name")
+        .values_list("rulebullet_id", "tag__name")
+    ):
+        tags_by_bullet.setdefault(bullet_id, []).append(name)
+
+    for bullet_id, card_id, text in (
+        RuleBullet.objects.filter(card__rule_id__in=rule_ids, card__is_published=True)
+        .order_by("order", "id")
+        .values_list("id", "card_id", "text")
+    ):
+        bullets_by_card[card_id].append(
+            {"id": bullet_id, "text": text, "tags": tags_by_bullet.get(bullet_id, [])}
+        )
+
+    return [
+        {
+            "id": rule_id,
+            "title": title,
+            "slug": slug,
+            "category": category or "",
+            "cards": cards_by_rule.get(rule_id, []),
+        }
+        for rule_id, title, slug, category in rule_rows
+    ]
+
+
+def serialize_rules():
+    """Lista de regras publicadas no formato de `/api/rules/` (chave `results`).
+
+    4 queries no total, independente do tamanho do manual (ver `_flat_tree`).
+    """
+    rule_ids = Rule.objects.filter(is_published=True).values("id")
+    return _flat_tree(list(_published_rule_rows()), rule_ids)
+
+
+def serialize_rules_index():
+    """Resumo das regras publicadas para o primeiro paint (sem cards/bullets)."""
+    rules = (
+        Rule.objects.filter(is_published=True)
+        .annotate(cards_count=Count("cards", filter=Q(cards__is_published=True)))
+        .order_by("order", "title")
+        .values("id", "title", "slug", "category__name", "cards_count")
+    )
+    return [
+        {
+            "id": r["id"],
+            "title": r["title"],
+            "slug": r["slug"],
+            "category": r["category__name"] or "",
+            "cards_count": r["cards_count"],
+        }
+        for r in rules
+    ]
+
+
+def serialize_rule_detail(slug):
+    """Uma regra publicada (mesmo formato de um item de `/api/rules/`), ou None."""
+    rows = list(_published_rule_rows().filter(slug=slug)[:1])
+    if not rows:
+        return None
+    return _flat_tree(rows, [rows[0][0]])[0]
+
+
+def iter_rules_json(chunk_size=20):
+    """Gera o JSON de `/api/rules/` em pedaços (bytes), uma regra por vez.
+
+    As regras são montadas em lotes de `chunk_size` (3 queries por lote, via
+    `_flat_tree`): o pico de memória depende do tamanho do lote, não do manual
+    inteiro. A saída é byte a byte igual a
+    `json.dumps({"results": serialize_rules()}, cls=DjangoJSONEncoder)`.
+    """
+    yield b'{"results": ['
+    first = True
+    rows = list(_published_rule_rows())
+    for start in range(0, len(rows), chunk_size):
+        batch = rows[start:start + chunk_size]
+        for rule in _flat_tree(batch, [r[0] for r in batch]):
+            chunk = json.dumps(rule, cls=DjangoJSONEncoder)
+            yield (chunk if first else ", " + chunk).encode("utf-8")
+            first = False
+    yield b"]}"
+
+
+# Acima disso é mais barato o cliente baixar tudo de novo (`/api/rules/`).
+MAX_CHANGES_DELTA = 2000
+
+
+def serialize_rules_changes(since, version, rows):
+    """Delta do manual a partir do diário `RulesChange`.
+
+    `rows`: [(kind, object_id)] das versões em (since, version]. Cada nó tocado
+    aparece uma única vez: no estado atual, se ainda existe e está publicado, ou
+    em `deleted` caso contrário (removido, despublicado ou com pai despublicado).
+
+    Regras e cards tocados e visíveis vêm com todos os descendentes publicados:
+    os filhos listados de um nó do delta são a lista completa, e o cliente pode
+    substituir a subárvore. Isso cobre a republicação (o cliente descartou a
+    subárvore ao despublicar) e os nós movidos (o pai antigo também está no
+    diário e volta sem o filho).
+    """
+    touched = {RulesChange.KIND_RULE: set(), RulesChange.KIND_CARD: set(), RulesChange.KIND_BULLET: set()}
+    for kind, object_id in rows:
+        if kind in touched:
+            touched[kind].add(object_id)
+    if sum(len(ids) for ids in touched.values()) > MAX_CHANGES_DELTA:
+        return {"since": since, "version": version, "resync": True}
+
+    touched_rules = touched[RulesChange.KIND_RULE]
+    touched_cards = touched[RulesChange.KIND_CARD]
+    rules = list(
+        Rule.objects.filter(pk__in=touched_rules, is_published=True)
+        .order_by("order", "title")
+        .values("id", "title", "slug", "category__name", "order")
+    )
+    cards = list(
+        RuleCard.objects.filter(is_published=True, rule__is_published=True)
+        .filter(Q(pk__in=touched_cards) | Q(rule_id__in=touched_rules))
+        .order_by("rule_id", "order", "id")
+        .values("id", "rule_id", "title", "order")
+    )
+    bullets = list(
+        RuleBullet.objects.filter(card__is_published=True, card__rule__is_published=True)
+        .filter(
+            Q(pk__in=touched[RulesChange.KIND_BULLET])
+            | Q(card_id__in=touched_cards)
+            | Q(card__rule_id__in=touched_rules)
+        )
+        .order_by("card_id", "order", "id")
+        .prefetch_related("tags")
+    )
+    if len(rules) + len(cards) + len(bullets) > MAX_CHANGES_DELTA:
+        return {"since": since, "version": version, "resync": True}
+    visible = {
+        RulesChange.KIND_RULE: {r["id"] for r in rules},
+        RulesChange.KIND_CARD: {c["id"] for c in cards},
+        RulesChange.KIND_BULLET: {b.id for b in bullets},
+    }
+    return {
+        "since": since,
+        "version": version,
+        "resync": False,
+        "rules": [
+            {
+                "id": r["id"],
+                "title": r["title"],
+                "slug": r["slug"],
+                "category": r["category__name"] or "",
+                "order": r["order"],
+            }
+            for r in rules
+        ],
+        "cards": [
+            {"id": c["id"], "rule_id": c["rule_id"], "title": c["title"] or "", "order": c["order"]}
+            for c in cards
+        ],
+        "bullets": [
+            {
+                "id": b.id,
+                "card_id": b.card_id,
+                "text": b.text,
+                "order": b.order,
+                "tags": [t.name for t in b.tags.all()],
+            }
+            for b in bullets
+        ],
+        "deleted": {
+            "rules": sorted(touched[RulesChange.KIND_RULE] - visible[RulesChange.KIND_RULE]),
+            "cards": sorted(touched[RulesChange.KIND_CARD] - visible[RulesChange.KIND_CARD]),
+            "bullets": sorted(touched[RulesChange.KIND_BULLET] - visible[RulesChange.KIND_BULLET]),
+        },
+    }
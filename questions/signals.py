@@ -0,0 +1,150 @@
+"""Signals que mantêm a versão de conteúdo do manual e o diário de alterações.
+
+Qualquer escrita em Rule, RuleCard, RuleBullet, Tag, Category, Synonym ou nos
+vínculos bullet↔tag incrementa `RulesVersion` e registra os nós afetados em `RulesChange`,
+na mesma transação da alteração. Os caches em memória (snapshots de
+`/api/rules/`, índices de busca) usam a versão como chave; o diário alimenta
+`/api/rules/changes/` e a reindexação parcial.
+"""
+
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .models import Category, Rule, RuleBullet, RuleCard, RulesChange, Synonym, Tag
+from .rules_cache import bump_version
+
+UPSERT = RulesChange.ACTION_UPSERT
+DELETE = RulesChange.ACTION_DELETE
+
+
+def _action(kwargs):
+    return DELETE if kwargs.get("signal") is post_delete else UPSERT
+
+
+def _rule_id_for_card(card_id):
+    return RuleCard.objects.filter(pk=card_id).values_list("rule_id", flat=True).first()
+
+
+def _bullet_changes(bullet_rows):
+    """[(bullet_id, rule_id)] → entradas de diário de bullets alterados."""
+    return [(RulesChange.KIND_BULLET, bid, rid, UPSERT) for bid, rid in bullet_rows]
+
+
+def _bullets_of_tag(tag):
+    return list(RuleBullet.objects.filter(tags=tag).values_list("id", "card__rule_id"))
+
+
+def _rules_of_category(category):
+    return list(Rule.objects.filter(category=category).values_list("id", flat=True))
+
+
+@receiver(post_save, sender=Rule)
+@receiver(post_delete, sender=Rule)
+def rule_changed(sender, instance, **kwargs):
+    bump_version([(RulesChange.KIND_RULE, instance.pk, instance.pk, _action(kwargs))])
+
+
+@receiver(pre_save, sender=RuleCard)
+def rule_card_pre_save(sender, instance, **kwargs):
+    # Card movido para outra regra: a regra antiga também precisa ser reindexada.
+    instance._previous_rule_id = None
+    if instance.pk is not None and not instance._state.adding:
+        instance._previous_rule_id = (
+            RuleCard.objects.filter(pk=instance.pk).values_list("rule_id", flat=True).first()
+        )
+
+
+@receiver(post_save, sender=RuleCard)
+@receiver(post_delete, sender=RuleCard)
+def rule_card_changed(sender, instance, **kwargs):
+    changes = [(RulesChange.KIND_CARD, instance.pk, instance.rule_id, _action(kwargs))]
+    previous = getattr(instance, "_previous_rule_id", None)
+    instance._previous_rule_id = None
+    if previous is not None and previous != instance.rule_id:
+        changes.append((RulesChange.KIND_RULE, previous, previous, UPSERT))
+    bump_version(changes)
+
+
+@receiver(pre_save, sender=RuleBullet)
+def rule_bullet_pre_save(sender, instance, **kwargs):
+    # Bullet movido de card: guarda o card/regra anteriores.
+    instance._previous_parent = None
+    if instance.pk is not None and not instance._state.adding:
+        instance._previous_parent = (
+            RuleBullet.objects.filter(pk=instance.pk).values_list("card_id", "card__rule_id").first()
+        )
+
+
+@receiver(post_save, sender=RuleBullet)
+@receiver(post_delete, sender=RuleBullet)
+def rule_bullet_changed(sender, instance, **kwargs):
+    rule_id = _rule_id_for_card(instance.card_id)
+    changes = [(RulesChange.KIND_BULLET, instance.pk, rule_id, _action(kwargs))]
+    previous = getattr(instance, "_previous_parent", None)
+    instance._previous_parent = None
+    if previous is not None and previous[0] != instance.card_id:
+        # O card antigo entra no diário com a regra antiga: as duas regras são reindexadas.
+        changes.append((RulesChange.KIND_CARD, previous[0], previous[1], UPSERT))
+    bump_version(changes)
+
+
+@receiver(pre_delete, sender=Tag)
+def tag_pre_delete(sender, instance, **kwargs):
+    # Os vínculos bullet↔tag somem em cascata sem m2m_changed: guarda antes.
+    instance._affected_bullets = _bullets_of_tag(instance)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def tag_changed(sender, instance, **kwargs):
+    action = _action(kwargs)
+    if action == DELETE:
+        bullets = getattr(instance, "_affected_bullets", [])
+    else:
+        bullets = _bullets_of_tag(instance)
+    marker = (RulesChange.KIND_TAG, instance.pk, None, action)
+    bump_version([marker] + _bullet_changes(bullets))
+
+
+@receiver(pre_delete, sender=Category)
+def category_pre_delete(sender, instance, **kwargs):
+    # on_delete=SET_NULL nas regras é um UPDATE em lote, sem signals.
+    instance._affected_rules = _rules_of_category(instance)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, instance, **kwargs):
+    action = _action(kwargs)
+    if action == DELETE:
+        rules = getattr(instance, "_affected_rules", [])
+    else:
+        rules = _rules_of_category(instance)
+    marker = (RulesChange.KIND_CATEGORY, instance.pk, None, action)
+    bump_version([marker] + [(RulesChange.KIND_RULE, rid, rid, UPSERT) for rid in rules])
+
+
+@receiver(post_save, sender=Synonym)
+@receiver(post_delete, sender=Synonym)
+def synonym_changed(sender, instance, **kwargs):
+    # Só marcador: nenhum nó muda, mas a busca recompila o mapa de sinônimos.
+    bump_version([(RulesChange.KIND_SYNONYM, instance.pk, None, _action(kwargs))])
+
+
+@receiver(m2m_changed, sender=RuleBullet.tags.through)
+def rule_bullet_tags_changed(sender, instance, action, reverse, pk_set=None, **kwargs):
+    if reverse and action == "pre_clear":
+        # tag.bullets.clear(): os bullets afetados só são conhecidos antes.
+        instance._cleared_bullets = _bullets_of_tag(instance)
+        return
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        bump_version(_bullet_changes([(instance.pk, _rule_id_for_card(instance.card_id))]))
+        return
+    if action == "post_clear":
+        bullets = getattr(instance, "_cleared_bullets", [])
+    else:
+        bullets = RuleBullet.objects.filter(pk__in=pk_set or ()).values_list("id", "card__rule_id")
+    marker = (RulesChange.KIND_TAG, instance.pk, None, UPSERT)
+    bump_version([marker] + _bullet_changes(bullets))
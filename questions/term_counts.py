@@ -0,0 +1,55 @@
+"""Tokenização e contagem dos termos das perguntas (`AskedTerm`), sem Django.
+
+Fica separado de `questions.asked_terms` para rodar nos processos do pool de
+`rebuild_asked_terms` (spawn) sem carregar settings/models. Mudar a regra de
+tokenização aqui vale tanto para o registro online quanto para a reconstrução.
+"""
+
+import re
+
+from .text import normalize_term
+
+_TOKEN_RE = re.compile(r"[\wÀ-ÖØ-öø-ÿ]{4,}", flags=re.UNICODE)
+
+
+def question_terms(text):
+    """{term_norm: grafia} dos termos (>=4 letras) de uma pergunta, 1 vez cada."""
+    terms = {}
+    for raw in _TOKEN_RE.findall((text or "").strip()):
+        terms.setdefault(normalize_term(raw)[:200], raw[:200])
+    return terms
+
+
+def count_question_terms(rows):
+    """Map: [(texto, created_at)] → {term_norm: [grafia, perguntas, first_seen, last_seen]}.
+
+    A grafia guardada é a da pergunta mais antiga (mesma regra do registro online).
+    """
+    acc = {}
+    for text, created_at in rows:
+        for norm, term in question_terms(text).items():
+            entry = acc.get(norm)
+            if entry is None:
+                acc[norm] = [term, 1, created_at, created_at]
+                continue
+            entry[1] += 1
+            if created_at < entry[2]:
+                entry[0], entry[2] = term, created_at
+            if created_at > entry[3]:
+                entry[3] = created_at
+    return acc
+
+
+def merge_term_counts(total, part):
+    """Reduce: soma `part` em `total` (ambos no formato de `count_question_terms`)."""
+    for norm, (term, n, first, last) in part.items():
+        entry = total.get(norm)
+        if entry is None:
+            total[norm] = [term, n, first, last]
+            continue
+        entry[1] += n
+        if first < entry[2]:
+            entry[0], entry[2] = term, first
+        if last > entry[3]:
+            entry[3] = last
+    return total
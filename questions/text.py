@@ -0,0 +1,65 @@
+"""Normalização de texto compartilhada (checklists, busca de regras, logs de busca).
+
+Tudo que compara termos digitados pelos usuários passa por `normalize_term`:
+remove acentos (NFKD, mesma regra usada historicamente no checklist) e aplica
+casefold, de modo que "Intubação", "intubacao" e "INTUBAÇÃO" virem a mesma chave.
+"""
+
+import re
+import unicodedata
+
+# Palavras muito frequentes que não ajudam a discriminar resultados.
+STOPWORDS = frozenset(
+    """
+    a o as os um uma uns umas de da do das dos em na no nas nos por pela pelo
+    pelas pelos para pra com sem e ou que se ao aos à às é ser sua seu suas seus
+    """.split()
+)
+
+_WORD_RE = re.compile(r"\w+", flags=re.UNICODE)
+
+
+def strip_accents(s: str) -> str:
+    s = s or ''
+    return ''.join(c for c in unicodedata.normalize('NFKD', s) if not unicodedata.combining(c))
+
+
+def normalize_term(s: str) -> str:
+    """Chave normalizada de um termo: sem acentos e em casefold."""
+    return strip_accents((s or '').strip()).casefold()
+
+
+def tokenize(text: str, *, keep_stopwords: bool = False):
+    """Tokens normalizados de `text`, na ordem em que aparecem (com repetições)."""
+    tokens = _WORD_RE.findall(normalize_term(text))
+    if keep_stopwords:
+        return tokens
+    return [t for t in tokens if t not in STOPWORDS]
+
+
+def surface_words(text: str, *, keep_stopwords: bool = False):
+    """Pares (chave normalizada, palavra em minúsculas com acento) de `text`.
+
+    Útil para exibir a forma acentuada original de um termo normalizado.
+    """
+    out = []
+    for word in _WORD_RE.findall(text or ''):
+        key = normalize_term(word)
+        if not keep_stopwords and key in STOPWORDS:
+            continue
+        out.append((key, word.lower()))
+    return out
+
+
+def word_spans(text: str, *, keep_stopwords: bool = False):
+    """Trios (chave normalizada, início, fim) das palavras de `text`.
+
+    Os offsets são do texto original (com acentos), para destacar ocorrências.
+    """
+    out = []
+    for m in _WORD_RE.finditer(text or ''):
+        key = normalize_term(m.group())
+        if not keep_stopwords and key in STOPWORDS:
+            continue
+        out.append((key, m.start(), m.end()))
+    return out
@@ -7,14 +7,25 @@ urlpatterns = [
     path("", views.rules_home, name="rules_home"),
     path("checklists/", views.checklists_usa, name="checklists_usa"),
     path("api/rules/", views.api_rules, name="api_rules"),
+    path("api/rules/search/", views.api_rules_search, name="api_rules_search"),
+    path("api/rules/suggest/", views.api_rules_suggest, name="api_rules_suggest"),
+    path("api/rules/matches/", views.api_rules_matches, name="api_rules_matches"),
+    path("api/rules/facets/", views.api_rules_facets, name="api_rules_facets"),
+    path("api/rules/index/", views.api_rules_index, name="api_rules_index"),
+    path("api/rules/changes/", views.api_rules_changes, name="api_rules_changes"),
+    # slugs do manual podem ter acentos (gerados a partir do PDF), por isso <str:>
+    path("api/rules/<str:slug>/", views.api_rule_detail, name="api_rule_detail"),
     path("api/checklists/submit/", views.api_checklists_submit, name="api_checklists_submit"),
     path("api/checklists/digest/send/", views.api_checklists_send_digest, name="api_checklists_send_digest"),
     path("api/search-log/", api_search_log, name="api_search_log"),
     path('ask/', views.ask_view, name='ask'),
     path('inbox/', views.inbox, name='inbox'),
     path('inbox/checklists/', views.inbox_checklists, name='inbox_checklists'),
+    path('inbox/search-terms/', views.inbox_search_terms, name='inbox_search_terms'),
     path('inbox/checklists/<int:pk>/', views.inbox_checklists_detail, name='inbox_checklists_detail'),
     path('inbox/<int:pk>/', views.inbox_detail, name='inbox_detail'),
     path('inbox/<int:pk>/reviewed/', views.mark_reviewed, name='mark_reviewed'),
+    path('inbox/bulk/', views.inbox_bulk, name='inbox_bulk'),
     path('inbox/export.csv', views.export_csv, name='export_csv'),
+    path('inbox/export/<slug:name>/', views.export_data, name='export_data'),
 ]
\ No newline at end of file
@@ -10,36 +10,61 @@ Pontos de integração principais:
 """
 
 from django.shortcuts import render, redirect
+from django.urls import reverse
 from django.contrib import messages
 from django.views.decorators.http import require_http_methods
 from django.contrib.auth.decorators import user_passes_test
-from django.core.paginator import Paginator
-from django.http import HttpResponse, JsonResponse
-from django.db.models import Prefetch, Q
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+from django.db.models import Q
+from django.utils.cache import get_conditional_response, patch_cache_control
 from .models import (
     Rule,
-    RuleCard,
-    RuleBullet,
     Category,
     Tag,
     Question,
     ChecklistSubmission,
     ChecklistDigestLog,
-    SearchLog,
-    AskedTerm,
+    SearchRollupState,
+    hash_ip,
 )
+from .rules_cache import (
+    current_version,
+    get_rule_detail_snapshot,
+    get_rules_index_snapshot,
+    get_rules_snapshot,
+    rules_changes_since,
+    version_etag,
+)
+from .rules_artifacts import ENCODING_IDENTITY, choose_encoding, publish_rules_artifacts
+from .asked_terms import record_question_terms
+from .exports import EXPORTS, FORMAT_CSV, FORMATS, export_response, filter_period, parse_day
+from .inbox_search import search_checklists, search_questions
+from .pagination import approximate_count, keyset_page
+from .search_log import record_search_terms
+from .search_rollup import REPORT_WINDOWS, top_missing_terms
+from .serializers import iter_rules_json
+from .search.engine import (
+    MATCH_ALL,
+    MATCH_ANY,
+    ORDER_MANUAL,
+    ORDER_RELEVANCE,
+    match_rules,
+    rules_facets,
+    search_rules,
+    suggest_rules,
+)
+from .text import normalize_term, strip_accents as _strip_accents
 from django.views.decorators.csrf import csrf_exempt
 from django.utils import timezone
 from django import forms
-import csv
 import json
 import datetime
 import re
 import urllib.request
+from urllib.parse import urlencode
 import urllib.error
 from pathlib import Path
 from django.conf import settings
-import unicodedata
 
 # (Removido import duplicado de Question, Rule)
 
@@ -147,11 +172,6 @@ def _load_checklist_compact_map():
     return _CHECKLIST_COMPACT_MAP
 
 
-def _strip_accents(s: str) -> str:
-    s = s or ''
-    return ''.join(c for c in unicodedata.normalize('NFKD', s) if not unicodedata.combining(c))
-
-
 def _smart_title(s: str) -> str:
     """Title case preservando siglas curtas (DEA, O2, etc.)."""
     parts = []
@@ -427,13 +447,11 @@ def ask_view(request):
 def inbox(request):
     q = request.GET.get('q', '').strip()
     status = request.GET.get('status', '').strip()
-    qs = Question.objects.all().order_by('-id')
-    if q:
-        qs = qs.filter(text__icontains=q)
-    if status in ['new','reviewed']:
-        qs = qs.filter(status=status)
-    page_obj = Paginator(qs, 15).get_page(request.GET.get('page'))
-    return render(request, 'questions/inbox.html', {'page_obj': page_obj, 'q': q, 'status': status})
+    qs = _filter_questions(Question.objects.all(), request.GET)
+    page_obj = keyset_page(qs, ('id',), per_page=15,
+                           after=request.GET.get('after'), before=request.GET.get('before'))
+    total = approximate_count(qs) if request.GET.get('count') == '1' else None
+    return render(request, 'questions/inbox.html', {'page_obj': page_obj, 'q': q, 'status': status, 'total': total})
 
 @staff_required
 def inbox_detail(request, pk):
@@ -448,21 +466,130 @@ def mark_reviewed(request, pk):
     messages.success(request, f'Pergunta #{obj.pk} marcada como revisada.')
     return redirect('questions:inbox_detail', pk=obj.pk)
 
-@staff_required
-def export_csv(request):
-    q = request.GET.get('q', '').strip()
-    status = request.GET.get('status', '').strip()
-    qs = Question.objects.all().order_by('-id')
+def _filter_questions(qs, params):
+    # Filtros da inbox de perguntas (`q`, `status`): listagem, exportação e triagem em lote.
+    q = params.get('q', '').strip()
+    status = params.get('status', '').strip()
     if q:
-        qs = qs.filter(text__icontains=q)
+        qs = search_questions(qs, q)
     if status in ['new','reviewed']:
         qs = qs.filter(status=status)
-    resp = HttpResponse(content_type='text/csv; charset=utf-8')
-    resp['Content-Disposition'] = 'attachment; filename="perguntas.csv"'
-    w = csv.writer(resp); w.writerow(['id','created_at','status','category','text'])
-    for row in qs.values_list('id','created_at','status','category','text'):
-        w.writerow(row)
-    return resp
+    return qs
+
+
+def _filter_checklist_export(qs, params):
+    q = params.get('q', '').strip()
+    return search_checklists(qs, q) if q else qs
+
+
+_EXPORT_FILTERS = {
+    'questions': _filter_questions,
+    'checklists': _filter_checklist_export,
+}
+
+
+@staff_required
+def export_data(request, name):
+    """Download em streaming de um modelo (ver `questions.exports`).
+
+    Parâmetros: `format` (csv|ndjson), `gzip=1`, período `start`/`end`
+    (AAAA-MM-DD, inclusive) e os filtros da inbox correspondente (`q`, `status`).
+    """
+    spec = EXPORTS.get(name)
+    if spec is None:
+        raise Http404('Exportação desconhecida')
+    fmt = request.GET.get('format', FORMAT_CSV)
+    if fmt not in FORMATS:
+        return HttpResponseBadRequest('Formato inválido (csv ou ndjson).')
+    try:
+        start = parse_day(request.GET.get('start'))
+        end = parse_day(request.GET.get('end'))
+    except ValueError:
+        return HttpResponseBadRequest('Data inválida. Use o formato AAAA-MM-DD.')
+    qs = filter_period(spec.model.objects.all(), spec.date_field, start, end)
+    filter_export = _EXPORT_FILTERS.get(name)
+    if filter_export:
+        qs = filter_export(qs, request.GET)
+    return export_response(spec, qs, fmt, compress=request.GET.get('gzip') == '1')
+
+
+BULK_MAX_IDS = 1000
+
+
+def _bulk_error(request, message, back):
+    if 'application/json' in request.headers.get('Accept', ''):
+        return JsonResponse({'error': message}, status=400)
+    messages.error(request, message)
+    return redirect(back)
+
+
+@staff_required
+@require_http_methods(["POST"])
+def inbox_bulk(request):
+    """Triagem em lote: status e/ou categoria de várias perguntas num único UPDATE.
+
+    Alvo: os `ids` marcados (até `BULK_MAX_IDS`) ou, com `scope=filter`, todas as
+    perguntas do filtro atual (`q`, `status`), num `UPDATE … WHERE` pelo próprio
+    filtro, sem listar ids. Mudanças: `set_status` (new|reviewed) e, com
+    `set_category=1`, `category` (vazio limpa). Com `Accept: application/json`
+    responde `{"updated": n}`; senão volta à inbox com a contagem.
+    """
+    params = request.POST
+    back = f"{reverse('questions:inbox')}?{urlencode({'q': params.get('q', ''), 'status': params.get('status', '')})}"
+
+    changes = {}
+    new_status = params.get('set_status', '').strip()
+    if new_status:
+        if new_status not in (Question.STATUS_NEW, Question.STATUS_REVIEWED):
+            return _bulk_error(request, 'Status inválido.', back)
+        changes['status'] = new_status
+    if params.get('set_category') == '1':
+        changes['category'] = params.get('category', '').strip()[:Question._meta.get_field('category').max_length]
+    if not changes:
+        return _bulk_error(request, 'Escolha um status ou uma categoria para aplicar.', back)
+
+    if params.get('scope') == 'filter':
+        qs = _filter_questions(Question.objects.all(), params)
+    else:
+        try:
+            ids = {int(v) for v in params.getlist('ids')}
+        except ValueError:
+            return _bulk_error(request, 'Seleção inválida.', back)
+        if not ids:
+            return _bulk_error(request, 'Nenhuma pergunta selecionada.', back)
+        if len(ids) > BULK_MAX_IDS:
+            return _bulk_error(request, f'Selecione no máximo {BULK_MAX_IDS} perguntas (ou use "todas do filtro").', back)
+        qs = Question.objects.filter(pk__in=ids)
+
+    updated = qs.update(**changes)
+    if 'application/json' in request.headers.get('Accept', ''):
+        return JsonResponse({'updated': updated, 'changes': changes})
+    messages.success(request, f'{updated} pergunta(s) atualizada(s).')
+    return redirect(back)
+
+
+@staff_required
+def export_csv(request):
+    # URL antiga da inbox (/inbox/export.csv): mesmo CSV, agora em streaming.
+    return export_data(request, 'questions')
+
+
+@staff_required
+def inbox_search_terms(request):
+    """Termos buscados sem resultado: top 1, 7 e 30 dias, direto do rollup diário."""
+    state = SearchRollupState.objects.filter(pk=1).first()
+    windows = [(days, top_missing_terms(days, limit=30)) for days in REPORT_WINDOWS]
+    return render(request, 'questions/inbox_search_terms.html', {'windows': windows, 'state': state})
+
+
+def _day_range(field, day):
+    """Filtro do dia local `day` como faixa [00:00, 00:00 do dia seguinte).
+
+    Ao contrário de `__date`, não aplica função na coluna: usa o índice.
+    """
+    start = timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+    end = start + datetime.timedelta(days=1)
+    return Q(**{f'{field}__gte': start, f'{field}__lt': end})
 
 
 @staff_required
@@ -470,28 +597,26 @@ def inbox_checklists(request):
     q = request.GET.get('q', '').strip()
     day = request.GET.get('date', '').strip()  # YYYY-MM-DD
 
-    qs = ChecklistSubmission.objects.all().order_by('-created_at', '-id')
+    qs = ChecklistSubmission.objects.all()
 
     parsed_date = None
     if day:
         try:
             parsed_date = datetime.date.fromisoformat(day)
-            qs = qs.filter(created_at__date=parsed_date)
+            qs = qs.filter(_day_range('created_at', parsed_date))
         except ValueError:
             messages.error(request, 'Data inválida. Use o formato AAAA-MM-DD.')
     else:
         parsed_date = timezone.localdate()
         day = parsed_date.isoformat()
-        qs = qs.filter(created_at__date=parsed_date)
+        qs = qs.filter(_day_range('created_at', parsed_date))
 
     if q:
-        qs = qs.filter(
-            Q(doctor_name__icontains=q)
-            | Q(unit__icontains=q)
-            | Q(text__icontains=q)
-        )
+        qs = search_checklists(qs, q)
 
-    page_obj = Paginator(qs, 20).get_page(request.GET.get('page'))
+    page_obj = keyset_page(qs, ('created_at', 'id'), per_page=20,
+                           after=request.GET.get('after'), before=request.GET.get('before'))
+    total = approximate_count(qs) if request.GET.get('count') == '1' else None
 
     # Resumo do dia selecionado: quais ambulâncias já têm checklist hoje?
     expected = [u for u in EXPECTED_AMBULANCES]
@@ -543,7 +668,7 @@ def inbox_checklists(request):
 
     # Resumo por unidade (do dia): pega o envio mais recente por unidade e extrai faltas/obs do texto.
     submissions_for_day = (
-        ChecklistSubmission.objects.filter(created_at__date=parsed_date)
+        ChecklistSubmission.objects.filter(_day_range('created_at', parsed_date))
         .order_by('-created_at', '-id')
     )
     latest_by_unit = {}
@@ -591,6 +716,7 @@ def inbox_checklists(request):
         'questions/inbox_checklists.html',
         {
             'page_obj': page_obj,
+            'total': total,
             'q': q,
             'date': day,
             'expected_units': expected,
@@ -809,56 +935,234 @@ def api_checklists_send_digest(request):
 
     return JsonResponse({'ok': True, 'sent_to': send.get('sent_to') or [], 'skipped': False})
 
+def _snapshot_response(request, snap):
+    """Resposta JSON de um snapshot versionado (ETag forte + 304 + revalidação)."""
+    not_modified = get_conditional_response(request, etag=snap.etag)
+    if not_modified is not None:
+        patch_cache_control(not_modified, no_cache=True)
+        return not_modified
+    resp = HttpResponse(snap.body, content_type="application/json")
+    resp["ETag"] = snap.etag
+    patch_cache_control(resp, no_cache=True)
+    return resp
+
+
+def _accel_redirect_response(request, snap):
+    """Entrega o snapshot via nginx (arquivo pré-comprimido + X-Accel-Redirect)."""
+    not_modified = get_conditional_response(request, etag=snap.etag)
+    if not_modified is not None:
+        patch_cache_control(not_modified, no_cache=True)
+        return not_modified
+    files = publish_rules_artifacts(snap)
+    if files is None:
+        return _snapshot_response(request, snap)
+    encoding = choose_encoding(request.META.get("HTTP_ACCEPT_ENCODING"), files)
+    resp = HttpResponse(content_type="application/json")
+    resp["X-Accel-Redirect"] = settings.RULES_ACCEL_PREFIX + files[encoding]
+    if encoding != ENCODING_IDENTITY:
+        resp["Content-Encoding"] = encoding
+    resp["ETag"] = snap.etag
+    resp["Vary"] = "Accept-Encoding"
+    patch_cache_control(resp, no_cache=True)
+    return resp
+
+
+def _rules_streaming_requested(request):
+    raw = (request.GET.get("stream") or "").strip().lower()
+    if raw:
+        return raw in ("1", "true", "yes", "on")
+    return bool(getattr(settings, "RULES_API_STREAMING", False))
+
+
+@require_http_methods(["GET", "HEAD"])
 def api_rules(request):
-    # carrega tudo já ordenado (Rule → Cards → Bullets → Tags)
-    rules = (
-        Rule.objects.filter(is_published=True)
-        .select_related("category")
-        .prefetch_related(
-            Prefetch(
-                "cards",
-                queryset=RuleCard.objects.filter(is_published=True)
-                .order_by("order", "id")
-                .prefetch_related(
-                    Prefetch(
-                        "bullets",
-                        queryset=RuleBullet.objects.all()
-                        .order_by("order", "id")
-                        .prefetch_related("tags"),
-                    )
-                ),
-            )
-        )
-        .order_by("order", "title")
+    """Árvore de regras publicadas, servida do snapshot versionado do worker.
+
+    Responde com ETag forte; `If-None-Match` com a versão atual gera 304 sem corpo.
+    `Cache-Control: no-cache` faz o navegador sempre revalidar (barato) em vez de
+    usar uma cópia que pode estar desatualizada após uma edição do manual.
+
+    Com `settings.RULES_API_STREAMING` (ou `?stream=1`) o JSON é gerado regra a
+    regra via `StreamingHttpResponse`, sem montar o payload inteiro em memória;
+    nesse modo o ETag é fraco (derivado da versão). Mesmo schema nos dois modos.
+
+    Com `settings.RULES_ACCEL_REDIRECT` o corpo não passa pelo Python: a view
+    responde com `X-Accel-Redirect` para o arquivo pré-comprimido (br/gzip/json)
+    da versão atual e o nginx o entrega (ver `questions.rules_artifacts`).
+    """
+    if _rules_streaming_requested(request):
+        etag = version_etag(current_version())
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is None:
+            resp = StreamingHttpResponse(iter_rules_json(), content_type="application/json")
+            resp["ETag"] = etag
+        else:
+            resp = not_modified
+        patch_cache_control(resp, no_cache=True)
+        return resp
+
+    if getattr(settings, "RULES_ACCEL_REDIRECT", False):
+        return _accel_redirect_response(request, get_rules_snapshot())
+    return _snapshot_response(request, get_rules_snapshot())
+
+
+@require_http_methods(["GET", "HEAD"])
+def api_rules_index(request):
+    """Resumo para o primeiro paint: título, slug, categoria e nº de cards por regra."""
+    return _snapshot_response(request, get_rules_index_snapshot())
+
+
+@require_http_methods(["GET", "HEAD"])
+def api_rule_detail(request, slug):
+    """Cards e bullets de uma única regra publicada (carregamento sob demanda)."""
+    snap = get_rule_detail_snapshot(slug)
+    if snap is None:
+        return JsonResponse({"error": "not found"}, status=404)
+    return _snapshot_response(request, snap)
+
+
+@require_http_methods(["GET"])
+def api_rules_changes(request):
+    """Sync incremental: `GET /api/rules/changes/?since=<version>`.
+
+    Devolve só os nós (regras, cards, bullets) alterados depois de `since`, mais os
+    ids removidos/despublicados em `deleted`, e a `version` atual para o próximo
+    pedido. Com `resync: true` o cliente deve recarregar `/api/rules/`. Regras que
+    o cliente ainda não tem devem ser buscadas em `/api/rules/<slug>/`.
+    """
+    try:
+        since = int(request.GET.get("since", ""))
+    except ValueError:
+        return JsonResponse({"error": "invalid since"}, status=400)
+    if since < 0:
+        return JsonResponse({"error": "invalid since"}, status=400)
+    resp = JsonResponse(rules_changes_since(since))
+    patch_cache_control(resp, no_cache=True)
+    return resp
+
+
+def _flag(request, name, default=True):
+    """Parâmetro booleano de query string (`0/false/no/off` desligam)."""
+    raw = (request.GET.get(name) or "").strip().lower()
+    if not raw:
+        return default
+    return raw not in ("0", "false", "no", "off")
+
+
+@require_http_methods(["GET"])
+def api_rules_search(request):
+    """Busca nas regras publicadas via índice invertido em memória.
+
+    `GET /api/rules/search/?q=...` → bullets que contêm os termos (sem acento,
+    sem caixa; a última palavra vale como prefixo), agrupados por regra/card.
+    Parâmetros opcionais:
+    - `order=relevance|manual` (default relevance: BM25 com pesos por campo);
+    - `match=all|any` (default all: todas as palavras);
+    - `correct=0` desliga a correção de digitação (`did_you_mean`);
+    - `synonyms=0` desliga a expansão de siglas/sinônimos (`expanded`).
+    """
+    q = (request.GET.get("q") or "")[:200]
+    if not q.strip():
+        return JsonResponse({"error": "empty query"}, status=400)
+    order = request.GET.get("order") or ORDER_RELEVANCE
+    match = request.GET.get("match") or MATCH_ALL
+    if order not in (ORDER_RELEVANCE, ORDER_MANUAL):
+        return JsonResponse({"error": "invalid order"}, status=400)
+    if match not in (MATCH_ALL, MATCH_ANY):
+        return JsonResponse({"error": "invalid match"}, status=400)
+    correct = _flag(request, "correct")
+    synonyms = _flag(request, "synonyms")
+    return JsonResponse(search_rules(q, order=order, match=match, correct=correct, synonyms=synonyms))
+
+
+@require_http_methods(["GET"])
+def api_rules_matches(request):
+    """Destaques prontos para a UI: `GET /api/rules/matches/?q=...&snippet=160`.
+
+    Para cada bullet encontrado (ordem do manual): offsets das palavras que casaram
+    no texto (`matches`) e um trecho curto com os destaques (`snippet`), para o
+    cliente só renderizar `<mark>` sem varrer texto. Aceita `match`, `correct` e
+    `synonyms` como `/api/rules/search/`.
+    """
+    q = (request.GET.get("q") or "")[:200]
+    if not q.strip():
+        return JsonResponse({"error": "empty query"}, status=400)
+    match = request.GET.get("match") or MATCH_ALL
+    if match not in (MATCH_ALL, MATCH_ANY):
+        return JsonResponse({"error": "invalid match"}, status=400)
+    try:
+        snippet_chars = int(request.GET.get("snippet") or 160)
+    except ValueError:
+        return JsonResponse({"error": "invalid snippet"}, status=400)
+    correct = _flag(request, "correct")
+    synonyms = _flag(request, "synonyms")
+    return JsonResponse(
+        match_rules(q, match=match, correct=correct, synonyms=synonyms, snippet_chars=snippet_chars)
     )
 
-    data = []
-    for r in rules:
-        rule_obj = {
-            "id": r.id,
-            "title": r.title,
-            "slug": r.slug,
-            "category": r.category.name if r.category else "",
-            "cards": [],
-        }
-        for c in r.cards.all():
-            card_obj = {
-                "id": c.id,
-                "title": c.title or "",
-                "bullets": [],
-            }
-            for b in c.bullets.all():
-                card_obj["bullets"].append(
-                    {
-                        "id": b.id,
-                        "text": b.text,
-                        "tags": [t.name for t in b.tags.all()],
-                    }
-                )
-            rule_obj["cards"].append(card_obj)
-        data.append(rule_obj)
 
-    return JsonResponse({"results": data})
+@require_http_methods(["GET"])
+def api_rules_facets(request):
+    """Contagens por faceta: `GET /api/rules/facets/?q=...&match=all|any`.
+
+    Para cada tipo de tag (`Tag.KIND_CHOICES`), tag e categoria: quantos bullets e
+    regras casam com `q` (sem `q`, o manual inteiro). Vem de bitsets em memória,
+    sem GROUP BY no banco.
+    """
+    q = (request.GET.get("q") or "")[:200]
+    match = request.GET.get("match") or MATCH_ALL
+    if match not in (MATCH_ALL, MATCH_ANY):
+        return JsonResponse({"error": "invalid match"}, status=400)
+    return JsonResponse(rules_facets(q, match=match))
+
+
+@require_http_methods(["GET"])
+def api_rules_suggest(request):
+    """Autocomplete da caixa de busca: `GET /api/rules/suggest/?prefix=...&limit=8`."""
+    prefix = (request.GET.get("prefix") or "")[:100]
+    if not prefix.strip():
+        return JsonResponse({"prefix": prefix, "results": []})
+    try:
+        limit = int(request.GET.get("limit") or 8)
+    except ValueError:
+        return JsonResponse({"error": "invalid limit"}, status=400)
+    return JsonResponse(suggest_rules(prefix, limit=limit))
+
+
+SEARCH_LOG_MAX_PHRASES = 50
+SEARCH_LOG_MIN_CHARS = 4
+_SEARCH_LOG_TOKEN_RE = re.compile(r"[\wÀ-ÖØ-öø-ÿ]+", flags=re.UNICODE)
+
+
+def _search_log_phrases(payload):
+    """Frases sem resultado do payload (formato único ou em lote).
+
+    Retorna (frases, motivo_do_erro). Entradas com `results_count` != 0 são
+    descartadas aqui mesmo.
+    """
+    if "terms" in payload:
+        items = payload.get("terms")
+        if not isinstance(items, list) or not items:
+            return None, "empty terms"
+        items = items[:SEARCH_LOG_MAX_PHRASES]
+    else:
+        items = [payload]
+    phrases = []
+    for item in items:
+        if isinstance(item, str):
+            item = {"term": item}
+        if not isinstance(item, dict):
+            return None, "invalid term"
+        phrase = str(item.get("term") or "").strip()
+        if not phrase:
+            return None, "empty term"
+        try:
+            results_count = int(item.get("results_count") or 0)
+        except (TypeError, ValueError):
+            return None, "invalid results_count"
+        if results_count == 0:
+            phrases.append(phrase)
+    return phrases, None
 
 
 @csrf_exempt
@@ -866,73 +1170,55 @@ def api_rules(request):
 def api_search_log(request):
     """Registra termos (>=4 chars) de buscas sem resultado.
     Entrada JSON: {"term": "frase", "results_count": 0}
-    - Só processa quando results_count == 0
+    ou em lote:   {"terms": ["frase", {"term": "outra", "results_count": 0}, ...]}
+    - Só processa frases com results_count == 0 (strings valem como 0)
+    - Palavras com menos de 4 letras voltam em `ignored.short`
     - Dedup local + janela de 2h (não repete termo recente)
+    - Custo fixo: 1 SELECT dos termos recentes + 1 bulk INSERT, qualquer que
+      seja o número de frases/palavras
+    - Com o buffer do worker ligado (`questions.search_log`), responde 202 sem
+      tocar no banco, com os termos em `queued`; a gravação acontece depois, em lote
     """
-    import json
-    import re
-    from datetime import timedelta
-
     try:
         payload = json.loads(request.body.decode("utf-8"))
     except Exception:
         return JsonResponse({"error": "invalid json"}, status=400)
+    if not isinstance(payload, dict):
+        return JsonResponse({"error": "invalid json"}, status=400)
 
-    phrase = (payload.get("term") or "").strip()
-    results_count = int(payload.get("results_count") or 0)
-    if not phrase:
-        return JsonResponse({"error": "empty term"}, status=400)
-    if results_count != 0:
+    phrases, error = _search_log_phrases(payload)
+    if error:
+        return JsonResponse({"error": error}, status=400)
+    if not phrases:
         return JsonResponse({"ignored": True, "reason": "non_zero_results"}, status=200)
 
-    tokens = re.findall(r"[\wÀ-ÖØ-öø-ÿ]{4,}", phrase, flags=re.UNICODE)
-    if not tokens:
+    # Dedup local preservando a ordem (mesma chave do SearchLog.term_norm)
+    words, short = {}, {}
+    for phrase in phrases:
+        for raw in _SEARCH_LOG_TOKEN_RE.findall(phrase):
+            bucket = words if len(raw) >= SEARCH_LOG_MIN_CHARS else short
+            bucket.setdefault(normalize_term(raw), raw)
+    if not words:
         return JsonResponse({"ignored": True, "reason": "no_tokens"}, status=200)
 
-    cutoff = timezone.now() - timedelta(hours=2)
-    ip = get_client_ip(request)
-    try:
-        ip_h = hash_ip(ip)
-    except Exception:
-        ip_h = ""
+    ip_h = hash_ip(get_client_ip(request))
     ua = (request.META.get("HTTP_USER_AGENT") or "")[:300]
+    accepted, ignored_recent, buffered = record_search_terms(words, ip_h, ua)
 
-    logged = []
-    ignored_short = []
-    ignored_recent = []
-    seen_local = set()
-    for raw in tokens:
-        w = raw.strip()
-        if not w:
-            continue
-        key = w.casefold()
-        if key in seen_local:
-            continue
-        seen_local.add(key)
-
-        if len(w) < 4:
-            ignored_short.append(w)
-            continue
-        # Checa se já existe esse termo nas últimas 2h
-        exists = SearchLog.objects.filter(term__iexact=w, created_at__gte=cutoff).exists()
-        if exists:
-            ignored_recent.append(w)
-            continue
-        # Cria registro
-        SearchLog.objects.create(
-            term=w[:200],
-            results_count=0,
-            ip_hash=ip_h,
-            user_agent=ua,
-        )
-        logged.append(w)
-
-    status_code = 201 if logged else 200
+    # Com o buffer, os termos aceitos ainda não estão no banco: vêm em `queued`.
+    if buffered:
+        logged, queued = [], accepted
+        status_code = 202 if queued else 200
+    else:
+        logged, queued = accepted, []
+        status_code = 201 if logged else 200
     return JsonResponse(
         {
             "logged": logged,
-            "ignored": {"short": ignored_short, "recent": ignored_recent},
-            "total_phrase": phrase,
+            "queued": queued,
+            "ignored": {"short": list(short.values()), "recent": ignored_recent},
+            "total_phrase": " | ".join(phrases),
+            "buffered": buffered,
         },
         status=status_code,
     )
@@ -947,28 +1233,8 @@ def home(request):
 def _update_asked_terms(text: str):
     """Extrai termos de uma pergunta e atualiza contadores de AskedTerm.
     Executado somente durante submissão de nova pergunta.
+    Um único upsert atômico para todos os termos (ver `questions.asked_terms`).
     """
     if not text:
         return
-    import re
-    from django.utils import timezone as _tz
-    tokens = re.findall(r"[\wÀ-ÖØ-öø-ÿ]{4,}", (text or "").strip(), flags=re.UNICODE)
-    if not tokens:
-        return
-    seen = set()
-    for raw in tokens:
-        w = raw.strip()
-        if not w or len(w) < 4:
-            continue
-        key = w.casefold()
-        if key in seen:
-            continue
-        seen.add(key)
-        obj, created = AskedTerm.objects.get_or_create(term=w[:200])
-        if created:
-            obj.count = 1
-            obj.save(update_fields=["count"])
-        else:
-            obj.count = obj.count + 1
-            obj.last_seen = _tz.now()
-            obj.save(update_fields=["count", "last_seen"])
+    record_question_terms(text)
@@ -0,0 +1,12 @@
+"""Configuração do gunicorn (carregada com `--config python:samu_q.gunicorn_conf`).
+
+As opções de linha de comando do entrypoint continuam valendo; aqui ficam só os
+hooks de ciclo de vida dos workers.
+"""
+
+
+def worker_exit(server, worker):
+    # Grava os termos de busca ainda no buffer do worker (questions/search_log.py).
+    from questions.search_log import flush_search_log_buffer
+
+    flush_search_log_buffer()
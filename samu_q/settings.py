@@ -152,6 +152,46 @@ BUILD_SHA = os.getenv('BUILD_SHA', 'dev-local')
 BUILD_DATE = os.getenv('BUILD_DATE', 'unknown')
 APP_VERSION = os.getenv('APP_VERSION', 'dev')
 
+# /api/rules/: por padrão serve um snapshot em memória por worker. Com streaming
+# ligado, emite uma regra por vez (memória limitada; útil para manuais grandes).
+RULES_API_STREAMING = os.getenv('RULES_API_STREAMING', 'False').lower() in ('1', 'true', 'yes', 'on')
+
+# /api/rules/ atrás do nginx: o snapshot é gravado uma vez por versão em
+# STATIC_ROOT/rules/ (json, .gz e .br, nome pelo hash do conteúdo) e a view só
+# responde com X-Accel-Redirect para a variante certa (ver nginx/default.conf).
+# Desligado por padrão: sem o nginx na frente a resposta sairia vazia.
+RULES_ACCEL_REDIRECT = os.getenv('RULES_ACCEL_REDIRECT', 'False').lower() in ('1', 'true', 'yes', 'on')
+RULES_ARTIFACTS_DIR = Path(os.getenv('RULES_ARTIFACTS_DIR', str(STATIC_ROOT / 'rules')))
+RULES_ACCEL_PREFIX = os.getenv('RULES_ACCEL_PREFIX', '/_rules_artifacts/')
+
+# Busca de regras (/api/rules/search/): pesos BM25 por campo do bullet.
+# Campos: text, tags, card_title, rule_title (ver questions/search/bm25.py).
+RULES_SEARCH_BOOSTS = {
+    'text': float(os.getenv('RULES_SEARCH_BOOST_TEXT', '1.0')),
+    'tags': float(os.getenv('RULES_SEARCH_BOOST_TAGS', '1.5')),
+    'card_title': float(os.getenv('RULES_SEARCH_BOOST_CARD_TITLE', '1.5')),
+    'rule_title': float(os.getenv('RULES_SEARCH_BOOST_RULE_TITLE', '2.0')),
+}
+
+# Backend da busca de regras: 'python' (índice em memória, padrão) ou 'db'
+# (FULLTEXT do MariaDB / FTS5 do SQLite, ver questions/search/backends.py).
+RULES_SEARCH_BACKEND = os.getenv('RULES_SEARCH_BACKEND', 'python').strip().lower()
+
+# Cache LRU de resultados de /api/rules/search/ (por worker, invalidado a cada
+# versão do manual): máximo de consultas guardadas (0 desliga) e validade em s.
+RULES_SEARCH_CACHE_SIZE = int(os.getenv('RULES_SEARCH_CACHE_SIZE', '512'))
+RULES_SEARCH_CACHE_TTL = float(os.getenv('RULES_SEARCH_CACHE_TTL', '300'))
+
+# /api/search-log/: termos sem resultado ficam num buffer por worker e são
+# gravados em lote ao atingir SIZE termos, SECONDS após o primeiro pendente ou na
+# saída do worker (questions/search_log.py). SIZE=0 (padrão) grava na hora, no
+# request; produção liga o buffer em .env.prod.
+SEARCH_LOG_BUFFER_SIZE = int(os.getenv('SEARCH_LOG_BUFFER_SIZE', '0'))
+SEARCH_LOG_BUFFER_SECONDS = float(os.getenv('SEARCH_LOG_BUFFER_SECONDS', '30'))
+
+# Exportações da inbox/admin (questions/exports.py): linhas lidas por query.
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', '2000'))
+
 # Open Graph / Facebook (para o debugger/scraper)
 FB_APP_ID = os.getenv('FB_APP_ID', '').strip()
 
@@ -128,7 +128,7 @@ python manage.py check --deploy || echo "[entrypoint] Aviso: check --deploy reto
 echo "[entrypoint] Iniciando Gunicorn..."
 if [ "$(id -u)" = "0" ]; then
   # Droppa privilégios para appuser
-  exec su -s /bin/sh appuser -c "gunicorn samu_q.wsgi:application --bind 0.0.0.0:8000 --workers ${GUNICORN_WORKERS:-3} --timeout ${GUNICORN_TIMEOUT:-60} --access-logfile - --error-logfile -"
+  exec su -s /bin/sh appuser -c "gunicorn samu_q.wsgi:application --config python:samu_q.gunicorn_conf --bind 0.0.0.0:8000 --workers ${GUNICORN_WORKERS:-3} --timeout ${GUNICORN_TIMEOUT:-60} --access-logfile - --error-logfile -"
 else
-  exec gunicorn samu_q.wsgi:application --bind 0.0.0.0:8000 --workers "${GUNICORN_WORKERS:-3}" --timeout "${GUNICORN_TIMEOUT:-60}" --access-logfile - --error-logfile -
+  exec gunicorn samu_q.wsgi:application --config python:samu_q.gunicorn_conf --bind 0.0.0.0:8000 --workers "${GUNICORN_WORKERS:-3}" --timeout "${GUNICORN_TIMEOUT:-60}" --access-logfile - --error-logfile -
 fi
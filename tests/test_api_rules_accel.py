@@ -0,0 +1,91 @@
+import gzip
+import os
+import time
+
+import pytest
+
+from questions import rules_artifacts
+from questions.rules_cache import get_rules_snapshot
+
+
+@pytest.fixture
+def accel(settings, tmp_path):
+    settings.RULES_ACCEL_REDIRECT = True
+    settings.RULES_ARTIFACTS_DIR = tmp_path
+    settings.RULES_ACCEL_PREFIX = '/_rules_artifacts/'
+    rules_artifacts._PUBLISHED.clear()
+    yield tmp_path
+    rules_artifacts._PUBLISHED.clear()
+
+
+@pytest.mark.django_db
+def test_api_rules_redirects_to_precompressed_artifact(client, published_rule, accel):
+    resp = client.get('/api/rules/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+    assert resp.status_code == 200
+    assert resp.content == b''
+    assert resp['Content-Encoding'] == 'gzip'
+    assert resp['Vary'] == 'Accept-Encoding'
+    assert 'no-cache' in resp['Cache-Control']
+    snap = get_rules_snapshot()
+    assert resp['ETag'] == snap.etag
+    name = f'rules-{snap.digest}.json.gz'
+    assert resp['X-Accel-Redirect'] == '/_rules_artifacts/' + name
+    assert gzip.decompress((accel / name).read_bytes()) == snap.body
+
+
+@pytest.mark.django_db
+def test_api_rules_accel_picks_variant_from_accept_encoding(client, published_rule, accel):
+    plain = client.get('/api/rules/', HTTP_ACCEPT_ENCODING='gzip;q=0')
+    assert plain['X-Accel-Redirect'].endswith('.json')
+    assert not plain.has_header('Content-Encoding')
+    assert (accel / plain['X-Accel-Redirect'].rsplit('/', 1)[1]).read_bytes() == get_rules_snapshot().body
+
+    if rules_artifacts.brotli is not None:
+        br = client.get('/api/rules/', HTTP_ACCEPT_ENCODING='gzip, br')
+        assert br['Content-Encoding'] == 'br'
+        assert br['X-Accel-Redirect'].endswith('.json.br')
+
+
+@pytest.mark.django_db
+def test_api_rules_accel_keeps_304_and_new_version_gets_new_file(client, published_rule, accel):
+    first = client.get('/api/rules/', HTTP_ACCEPT_ENCODING='gzip')
+    resp = client.get('/api/rules/', HTTP_IF_NONE_MATCH=first['ETag'])
+    assert resp.status_code == 304
+    assert not resp.has_header('X-Accel-Redirect')
+
+    published_rule.title = 'R1 revisada'
+    published_rule.save()
+    second = client.get('/api/rules/', HTTP_ACCEPT_ENCODING='gzip')
+    assert second['X-Accel-Redirect'] != first['X-Accel-Redirect']
+    assert (accel / first['X-Accel-Redirect'].rsplit('/', 1)[1]).exists()  # ainda dentro da janela
+
+
+@pytest.mark.django_db
+def test_api_rules_accel_republishes_pruned_artifact(client, published_rule, accel):
+    first = client.get('/api/rules/', HTTP_ACCEPT_ENCODING='gzip')
+    path = accel / first['X-Accel-Redirect'].rsplit('/', 1)[1]
+    path.unlink()  # _prune de outro worker
+    again = client.get('/api/rules/', HTTP_ACCEPT_ENCODING='gzip')
+    assert again['X-Accel-Redirect'] == first['X-Accel-Redirect']
+    assert gzip.decompress(path.read_bytes()) == get_rules_snapshot().body
+
+
+@pytest.mark.django_db
+def test_api_rules_accel_touches_reused_artifacts(client, published_rule, accel):
+    snap = get_rules_snapshot()
+    files = rules_artifacts.publish_rules_artifacts(snap)
+    old = time.time() - 2 * rules_artifacts.STALE_SECONDS
+    for name in files.values():
+        os.utime(accel / name, (old, old))
+    rules_artifacts._PUBLISHED.clear()  # outro worker
+    rules_artifacts.publish_rules_artifacts(snap)
+    assert all((accel / name).stat().st_mtime > old + 60 for name in files.values())
+
+
+@pytest.mark.django_db
+def test_api_rules_accel_falls_back_to_body_when_artifact_missing(client, published_rule, accel, monkeypatch):
+    monkeypatch.setattr(rules_artifacts, '_missing', lambda directory, files: True)
+    resp = client.get('/api/rules/', HTTP_ACCEPT_ENCODING='gzip')
+    assert resp.status_code == 200
+    assert not resp.has_header('X-Accel-Redirect')
+    assert resp.content == get_rules_snapshot().body
@@ -0,0 +1,167 @@
+import datetime
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from questions.models import Rule, RuleBullet, RuleCard, RulesChange, Tag
+from questions.rules_cache import bump_version, changes_between, current_version
+
+
+def _changes(client, since):
+    resp = client.get('/api/rules/changes/', {'since': since})
+    assert resp.status_code == 200
+    assert 'no-cache' in resp['Cache-Control']
+    return resp.json()
+
+
+@pytest.mark.django_db
+def test_changes_without_edits_is_empty(client, published_rule):
+    version = current_version()[0]
+    data = _changes(client, version)
+    assert data['version'] == version
+    assert data['resync'] is False
+    assert data['rules'] == data['cards'] == data['bullets'] == []
+    assert data['deleted'] == {'rules': [], 'cards': [], 'bullets': []}
+
+
+@pytest.mark.django_db
+def test_changes_returns_only_touched_nodes(client, published_rule):
+    other = Rule.objects.create(title='R2', slug='r2', order=2)
+    RuleBullet.objects.create(card=RuleCard.objects.create(rule=other, title='C2'), text='Outro')
+    since = current_version()[0]
+
+    bullet = RuleBullet.objects.get(card__rule=published_rule)
+    bullet.text = 'Bullet editado'
+    bullet.save()
+    bullet.tags.add(Tag.objects.create(name='Via aérea', slug='via-aerea'))
+
+    data = _changes(client, since)
+    assert data['version'] == current_version()[0] > since
+    assert data['rules'] == [] and data['cards'] == []
+    assert data['bullets'] == [{
+        'id': bullet.id, 'card_id': bullet.card_id, 'text': 'Bullet editado',
+        'order': 1, 'tags': ['Via aérea'],
+    }]
+
+
+@pytest.mark.django_db
+def test_changes_reports_deletes_and_unpublished(client, published_rule):
+    since = current_version()[0]
+    card = RuleCard.objects.get(rule=published_rule)
+    card_id, bullet_id = card.id, card.bullets.get().id
+    card.delete()
+    hidden = Rule.objects.create(title='Rascunho', slug='rascunho', is_published=False)
+
+    data = _changes(client, since)
+    assert data['deleted']['cards'] == [card_id]
+    assert data['deleted']['bullets'] == [bullet_id]
+    assert data['deleted']['rules'] == [hidden.id]
+    assert data['rules'] == []
+
+
+@pytest.mark.django_db
+def test_tag_rename_touches_linked_bullets(client, published_rule):
+    bullet = RuleBullet.objects.get(card__rule=published_rule)
+    tag = Tag.objects.create(name='Trauma', slug='trauma')
+    bullet.tags.add(tag)
+    since = current_version()[0]
+
+    tag.name = 'Politrauma'
+    tag.save()
+    data = _changes(client, since)
+    assert [b['tags'] for b in data['bullets']] == [['Politrauma']]
+
+    since_key = current_version()
+    tag.delete()
+    data = _changes(client, since_key[0])
+    assert [b['tags'] for b in data['bullets']] == [[]]
+    assert changes_between(since_key, current_version()) == {published_rule.id}
+
+
+@pytest.mark.django_db
+def test_changes_requests_resync_after_compaction(client, published_rule):
+    since_key = current_version()
+    since = since_key[0]
+    published_rule.title = 'R1 revisada'
+    published_rule.save()
+    RulesChange.objects.update(created_at=timezone.now() - datetime.timedelta(days=60))
+    published_rule.title = 'R1 final'
+    published_rule.save()
+
+    call_command('compact_rules_changes', '--keep-days', '30')
+    assert _changes(client, since)['resync'] is True
+    assert changes_between(since_key, current_version()) is None
+
+    data = _changes(client, current_version()[0] - 1)
+    assert data['resync'] is False
+    assert [r['title'] for r in data['rules']] == ['R1 final']
+
+
+@pytest.mark.django_db
+def test_changes_validates_since(client, published_rule):
+    assert client.get('/api/rules/changes/').status_code == 400
+    assert client.get('/api/rules/changes/', {'since': 'abc'}).status_code == 400
+    assert _changes(client, current_version()[0] + 5)['resync'] is True
+
+
+@pytest.mark.django_db
+def test_republished_rule_comes_back_with_its_subtree(client, published_rule):
+    card = RuleCard.objects.get(rule=published_rule)
+    bullet = card.bullets.get()
+    published_rule.is_published = False
+    published_rule.save()
+    since = current_version()[0]
+    published_rule.is_published = True
+    published_rule.save()
+
+    data = _changes(client, since)
+    assert [r['id'] for r in data['rules']] == [published_rule.id]
+    assert [c['id'] for c in data['cards']] == [card.id]
+    assert [b['id'] for b in data['bullets']] == [bullet.id]
+    assert data['deleted'] == {'rules': [], 'cards': [], 'bullets': []}
+
+
+@pytest.mark.django_db
+def test_republished_card_comes_back_with_its_bullets(client, published_rule):
+    card = RuleCard.objects.get(rule=published_rule)
+    card.is_published = False
+    card.save()
+    since = current_version()[0]
+    card.is_published = True
+    card.save()
+
+    data = _changes(client, since)
+    assert [c['id'] for c in data['cards']] == [card.id]
+    assert [b['id'] for b in data['bullets']] == [card.bullets.get().id]
+
+
+@pytest.mark.django_db
+def test_moved_bullet_reports_old_parent(client, published_rule):
+    old_card = RuleCard.objects.get(rule=published_rule)
+    kept = RuleBullet.objects.create(card=old_card, text='Fica', order=2)
+    other = Rule.objects.create(title='R2', slug='r2', order=2)
+    new_card = RuleCard.objects.create(rule=other, title='C2')
+    since = current_version()[0]
+    moved = old_card.bullets.get(text='Bullet 1')
+    moved.card = new_card
+    moved.save()
+
+    data = _changes(client, since)
+    # O card antigo volta com a lista completa (sem o bullet movido).
+    assert [c['id'] for c in data['cards']] == [old_card.id]
+    assert {(b['id'], b['card_id']) for b in data['bullets']} == {(kept.id, old_card.id), (moved.id, new_card.id)}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bump_version_is_atomic_in_autocommit(published_rule, monkeypatch):
+    version = current_version()
+
+    def fail(rows):
+        raise RuntimeError('diário indisponível')
+
+    monkeypatch.setattr(RulesChange.objects, 'bulk_create', fail)
+    with pytest.raises(RuntimeError):
+        bump_version([(RulesChange.KIND_RULE, published_rule.id, published_rule.id, RulesChange.ACTION_UPSERT)])
+    # O UPDATE da versão volta junto: nenhuma versão fica sem o seu diário.
+    assert current_version() == version
@@ -0,0 +1,68 @@
+import pytest
+from django.db.models import Count
+
+from questions.models import Category, Rule, RuleBullet, RuleCard, Tag
+
+
+@pytest.fixture
+def tagged_rules(db, category):
+    seguranca = Tag.objects.create(name="Cena segura", slug="cena-segura", kind="seguranca")
+    juridico = Tag.objects.create(name="Jurídico", slug="juridico", kind="juridico")
+    radio = Tag.objects.create(name="Rádio", slug="radio", kind="comunicacao")
+    r1 = Rule.objects.create(title="Recusa de atendimento", slug="recusa", category=category, order=1)
+    c1 = RuleCard.objects.create(rule=r1, title="Termo", order=1)
+    RuleBullet.objects.create(card=c1, text="Paciente pode recusar o transporte.", order=1).tags.add(juridico)
+    RuleBullet.objects.create(card=c1, text="Avaliar a cena antes da recusa.", order=2).tags.add(seguranca, juridico)
+    other = Category.objects.create(name="Regulação", slug="regulacao")
+    r2 = Rule.objects.create(title="Comunicação", slug="comunicacao", category=other, order=2)
+    c2 = RuleCard.objects.create(rule=r2, title="Rádio", order=1)
+    RuleBullet.objects.create(card=c2, text="Informar a central ao chegar na cena.", order=1).tags.add(radio, seguranca)
+    RuleBullet.objects.create(card=c2, text="Usar linguagem padronizada.", order=2)
+    return r1, r2
+
+
+def _by(items, key):
+    return {item[key]: (item["bullets"], item["rules"]) for item in items}
+
+
+@pytest.mark.django_db
+def test_facets_without_query_count_whole_manual(client, tagged_rules):
+    resp = client.get('/api/rules/facets/')
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data['total'] == {'bullets': 4, 'rules': 2}
+    assert _by(data['tags'], 'slug') == {'juridico': (2, 1), 'cena-segura': (2, 2), 'radio': (1, 1)}
+    kinds = _by(data['kinds'], 'kind')
+    assert kinds['seguranca'] == (2, 2)
+    assert kinds['juridico'] == (2, 1)
+    assert kinds['operacional'] == (0, 0)
+    assert _by(data['categories'], 'name') == {'Cat A': (2, 1), 'Regulação': (2, 1)}
+
+
+@pytest.mark.django_db
+def test_facets_follow_text_query(client, tagged_rules):
+    data = client.get('/api/rules/facets/', {'q': 'cena'}).json()
+    assert data['total'] == {'bullets': 2, 'rules': 2}
+    assert _by(data['tags'], 'slug') == {'cena-segura': (2, 2), 'juridico': (1, 1), 'radio': (1, 1)}
+    assert client.get('/api/rules/facets/', {'q': 'inexistente'}).json()['total'] == {'bullets': 0, 'rules': 0}
+
+
+@pytest.mark.django_db
+def test_facets_match_group_by_counts(client, tagged_rules, django_assert_max_num_queries):
+    client.get('/api/rules/facets/')
+    with django_assert_max_num_queries(1):
+        data = client.get('/api/rules/facets/', {'q': 'paciente cena', 'match': 'any'}).json()
+    expected = dict(
+        Tag.objects.filter(bullets__text__iregex=r'paciente|cena')
+        .annotate(n=Count('bullets')).values_list('slug', 'n')
+    )
+    assert {t['slug']: t['bullets'] for t in data['tags']} == expected
+
+
+@pytest.mark.django_db
+def test_facets_reflect_tag_edits(client, tagged_rules):
+    client.get('/api/rules/facets/')
+    Tag.objects.get(slug='radio').bullets.add(*RuleBullet.objects.filter(text__startswith='Usar'))
+    data = client.get('/api/rules/facets/').json()
+    assert _by(data['tags'], 'slug')['radio'] == (2, 1)
+    assert client.get('/api/rules/facets/', {'match': 'x'}).status_code == 400
@@ -0,0 +1,38 @@
+import pytest
+
+from questions.models import Rule, RuleCard
+
+
+@pytest.mark.django_db
+def test_rules_index_is_summary_only(client, published_rule):
+    RuleCard.objects.create(rule=published_rule, title="Oculto", order=2, is_published=False)
+    Rule.objects.create(title="Rascunho", slug="rascunho", is_published=False)
+    resp = client.get('/api/rules/index/')
+    assert resp.status_code == 200
+    assert resp.json() == {'results': [
+        {'id': published_rule.id, 'title': 'R1', 'slug': 'r1', 'category': 'Cat A', 'cards_count': 1},
+    ]}
+    assert client.get('/api/rules/index/', HTTP_IF_NONE_MATCH=resp['ETag']).status_code == 304
+
+
+@pytest.mark.django_db
+def test_rule_detail_matches_full_payload(client, published_rule):
+    full = client.get('/api/rules/').json()['results'][0]
+    resp = client.get('/api/rules/r1/')
+    assert resp.status_code == 200
+    assert resp.json() == full
+    assert resp['ETag'] != client.get('/api/rules/index/')['ETag']
+
+
+@pytest.mark.django_db
+def test_rule_detail_unknown_or_unpublished(client, published_rule):
+    assert client.get('/api/rules/nao-existe/').status_code == 404
+    published_rule.is_published = False
+    published_rule.save()
+    assert client.get('/api/rules/r1/').status_code == 404
+
+
+@pytest.mark.django_db
+def test_rule_detail_accepts_accented_slug(client, category):
+    Rule.objects.create(title="Regulação", slug="regulação", category=category)
+    assert client.get('/api/rules/regulação/').status_code == 200
@@ -0,0 +1,60 @@
+import pytest
+
+from questions.models import Rule, RuleBullet, RuleCard, Tag
+from questions.search.highlight import snippet
+
+
+@pytest.fixture
+def recusa_rule(db, category):
+    r = Rule.objects.create(title="Recusa de atendimento", slug="recusa", category=category, order=1)
+    card = RuleCard.objects.create(rule=r, title="Termo de recusa", order=1)
+    b1 = RuleBullet.objects.create(card=card, text="Paciente LÚCIDO pode recusar; registrar a Recusa.", order=1)
+    b2 = RuleBullet.objects.create(card=card, text="Orientar sobre riscos.", order=2)
+    b2.tags.add(Tag.objects.create(name="Recusa", slug="recusa"))
+    return b1, b2
+
+
+def _marked(text, spans):
+    return [text[s:e] for s, e in spans]
+
+
+@pytest.mark.django_db
+def test_matches_return_offsets_in_original_text(client, recusa_rule):
+    b1, b2 = recusa_rule
+    resp = client.get('/api/rules/matches/', {'q': 'lucido recus'})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data['total_hits'] == 1
+    hit = data['results'][0]
+    assert hit['id'] == b1.id and hit['card_id'] == b1.card_id
+    assert _marked(b1.text, hit['matches']) == ['LÚCIDO', 'recusar', 'Recusa']
+    assert hit['snippet']['text'] == b1.text
+    assert _marked(hit['snippet']['text'], hit['snippet']['highlights']) == ['LÚCIDO', 'recusar', 'Recusa']
+
+
+@pytest.mark.django_db
+def test_matches_by_tag_only_have_no_offsets(client, recusa_rule):
+    b1, b2 = recusa_rule
+    data = client.get('/api/rules/matches/', {'q': 'recusa riscos', 'match': 'any'}).json()
+    by_id = {h['id']: h for h in data['results']}
+    assert _marked(b2.text, by_id[b2.id]['matches']) == ['riscos']
+    data = client.get('/api/rules/matches/', {'q': 'recusa '}).json()
+    assert [h['id'] for h in data['results']] == [b1.id, b2.id]
+    assert data['results'][1]['matches'] == []
+
+
+@pytest.mark.django_db
+def test_matches_validation(client, recusa_rule):
+    assert client.get('/api/rules/matches/', {'q': ' '}).status_code == 400
+    assert client.get('/api/rules/matches/', {'q': 'x', 'snippet': 'abc'}).status_code == 400
+
+
+def test_snippet_windows_long_text_around_matches():
+    text = ("Texto inicial de contexto " * 10) + "ponto alvo aqui" + (" e mais contexto no fim" * 10)
+    start = text.index("alvo")
+    snip = snippet(text, [(start, start + 4)], width=60)
+    assert len(snip['text']) <= 60
+    assert 0 < snip['start'] < start < snip['end'] < len(text)
+    assert _marked(snip['text'], snip['highlights']) == ['alvo']
+    # bordas não cortam palavras
+    assert text[snip['start'] - 1] == ' ' and text[snip['end']] == ' '
@@ -0,0 +1,102 @@
+import pytest
+
+from questions.models import Rule, RuleBullet, RuleCard, Tag
+from questions.search.index import RulesIndex, get_rules_index
+
+
+@pytest.fixture
+def recusa_rule(db, category):
+    r = Rule.objects.create(title="Recusa de atendimento", slug="recusa", category=category, order=2)
+    c1 = RuleCard.objects.create(rule=r, title="Termo de recusa", order=1)
+    c2 = RuleCard.objects.create(rule=r, title="Orientações", order=2)
+    b1 = RuleBullet.objects.create(card=c1, text="Paciente lúcido pode recusar o transporte.", order=1)
+    RuleBullet.objects.create(card=c1, text="Registrar a recusa com testemunhas.", order=2)
+    b3 = RuleBullet.objects.create(card=c2, text="Orientar o paciente sobre os riscos.", order=1)
+    b3.tags.add(Tag.objects.create(name="Jurídico", slug="juridico", kind="juridico"))
+    return r, b1, b3
+
+
+@pytest.mark.django_db
+def test_search_groups_hits_by_rule_and_card(client, published_rule, recusa_rule):
+    rule, b1, b3 = recusa_rule
+    resp = client.get('/api/rules/search/', {'q': 'RECUSA paciente '})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data['tokens'] == ['recusa', 'paciente']
+    assert data['total_hits'] == 2
+    [hit] = data['results']
+    assert hit['slug'] == 'recusa' and hit['hits'] == 2
+    assert [(c['title'], c['bullet_ids']) for c in hit['cards']] == [
+        ('Termo de recusa', [b1.id]),
+        ('Orientações', [b3.id]),
+    ]
+
+
+@pytest.mark.django_db
+def test_search_is_accent_insensitive_and_covers_tags(client, recusa_rule):
+    _, _, b3 = recusa_rule
+    data = client.get('/api/rules/search/', {'q': 'juridico'}).json()
+    assert data['total_hits'] == 1
+    assert data['results'][0]['cards'][0]['bullet_ids'] == [b3.id]
+    # Última palavra funciona como prefixo enquanto digita
+    assert client.get('/api/rules/search/', {'q': 'testemu'}).json()['total_hits'] == 1
+
+
+@pytest.mark.django_db
+def test_search_requires_query(client):
+    assert client.get('/api/rules/search/', {'q': '  '}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_index_follows_rule_edits(published_rule, recusa_rule):
+    assert get_rules_index().match('bullet')[1]
+    RuleBullet.objects.filter(card__rule=published_rule).delete()
+    assert not get_rules_index().match('bullet')[1]
+
+
+@pytest.mark.django_db
+def test_incremental_reload_matches_full_build(published_rule, recusa_rule):
+    rule, b1, _ = recusa_rule
+    idx = RulesIndex.build((1, None))
+    b1.text = "Paciente consciente pode recusar."
+    b1.save()
+    incremental = idx.with_rules_reloaded({rule.id}, (2, None))
+    full = RulesIndex.build((2, None))
+    assert incremental.postings == full.postings
+    assert 'lucido' not in incremental.postings
+
+
+@pytest.mark.django_db
+def test_moving_bullet_and_card_reindexes_both_rules(client, published_rule, recusa_rule):
+    rule, b1, b3 = recusa_rule
+    get_rules_index()
+    b1.card = RuleCard.objects.get(rule=published_rule)
+    b1.save()
+    b3.card.rule = published_rule
+    b3.card.save()
+    get_rules_index()
+    # Edita as duas regras depois da mudança (antes: KeyError no índice incremental).
+    rule.title = "Recusa"
+    rule.save()
+    published_rule.title = "R1 editada"
+    published_rule.save()
+
+    idx = get_rules_index()
+    full = RulesIndex.build(idx.version_key)
+    assert idx.postings == full.postings
+    assert idx.bullets == full.bullets
+    assert idx.bullets[b1.id].rule_id == published_rule.id
+    assert client.get('/api/rules/search/', {'q': 'lucido'}).status_code == 200
+
+
+@pytest.mark.django_db
+def test_reload_tolerates_bullet_indexed_under_other_rule(published_rule, recusa_rule):
+    # Diário incompleto (só a regra nova): o doc antigo não pode ficar para trás.
+    rule, b1, _ = recusa_rule
+    idx = RulesIndex.build((1, None))
+    b1.card = RuleCard.objects.get(rule=published_rule)
+    b1.save()
+    moved = idx.with_rules_reloaded({published_rule.id}, (2, None))
+    again = moved.with_rules_reloaded({rule.id}, (3, None))
+    full = RulesIndex.build((3, None))
+    assert again.postings == full.postings and again.bullets == full.bullets
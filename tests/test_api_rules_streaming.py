@@ -0,0 +1,35 @@
+import pytest
+
+from questions.models import Rule, RuleBullet, RuleCard, Tag
+
+
+@pytest.fixture
+def two_rules(published_rule):
+    r2 = Rule.objects.create(title="Ética", slug="etica", order=2)
+    card = RuleCard.objects.create(rule=r2, title="Sigilo", order=1)
+    b = RuleBullet.objects.create(card=card, text="Não divulgar dados — “sigilo”.", order=1)
+    b.tags.add(Tag.objects.create(name="Jurídico", slug="juridico"))
+    return published_rule, r2
+
+
+@pytest.mark.django_db
+def test_streaming_output_matches_snapshot(client, two_rules):
+    snapshot = client.get('/api/rules/', {'stream': '0'})
+    streamed = client.get('/api/rules/', {'stream': '1'})
+    assert streamed.streaming
+    assert b''.join(streamed.streaming_content) == snapshot.content
+
+
+@pytest.mark.django_db
+def test_streaming_honours_if_none_match(client, two_rules):
+    etag = client.get('/api/rules/', {'stream': '1'})['ETag']
+    assert etag.startswith('W/"rules-')
+    resp = client.get('/api/rules/', {'stream': '1'}, HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == 304
+
+
+@pytest.mark.django_db
+def test_streaming_enabled_by_setting(client, settings, two_rules):
+    settings.RULES_API_STREAMING = True
+    assert client.get('/api/rules/').streaming
+    assert not client.get('/api/rules/', {'stream': '0'}).streaming
@@ -1,5 +1,7 @@
 import json
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from questions.models import SearchLog
 
@@ -26,3 +28,51 @@ def test_search_log_dedup_window(client):
     # Duplica imediatamente
     client.post('/api/search-log', data=json.dumps({'term': 'abcde', 'results_count': 0}), content_type='application/json')
     assert SearchLog.objects.count() == first_count  # sem novo registro immediate
+
+
+def _post(client, payload):
+    return client.post('/api/search-log/', data=json.dumps(payload), content_type='application/json')
+
+
+@pytest.mark.django_db
+def test_search_log_accepts_batched_phrases(client):
+    resp = _post(client, {'terms': [
+        'intubação difícil',
+        {'term': 'Intubação sedação', 'results_count': 0},
+        {'term': 'ignorada porque teve resultado', 'results_count': 3},
+    ]})
+    assert resp.status_code == 201
+    data = resp.json()
+    assert data['logged'] == ['intubação', 'difícil', 'sedação']
+    assert sorted(SearchLog.objects.values_list('term', flat=True)) == ['difícil', 'intubação', 'sedação']
+    # Repetido na janela de 2h: nada novo
+    again = _post(client, {'terms': ['DIFÍCIL sedação']}).json()
+    assert again['logged'] == [] and len(again['ignored']['recent']) == 2
+    assert SearchLog.objects.count() == 3
+
+
+@pytest.mark.django_db
+def test_search_log_reports_short_words(client):
+    data = _post(client, {'term': 'PCR na sala de intubação', 'results_count': 0}).json()
+    assert data['logged'] == ['sala', 'intubação']
+    assert data['ignored']['short'] == ['PCR', 'na', 'de']
+    assert sorted(SearchLog.objects.values_list('term', flat=True)) == ['intubação', 'sala']
+
+
+@pytest.mark.django_db
+def test_search_log_rejects_invalid_batch(client):
+    assert _post(client, {'terms': []}).status_code == 400
+    assert _post(client, {'terms': [42]}).status_code == 400
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('words', [1, 5, 40])
+def test_search_log_query_count_is_constant(client, words):
+    SearchLog.objects.create(term='palavra0000')
+    phrase = ' '.join(f'palavra{i:04d}' for i in range(words))
+    with CaptureQueriesContext(connection) as ctx:
+        resp = _post(client, {'terms': [phrase, 'outra frase longa']})
+    assert resp.status_code == 201
+    assert SearchLog.objects.count() == words + 3
+    # 1 SELECT dos termos recentes + 1 bulk INSERT
+    assert len(ctx.captured_queries) == 2
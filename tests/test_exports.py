@@ -0,0 +1,100 @@
+import csv
+import datetime
+import gzip
+import io
+import json
+
+import pytest
+from django.contrib.admin.sites import site
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from questions.admin import export_selected_csv
+from questions.exports import EXPORTS, export_response
+from questions.models import AskedTerm, ChecklistSubmission, Question, SearchLog
+
+
+@pytest.fixture
+def staff_client(client, django_user_model):
+    client.force_login(django_user_model.objects.create_user('staff', password='x', is_staff=True))
+    return client
+
+
+def _body(resp):
+    assert resp.streaming
+    return b''.join(resp.streaming_content)
+
+
+def _aware(day, hour=12):
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time(hour)))
+
+
+@pytest.mark.django_db
+def test_csv_streams_all_rows_in_keyset_chunks():
+    Question.objects.bulk_create([Question(text=f'pergunta {i}') for i in range(25)])
+    spec = EXPORTS['questions']
+    with CaptureQueriesContext(connection) as ctx:
+        rows = list(csv.reader(io.StringIO(_body(export_response(spec, Question.objects.all(), chunk_size=10)).decode())))
+    assert rows[0] == list(spec.fields)
+    ids = [int(r[0]) for r in rows[1:]]
+    assert len(ids) == 25 and ids == sorted(ids, reverse=True)
+    assert len(ctx.captured_queries) == 3  # 10 + 10 + 5, sem COUNT
+
+
+@pytest.mark.django_db
+def test_ndjson_gzip():
+    AskedTerm.objects.create(term='Intubação', term_norm='intubacao', count=3)
+    resp = export_response(EXPORTS['asked-terms'], AskedTerm.objects.all(), 'ndjson', compress=True)
+    assert resp['Content-Type'] == 'application/gzip'
+    assert 'termos-perguntas.ndjson.gz' in resp['Content-Disposition']
+    lines = gzip.decompress(_body(resp)).decode().splitlines()
+    row = json.loads(lines[0])
+    assert row['term'] == 'Intubação' and row['count'] == 3 and row['last_seen']
+
+
+@pytest.mark.django_db
+def test_export_view_filters_period_and_inbox_params(staff_client):
+    today = timezone.localdate()
+    yesterday = today - datetime.timedelta(days=1)
+    Question.objects.create(text='Recusa antiga', created_at=_aware(yesterday))
+    Question.objects.create(text='Recusa de hoje', created_at=_aware(today, 0))
+    Question.objects.create(text='Outra de hoje', created_at=_aware(today), status='reviewed')
+    url = '/inbox/export/questions/'
+
+    body = _body(staff_client.get(url, {'start': today.isoformat(), 'q': 'recusa'})).decode()
+    assert 'Recusa de hoje' in body and 'antiga' not in body and 'Outra' not in body
+    body = _body(staff_client.get(url, {'end': yesterday.isoformat()})).decode()
+    assert 'Recusa antiga' in body and 'hoje' not in body
+    body = _body(staff_client.get(url, {'status': 'reviewed', 'format': 'ndjson'})).decode()
+    assert [json.loads(line)['text'] for line in body.splitlines()] == ['Outra de hoje']
+
+    assert staff_client.get(url, {'start': '17/10/2026'}).status_code == 400
+    assert staff_client.get(url, {'format': 'xml'}).status_code == 400
+    assert staff_client.get('/inbox/export/users/').status_code == 404
+
+
+@pytest.mark.django_db
+def test_legacy_export_url_still_downloads_csv(staff_client):
+    Question.objects.create(text='Dúvida')
+    resp = staff_client.get('/inbox/export.csv')
+    assert 'perguntas.csv' in resp['Content-Disposition']
+    assert 'Dúvida' in _body(resp).decode()
+
+
+@pytest.mark.django_db
+def test_export_requires_staff(client):
+    assert client.get('/inbox/export/search-log/').status_code == 302
+
+
+@pytest.mark.django_db
+def test_admin_actions_export_selected(admin_client):
+    ChecklistSubmission.objects.create(doctor_name='Dra. Ana', unit='USA 01', text='ok')
+    other = ChecklistSubmission.objects.create(doctor_name='Dr. Beto', unit='USA 02', text='ok')
+    SearchLog.objects.create(term='dipirona')
+    for model in (Question, ChecklistSubmission, SearchLog, AskedTerm):
+        assert export_selected_csv in site._registry[model].actions
+    resp = admin_client.post('/admin/questions/checklistsubmission/', {
+        'action': 'export_selected_ndjson', '_selected_action': [other.pk],
+    })
+    assert [json.loads(line)['doctor_name'] for line in _body(resp).decode().splitlines()] == ['Dr. Beto']
@@ -0,0 +1,74 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from questions.models import Question
+
+JSON = {'HTTP_ACCEPT': 'application/json'}
+
+
+@pytest.fixture
+def staff_client(client, django_user_model):
+    client.force_login(django_user_model.objects.create_user('staff', password='x', is_staff=True))
+    return client
+
+
+def _updates(ctx):
+    return [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('UPDATE "questions_question"')]
+
+
+@pytest.mark.django_db
+def test_bulk_selected_ids_single_update(staff_client):
+    qs = Question.objects.bulk_create([Question(text=f'p{i}') for i in range(60)])
+    ids = [q.pk for q in qs]
+    with CaptureQueriesContext(connection) as few:
+        resp = staff_client.post('/inbox/bulk/', {'ids': ids[:2], 'set_status': 'reviewed'}, **JSON)
+    assert resp.json()['updated'] == 2
+    with CaptureQueriesContext(connection) as many:
+        resp = staff_client.post('/inbox/bulk/', {'ids': ids[2:], 'set_status': 'reviewed',
+                                                  'set_category': '1', 'category': 'Treinamento'}, **JSON)
+    assert resp.json()['updated'] == 58
+    assert len(many.captured_queries) == len(few.captured_queries)
+    assert len(_updates(many)) == 1
+    assert Question.objects.filter(status='reviewed').count() == 60
+    assert Question.objects.filter(category='Treinamento').count() == 58
+
+
+@pytest.mark.django_db
+def test_bulk_all_matching_filter(staff_client):
+    Question.objects.create(text='Recusa de transporte')
+    Question.objects.create(text='Recusa de atendimento', status='reviewed')
+    other = Question.objects.create(text='Outra dúvida')
+    with CaptureQueriesContext(connection) as ctx:
+        resp = staff_client.post('/inbox/bulk/', {'scope': 'filter', 'q': 'recusa', 'status': 'new',
+                                                  'set_category': '1', 'category': 'Recusa'}, **JSON)
+    assert resp.json()['updated'] == 1
+    assert len(_updates(ctx)) == 1
+    assert list(Question.objects.filter(category='Recusa').values_list('text', flat=True)) == ['Recusa de transporte']
+    other.refresh_from_db()
+    assert other.category == ''
+
+
+@pytest.mark.django_db
+def test_bulk_form_redirects_back_with_count(staff_client):
+    q = Question.objects.create(text='Dúvida', category='Antiga')
+    resp = staff_client.post('/inbox/bulk/', {'ids': [q.pk], 'set_category': '1', 'category': '',
+                                              'q': 'dúvida', 'status': ''}, follow=True)
+    assert resp.redirect_chain[-1][0].startswith('/inbox/?q=d%C3%BAvida')
+    assert '1 pergunta(s) atualizada(s).' in resp.content.decode()
+    q.refresh_from_db()
+    assert q.category == ''
+
+
+@pytest.mark.django_db
+def test_bulk_rejects_bad_input(staff_client, client):
+    q = Question.objects.create(text='Dúvida')
+    assert staff_client.post('/inbox/bulk/', {'ids': [q.pk]}, **JSON).status_code == 400
+    assert staff_client.post('/inbox/bulk/', {'ids': [q.pk], 'set_status': 'spam'}, **JSON).status_code == 400
+    assert staff_client.post('/inbox/bulk/', {'ids': ['x'], 'set_status': 'reviewed'}, **JSON).status_code == 400
+    assert staff_client.post('/inbox/bulk/', {'set_status': 'reviewed'}, **JSON).status_code == 400
+    assert staff_client.get('/inbox/bulk/').status_code == 405
+    client.logout()
+    assert client.post('/inbox/bulk/', {'ids': [q.pk], 'set_status': 'reviewed'}).status_code == 302
+    q.refresh_from_db()
+    assert q.status == 'new'
@@ -0,0 +1,90 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from questions.models import ChecklistSubmission, Question
+from questions.pagination import approximate_count, decode_cursor, keyset_page
+
+
+@pytest.fixture
+def staff_client(client, django_user_model):
+    client.force_login(django_user_model.objects.create_user('staff', password='x', is_staff=True))
+    return client
+
+
+def _walk(qs, fields, per_page):
+    """Percorre todas as páginas pelo cursor `next` e volta pelo `prev`."""
+    pages = [keyset_page(qs, fields, per_page=per_page)]
+    while pages[-1].has_next:
+        pages.append(keyset_page(qs, fields, per_page=per_page, after=pages[-1].next_cursor))
+    back = [pages[-1]]
+    while back[-1].has_previous:
+        back.append(keyset_page(qs, fields, per_page=per_page, before=back[-1].previous_cursor))
+    return pages, back
+
+
+@pytest.mark.django_db
+def test_keyset_walks_forward_and_back_with_ties():
+    now = timezone.now()
+    for i in range(7):
+        s = ChecklistSubmission.objects.create(doctor_name=f'D{i}', unit='USA 01', text='x')
+        # empates em created_at: o id desempata
+        ChecklistSubmission.objects.filter(pk=s.pk).update(created_at=now - timezone.timedelta(minutes=i // 2))
+    qs = ChecklistSubmission.objects.all()
+    expected = list(qs.order_by('-created_at', '-id').values_list('id', flat=True))
+
+    pages, back = _walk(qs, ('created_at', 'id'), per_page=3)
+    assert [o.id for p in pages for o in p.object_list] == expected
+    assert [[o.id for o in p.object_list] for p in back] == [[o.id for o in p.object_list] for p in pages[::-1]]
+    assert not pages[0].has_previous and not back[-1].has_previous
+
+
+@pytest.mark.django_db
+def test_deep_page_costs_one_query():
+    Question.objects.bulk_create([Question(text=f'q{i}') for i in range(60)])
+    qs = Question.objects.all()
+    page = keyset_page(qs, ('id',), per_page=5)
+    for _ in range(8):
+        page = keyset_page(qs, ('id',), per_page=5, after=page.next_cursor)
+    with CaptureQueriesContext(connection) as ctx:
+        keyset_page(qs, ('id',), per_page=5, after=page.next_cursor)
+    assert len(ctx.captured_queries) == 1
+    assert 'OFFSET' not in ctx.captured_queries[0]['sql'].upper()
+    assert 'COUNT' not in ctx.captured_queries[0]['sql'].upper()
+
+
+@pytest.mark.django_db
+def test_invalid_cursor_falls_back_to_first_page():
+    Question.objects.create(text='a')
+    assert decode_cursor('nao-e-cursor', 1) is None
+    page = keyset_page(Question.objects.all(), ('id',), per_page=5, after='nao-e-cursor')
+    assert len(page.object_list) == 1 and not page.has_previous
+
+
+@pytest.mark.django_db
+def test_approximate_count_is_capped():
+    Question.objects.bulk_create([Question(text=f'q{i}') for i in range(12)])
+    assert approximate_count(Question.objects.all(), cap=10) == (10, True)
+    assert approximate_count(Question.objects.all(), cap=50) == (12, False)
+
+
+@pytest.mark.django_db
+def test_inbox_pages_by_cursor(staff_client):
+    Question.objects.bulk_create([Question(text=f'pergunta {i}') for i in range(20)])
+    first = staff_client.get('/inbox/')
+    assert first.status_code == 200
+    page = first.context['page_obj']
+    assert len(page.object_list) == 15 and page.has_next and first.context['total'] is None
+    second = staff_client.get('/inbox/', {'after': page.next_cursor, 'count': '1'})
+    assert len(second.context['page_obj'].object_list) == 5
+    assert second.context['total'] == (20, False)
+
+
+@pytest.mark.django_db
+def test_inbox_checklists_uses_keyset(staff_client):
+    for i in range(3):
+        ChecklistSubmission.objects.create(doctor_name=f'D{i}', unit='USA 01', text='ok')
+    resp = staff_client.get('/inbox/checklists/')
+    assert resp.status_code == 200
+    assert len(resp.context['page_obj'].object_list) == 3
@@ -0,0 +1,63 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from questions.inbox_search import search_checklists, search_questions
+from questions.models import ChecklistSubmission, Question
+
+pytestmark = pytest.mark.skipif(connection.vendor != 'sqlite', reason='FTS5 do SQLite')
+
+
+@pytest.fixture
+def staff_client(client, django_user_model):
+    client.force_login(django_user_model.objects.create_user('staff', password='x', is_staff=True))
+    return client
+
+
+def _ids(qs):
+    return sorted(qs.values_list('id', flat=True))
+
+
+@pytest.mark.django_db
+def test_question_search_uses_fts_and_follows_edits():
+    a = Question.objects.create(text='Intubação em criança pequena')
+    b = Question.objects.create(text='Sedação para intubacao')
+    Question.objects.create(text='Transporte de paciente')
+    with CaptureQueriesContext(connection) as ctx:
+        assert _ids(search_questions(Question.objects.all(), 'INTUBAÇÃO')) == [a.id, b.id]
+    assert 'questions_question_fts' in ctx.captured_queries[-1]['sql']
+    # Prefixo em todas as palavras, todas obrigatórias
+    assert _ids(search_questions(Question.objects.all(), 'intub crian')) == [a.id]
+
+    b.text = 'Sedação contínua'
+    b.save()
+    a.delete()
+    assert _ids(search_questions(Question.objects.all(), 'intubação')) == []
+    assert _ids(search_questions(Question.objects.all(), 'continua')) == [b.id]
+
+
+@pytest.mark.django_db
+def test_checklist_search_covers_name_unit_and_text():
+    s1 = ChecklistSubmission.objects.create(doctor_name='Dra. Márcia', unit='USA 01', text='Falta: oxímetro')
+    s2 = ChecklistSubmission.objects.create(doctor_name='Dr. João', unit='USA 02', text='Tudo ok')
+    qs = ChecklistSubmission.objects.all()
+    assert _ids(search_checklists(qs, 'marcia')) == [s1.id]
+    assert _ids(search_checklists(qs, 'usa 02')) == [s2.id]
+    assert _ids(search_checklists(qs, 'oximetro')) == [s1.id]
+
+
+@pytest.mark.django_db
+def test_stopword_only_query_falls_back_to_icontains():
+    q = Question.objects.create(text='Posso ou não?')
+    assert _ids(search_questions(Question.objects.all(), 'ou')) == [q.id]
+
+
+@pytest.mark.django_db
+def test_inbox_and_export_filter_through_index(staff_client):
+    Question.objects.create(text='Recusa de transporte')
+    Question.objects.create(text='Outra dúvida')
+    resp = staff_client.get('/inbox/', {'q': 'recusa'})
+    assert [o.text for o in resp.context['page_obj'].object_list] == ['Recusa de transporte']
+    resp = staff_client.get('/inbox/export.csv', {'q': 'RECUSA'})
+    csv_body = b''.join(resp.streaming_content).decode()
+    assert 'Recusa de transporte' in csv_body and 'Outra' not in csv_body
@@ -0,0 +1,104 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from questions.models import Rule, RuleBullet, RuleCard
+from questions.search.cache import QueryCache, query_cache_event, search_cache
+
+
+@pytest.fixture
+def cache():
+    search_cache.clear()
+    search_cache.reset_stats()
+    yield search_cache
+    search_cache.clear()
+
+
+@pytest.fixture
+def recusa_rule(db, category):
+    r = Rule.objects.create(title="Recusa de atendimento", slug="recusa", category=category, order=2)
+    card = RuleCard.objects.create(rule=r, title="Termo de recusa", order=1)
+    bullet = RuleBullet.objects.create(card=card, text="Paciente lúcido pode recusar o transporte.", order=1)
+    return r, bullet
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_evicts_least_recently_used():
+    c = QueryCache(maxsize=2, ttl=60)
+    c.set(1, "a", "A")
+    c.set(1, "b", "B")
+    assert c.get(1, "a") == "A"  # "a" passa a ser o mais recente
+    c.set(1, "c", "C")
+    assert c.get(1, "b") is None
+    assert c.get(1, "a") == "A" and c.get(1, "c") == "C"
+    stats = c.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["size"]) == (3, 1, 1, 2)
+
+
+def test_ttl_and_version_change_drop_entries():
+    clock = FakeClock()
+    c = QueryCache(maxsize=10, ttl=5, clock=clock)
+    c.set(1, "a", "A")
+    clock.now = 6
+    assert c.get(1, "a") is None
+    assert c.stats()["expirations"] == 1
+
+    c.set(1, "a", "A")
+    assert c.get(2, "a") is None
+    assert c.stats()["invalidations"] == 1 and c.stats()["size"] == 0
+
+
+def test_size_zero_disables_cache():
+    c = QueryCache(maxsize=0, ttl=60)
+    c.set(1, "a", "A")
+    assert c.get(1, "a") is None
+    assert c.stats()["misses"] == 0
+
+
+@pytest.mark.django_db
+def test_search_api_hits_cache_for_equivalent_queries(client, cache, recusa_rule):
+    first = client.get('/api/rules/search/', {'q': 'Recusa PACIENTE'}).json()
+    assert first['cached'] is False and first['total_hits'] == 1
+    with CaptureQueriesContext(connection) as ctx:
+        second = client.get('/api/rules/search/', {'q': 'recusa  paciente'}).json()
+    assert second['cached'] is True
+    assert second['q'] == 'recusa  paciente'
+    assert second['results'] == first['results']
+    assert len(ctx.captured_queries) == 1  # só a versão do manual
+    # Opções diferentes são outra entrada
+    assert client.get('/api/rules/search/', {'q': 'recusa paciente', 'match': 'any'}).json()['cached'] is False
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+
+@pytest.mark.django_db
+def test_rule_edit_invalidates_cached_results(client, cache, recusa_rule):
+    rule, _ = recusa_rule
+    assert client.get('/api/rules/search/', {'q': 'transporte'}).json()['total_hits'] == 1
+    card = RuleCard.objects.create(rule=rule, title="Outro", order=2)
+    RuleBullet.objects.create(card=card, text="Transporte negado pelo familiar.", order=1)
+    data = client.get('/api/rules/search/', {'q': 'transporte'}).json()
+    assert data['cached'] is False and data['total_hits'] == 2
+    assert cache.stats()["invalidations"] == 1
+
+
+@pytest.mark.django_db
+def test_cache_events_reach_instrumentation_hook(client, cache, recusa_rule):
+    events = []
+
+    def receiver(sender, event, stats, **kwargs):
+        events.append((event, stats["hits"], stats["misses"]))
+
+    query_cache_event.connect(receiver)
+    try:
+        client.get('/api/rules/search/', {'q': 'recusa'})
+        client.get('/api/rules/search/', {'q': 'recusa'})
+    finally:
+        query_cache_event.disconnect(receiver)
+    assert events == [("miss", 0, 1), ("hit", 1, 1)]
@@ -0,0 +1,57 @@
+import pytest
+
+from questions.models import Rule, RuleBullet, RuleCard
+from questions.search.bm25 import Bm25Scorer
+from questions.search.index import RulesIndex
+
+
+@pytest.fixture
+def ranking_rules(db):
+    # Regra com o termo só no meio de um bullet longo, e antes na ordem do manual
+    r1 = Rule.objects.create(title="Regulação", slug="regulacao", order=1)
+    c1 = RuleCard.objects.create(rule=r1, title="Fluxo", order=1)
+    RuleBullet.objects.create(
+        card=c1, order=1,
+        text="Em casos raros o médico regulador registra a recusa junto com vários outros dados da ocorrência.",
+    )
+    # Regra cujo título é o próprio termo
+    r2 = Rule.objects.create(title="Recusa de atendimento", slug="recusa", order=2)
+    c2 = RuleCard.objects.create(rule=r2, title="Conduta", order=1)
+    RuleBullet.objects.create(card=c2, text="Paciente lúcido pode recusar.", order=1)
+    return r1, r2
+
+
+@pytest.mark.django_db
+def test_relevance_order_uses_title_boost(client, ranking_rules):
+    data = client.get('/api/rules/search/', {'q': 'recusa '}).json()
+    assert data['order'] == 'relevance'
+    assert [r['slug'] for r in data['results']] == ['recusa', 'regulacao']
+    assert data['results'][0]['score'] > data['results'][1]['score']
+
+    manual = client.get('/api/rules/search/', {'q': 'recusa ', 'order': 'manual'}).json()
+    assert [r['slug'] for r in manual['results']] == ['regulacao', 'recusa']
+    assert 'score' not in manual['results'][0]
+
+
+@pytest.mark.django_db
+def test_match_any_returns_partial_matches(client, ranking_rules):
+    assert client.get('/api/rules/search/', {'q': 'recusa dados '}).json()['total_hits'] == 1
+    data = client.get('/api/rules/search/', {'q': 'recusa dados ', 'match': 'any'}).json()
+    assert data['total_hits'] == 2
+    # O bullet que tem as duas palavras vem primeiro
+    assert data['results'][0]['slug'] == 'regulacao'
+
+
+@pytest.mark.django_db
+def test_boosts_change_scores(ranking_rules):
+    index = RulesIndex.build()
+    plain = Bm25Scorer.from_index(index, boosts={'text': 1, 'tags': 1, 'card_title': 1, 'rule_title': 1})
+    boosted = Bm25Scorer.from_index(index, boosts={'text': 1, 'tags': 1, 'card_title': 1, 'rule_title': 5})
+    bid = next(b for b, d in index.bullets.items() if d.rule_id == ranking_rules[1].id)
+    assert boosted.score([['recusa']])[bid] > plain.score([['recusa']])[bid]
+    assert set(plain.idf) == set(index.postings)
+
+
+@pytest.mark.django_db
+def test_invalid_order_rejected(client):
+    assert client.get('/api/rules/search/', {'q': 'x', 'order': 'random'}).status_code == 400
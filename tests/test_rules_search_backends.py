@@ -0,0 +1,92 @@
+import pytest
+from django.db import connection
+
+from questions.models import Rule, RuleBullet, RuleCard, Synonym, Tag
+from questions.search.backends import PythonBackend, SqliteFtsBackend, get_search_backend
+
+pytestmark = pytest.mark.skipif(connection.vendor != 'sqlite', reason='testa o backend FTS5 do SQLite')
+
+
+@pytest.fixture
+def manual(db, category):
+    r = Rule.objects.create(title="Recusa de atendimento", slug="recusa", category=category, order=1)
+    c1 = RuleCard.objects.create(rule=r, title="Termo de recusa", order=1)
+    c2 = RuleCard.objects.create(rule=r, title="Orientações", order=2)
+    b1 = RuleBullet.objects.create(card=c1, text="Paciente lúcido pode recusar o transporte.", order=1)
+    b2 = RuleBullet.objects.create(card=c2, text="Orientar o paciente sobre os riscos.", order=1)
+    b2.tags.add(Tag.objects.create(name="Jurídico", slug="juridico"))
+    hidden = Rule.objects.create(title="Rascunho", slug="rascunho", is_published=False, order=2)
+    RuleBullet.objects.create(card=RuleCard.objects.create(rule=hidden, title="X"), text="Paciente oculto.")
+    return r, c1, c2, b1, b2
+
+
+def _hits(client, q, **params):
+    data = client.get('/api/rules/search/', {'q': q, **params}).json()
+    return {bid for rule in data['results'] for card in rule['cards'] for bid in card['bullet_ids']}, data
+
+
+@pytest.fixture
+def db_backend(settings):
+    settings.RULES_SEARCH_BACKEND = 'db'
+
+
+@pytest.mark.django_db
+def test_db_backend_is_selected(manual, settings):
+    assert isinstance(get_search_backend(), PythonBackend)
+    settings.RULES_SEARCH_BACKEND = 'db'
+    assert SqliteFtsBackend.available()
+    assert isinstance(get_search_backend(), SqliteFtsBackend)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('q,params', [
+    ('paciente', {}),
+    ('PACIENTE LUCIDO', {}),
+    ('juridico', {}),
+    ('recusa riscos', {'match': 'any'}),
+    ('orienta', {}),
+    ('paciente ', {'order': 'manual'}),
+])
+def test_db_backend_matches_python_backend(client, manual, settings, q, params):
+    expected, _ = _hits(client, q, **params)
+    settings.RULES_SEARCH_BACKEND = 'db'
+    got, data = _hits(client, q, **params)
+    assert data['backend'] == 'sqlite-fts5'
+    assert got == expected and got
+
+
+@pytest.mark.django_db
+def test_backends_return_same_payload_keys(client, manual, settings):
+    Synonym.objects.create(term='recusa', expansion='negativa')
+    _, python = _hits(client, 'recusa')
+    settings.RULES_SEARCH_BACKEND = 'db'
+    _, db = _hits(client, 'recusa')
+    assert set(python) == set(db)
+    assert python['backend'] == 'python' and db['backend'] == 'sqlite-fts5'
+    assert python['expanded'] and db['expanded'] == []
+
+
+@pytest.mark.django_db
+def test_fts_triggers_follow_edits(client, manual, db_backend):
+    r, c1, c2, b1, b2 = manual
+    b1.text = "Paciente consciente pode recusar."
+    b1.save()
+    assert _hits(client, 'lucido')[0] == set()
+    assert _hits(client, 'consciente')[0] == {b1.id}
+
+    b1.tags.add(Tag.objects.create(name="Ética", slug="etica"))
+    assert _hits(client, 'etica')[0] == {b1.id}
+    Tag.objects.filter(slug="etica").update(name="Bioética")
+    assert _hits(client, 'bioetica')[0] == {b1.id}
+    b1.tags.clear()
+    assert _hits(client, 'bioetica')[0] == set()
+
+    c2.title = "Riscos e consentimento"
+    c2.save()
+    assert _hits(client, 'consentimento')[0] == {b2.id}
+    r.title = "Negativa de atendimento"
+    r.save()
+    assert _hits(client, 'negativa')[0] == {b1.id, b2.id}
+
+    b2.delete()
+    assert _hits(client, 'consentimento')[0] == set()
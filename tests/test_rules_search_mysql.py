@@ -0,0 +1,36 @@
+import pytest
+from django.db import connection
+
+from questions.models import Rule, RuleBullet, RuleCard, Tag
+from questions.search.backends import MysqlFulltextBackend, get_search_backend
+
+BOOSTS = {"text": 1.0, "tags": 2.0, "card_title": 1.5, "rule_title": 1.25}
+
+
+def test_mysql_token_query_binds_term_per_match():
+    sql, params = MysqlFulltextBackend._token_query("recus*", BOOSTS)
+    assert sql.count("AGAINST (%s IN BOOLEAN MODE)") == 5
+    assert sql.count("%s") == len(params) == 9
+    assert [p for p in params if p == "recus*"] == ["recus*"] * 5
+    assert params[1] == BOOSTS["text"]
+    assert params[3::2] == [BOOSTS["card_title"], BOOSTS["rule_title"], BOOSTS["tags"]]
+    for column in ("b.text", "c.title", "r.title", "t.name"):
+        assert f"MATCH({column})" in sql
+
+
+# O FULLTEXT do InnoDB só enxerga linhas já commitadas: sem transação envolvendo o teste.
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.skipif(connection.vendor != 'mysql', reason='testa o backend FULLTEXT do MariaDB/MySQL')
+def test_mysql_backend_matches(category, settings):
+    r = Rule.objects.create(title="Recusa de atendimento", slug="recusa", category=category, order=1)
+    card = RuleCard.objects.create(rule=r, title="Termo de recusa", order=1)
+    b1 = RuleBullet.objects.create(card=card, text="Paciente lucido pode recusar o transporte.", order=1)
+    b2 = RuleBullet.objects.create(card=card, text="Orientar sobre os riscos.", order=2)
+    b2.tags.add(Tag.objects.create(name="Juridico", slug="juridico"))
+    settings.RULES_SEARCH_BACKEND = 'db'
+    backend = get_search_backend()
+    assert isinstance(backend, MysqlFulltextBackend)
+    assert set(backend.match(["paciente"], prefix_last=False, require_all=True)) == {b1.id}
+    assert set(backend.match(["juridico"], prefix_last=False, require_all=True)) == {b2.id}
+    assert set(backend.match(["recusa"], prefix_last=False, require_all=True)) == {b1.id, b2.id}
+    assert set(backend.match(["paciente", "risc"], prefix_last=True, require_all=False)) == {b1.id, b2.id}
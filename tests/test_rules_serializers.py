@@ -0,0 +1,43 @@
+import io
+
+import pytest
+from django.core.management import call_command
+
+from questions.models import Rule, RuleBullet, RuleCard, Tag
+from questions.serializers import serialize_rule_detail, serialize_rules, serialize_rules_prefetch
+
+
+@pytest.fixture
+def mixed_tree(published_rule):
+    r2 = Rule.objects.create(title="Ética", slug="etica", order=2)
+    visible = RuleCard.objects.create(rule=r2, title="", order=2)
+    RuleCard.objects.create(rule=r2, title="Rascunho", order=1, is_published=False)
+    b1 = RuleBullet.objects.create(card=visible, text="Sigilo", order=2)
+    RuleBullet.objects.create(card=visible, text="Primeiro", order=1)
+    b1.tags.add(Tag.objects.create(name="Jurídico", slug="juridico"), Tag.objects.create(name="Ética", slug="etica"))
+    Rule.objects.create(title="Oculta", slug="oculta", order=0, is_published=False)
+    return r2
+
+
+@pytest.mark.django_db
+def test_flat_serializer_matches_prefetch(mixed_tree):
+    assert serialize_rules() == serialize_rules_prefetch()
+    etica = serialize_rules()[1]
+    assert [b['text'] for b in etica['cards'][0]['bullets']] == ['Primeiro', 'Sigilo']
+    assert etica['cards'][0]['bullets'][1]['tags'] == ['Jurídico', 'Ética']
+
+
+@pytest.mark.django_db
+def test_flat_serializer_uses_one_query_per_level(mixed_tree, django_assert_num_queries):
+    with django_assert_num_queries(4):
+        serialize_rules()
+    with django_assert_num_queries(4):
+        assert serialize_rule_detail('etica')['title'] == 'Ética'
+    with django_assert_num_queries(1):
+        assert serialize_rule_detail('oculta') is None
+
+
+@pytest.mark.django_db
+def test_flat_serializer_matches_prefetch_on_seed():
+    call_command('seed_rules', fixture='rules_seed.json', stdout=io.StringIO())
+    assert serialize_rules() == serialize_rules_prefetch()
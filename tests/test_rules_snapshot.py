@@ -0,0 +1,47 @@
+import pytest
+
+from questions.models import RuleBullet, Tag
+from questions.rules_cache import current_version
+
+
+@pytest.mark.django_db
+def test_api_rules_sends_strong_etag(client, published_rule):
+    resp = client.get('/api/rules/')
+    assert resp.status_code == 200
+    etag = resp['ETag']
+    assert etag.startswith('"rules-') and not etag.startswith('W/')
+    assert 'no-cache' in resp['Cache-Control']
+    assert resp.json()['results'][0]['slug'] == 'r1'
+
+
+@pytest.mark.django_db
+def test_api_rules_if_none_match_returns_304(client, published_rule):
+    etag = client.get('/api/rules/')['ETag']
+    resp = client.get('/api/rules/', HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == 304
+    assert resp.content == b''
+    # ETag fraco (ex.: após gzip no nginx) também deve casar
+    resp = client.get('/api/rules/', HTTP_IF_NONE_MATCH=f'W/{etag}')
+    assert resp.status_code == 304
+
+
+@pytest.mark.django_db
+def test_rules_edit_bumps_version_and_etag(client, published_rule, django_assert_max_num_queries):
+    etag = client.get('/api/rules/')['ETag']
+    with django_assert_max_num_queries(1):
+        assert client.get('/api/rules/').status_code == 200
+
+    before = current_version()[0]
+    bullet = RuleBullet.objects.get(card__rule=published_rule)
+    bullet.text = 'Bullet editado'
+    bullet.save()
+    tag = Tag.objects.create(name='Segurança', slug='seguranca')
+    bullet.tags.add(tag)
+    assert current_version()[0] >= before + 3
+
+    resp = client.get('/api/rules/', HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == 200
+    assert resp['ETag'] != etag
+    b = resp.json()['results'][0]['cards'][0]['bullets'][0]
+    assert b['text'] == 'Bullet editado'
+    assert b['tags'] == ['Segurança']
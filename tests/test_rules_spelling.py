@@ -0,0 +1,47 @@
+import pytest
+
+from questions.models import Rule, RuleBullet, RuleCard
+from questions.search.spelling import SpellingDictionary, edit_distance
+
+
+@pytest.fixture
+def spelling_rules(db):
+    r = Rule.objects.create(title="Biossegurança", slug="bio", order=1)
+    c = RuleCard.objects.create(rule=r, title="EPI", order=1)
+    RuleBullet.objects.create(card=c, text="Em caso de recusa, registrar a intubação.", order=1)
+    return r
+
+
+def test_edit_distance_counts_transpositions():
+    assert edit_distance("recsua", "recusa", 2) == 1
+    assert edit_distance("recuza", "recusa", 2) == 1
+    assert edit_distance("abc", "xyzw", 2) == 3
+
+
+def test_dictionary_corrects_within_distance():
+    d = SpellingDictionary({"recusa": 3, "biosseguranca": 1, "intubacao": 2, "cena": 5})
+    assert d.correct("recuza") == "recusa"
+    assert d.correct("bioseguranca") == "biosseguranca"
+    assert d.correct("intubacao") == "intubacao"
+    assert d.correct("xxxxxxxx") is None
+    # palavras curtas não são corrigidas
+    assert d.correct("cna") is None
+
+
+@pytest.mark.django_db
+def test_search_returns_did_you_mean(client, spelling_rules):
+    data = client.get('/api/rules/search/', {'q': 'recuza intubaçao '}).json()
+    assert data['did_you_mean'] == 'recusa intubacao'
+    assert data['corrected'] is True
+    assert data['total_hits'] == 1
+
+    data = client.get('/api/rules/search/', {'q': 'biosegurança ', 'correct': '0'}).json()
+    assert data['did_you_mean'] is None
+    assert data['total_hits'] == 0
+
+
+@pytest.mark.django_db
+def test_known_terms_are_not_corrected(client, spelling_rules):
+    data = client.get('/api/rules/search/', {'q': 'recusa'}).json()
+    assert data['did_you_mean'] is None
+    assert data['corrected'] is False
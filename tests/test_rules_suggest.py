@@ -0,0 +1,44 @@
+import pytest
+
+from questions.models import Rule, RuleBullet, RuleCard
+from questions.search.suggest import KIND_RULE, KIND_TERM, Suggester
+
+
+@pytest.fixture
+def suggest_rules_data(db):
+    r = Rule.objects.create(title="Segurança da cena", slug="seguranca", order=1)
+    c = RuleCard.objects.create(rule=r, title="Avaliação", order=1)
+    RuleBullet.objects.create(card=c, text="Sinalizar a cena e avaliar a segurança.", order=1)
+    RuleBullet.objects.create(card=c, text="Segurança da equipe em primeiro lugar; sinalização adequada.", order=2)
+    return r
+
+
+def test_suggester_ranks_by_weight_with_bisect():
+    s = Suggester([
+        ("seguranca", "segurança", KIND_TERM, "", 5),
+        ("segundo", "segundo", KIND_TERM, "", 1),
+        ("sedacao", "sedação", KIND_TERM, "", 3),
+        ("seguranca da cena", "Segurança da cena", KIND_RULE, "seg", 1001),
+    ])
+    assert [e["text"] for e in s.suggest("SEG")] == ["Segurança da cena", "segurança", "segundo"]
+    assert [e["text"] for e in s.suggest("s", limit=2)] == ["Segurança da cena", "segurança"]
+    assert s.suggest("xyz") == []
+
+
+@pytest.mark.django_db
+def test_suggest_endpoint_accent_insensitive(client, suggest_rules_data):
+    data = client.get('/api/rules/suggest/', {'prefix': 'segura'}).json()
+    texts = [e['text'] for e in data['results']]
+    assert texts[0] == 'Segurança da cena'
+    assert data['results'][0]['slug'] == 'seguranca'
+    assert 'segurança' in texts
+
+    # Completa a última palavra mantendo as anteriores
+    data = client.get('/api/rules/suggest/', {'prefix': 'cena sinaliz'}).json()
+    assert {e['text'] for e in data['results']} == {'cena sinalizar', 'cena sinalização'}
+
+
+@pytest.mark.django_db
+def test_suggest_empty_and_invalid(client):
+    assert client.get('/api/rules/suggest/', {'prefix': ' '}).json()['results'] == []
+    assert client.get('/api/rules/suggest/', {'prefix': 'a', 'limit': 'x'}).status_code == 400
@@ -0,0 +1,71 @@
+import datetime
+import io
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from questions.models import AskedTerm, Rule, RuleBullet, RuleCard, SearchLog, Synonym
+from questions.rules_cache import current_version
+
+
+@pytest.fixture
+def manual(db, category):
+    r = Rule.objects.create(title="Unidade de Suporte Avançado", slug="usa", category=category, order=1)
+    card = RuleCard.objects.create(rule=r, title="Acionamento", order=1)
+    b1 = RuleBullet.objects.create(card=card, text="Na parada cardiorrespiratória iniciar compressões.", order=1)
+    b2 = RuleBullet.objects.create(card=card, text="Conferir o DEA antes do turno.", order=2)
+    return b1, b2
+
+
+def _ids(client, q, **params):
+    data = client.get('/api/rules/search/', {'q': q, **params}).json()
+    return {bid for rule in data['results'] for card in rule['cards'] for bid in card['bullet_ids']}, data
+
+
+@pytest.mark.django_db
+def test_acronym_expands_to_phrase_and_back(client, manual):
+    b1, b2 = manual
+    assert _ids(client, 'pcr ')[0] == set()
+    before = current_version()[0]
+    Synonym.objects.create(term="PCR", expansion="parada cardiorrespiratória")
+    Synonym.objects.create(term="DEA", expansion="desfibrilador externo automático")
+    assert current_version()[0] == before + 2
+
+    ids, data = _ids(client, 'PCR ')
+    assert ids == {b1.id}
+    assert data['expanded'] == [{'tokens': 'pcr', 'alternatives': ['parada cardiorrespiratoria']}]
+    assert _ids(client, 'desfibrilador externo automatico ')[0] == {b2.id}
+    assert _ids(client, 'pcr compressoes ')[0] == {b1.id}
+    assert _ids(client, 'pcr ', synonyms='0')[0] == set()
+
+
+@pytest.mark.django_db
+def test_one_way_and_inactive_synonyms(client, manual):
+    b1, _ = manual
+    Synonym.objects.create(term="RCP", expansion="parada cardiorrespiratória", bidirectional=False)
+    Synonym.objects.create(term="PC", expansion="compressões", is_active=False)
+    assert _ids(client, 'rcp ')[0] == {b1.id}
+    _, data = _ids(client, 'parada cardiorrespiratoria ')
+    assert data['expanded'] == []
+    assert _ids(client, 'pc ')[0] == set()
+
+
+@pytest.mark.django_db
+def test_propose_synonyms_from_logs(manual):
+    now = timezone.now()
+    # Como o /api/search-log/ grava: só buscas sem resultado (results_count=0).
+    SearchLog.objects.create(term="USA", ip_hash="a", results_count=0, created_at=now - datetime.timedelta(minutes=5))
+    AskedTerm.objects.create(term="usa", count=3)
+    SearchLog.objects.create(term="desfibrilador", ip_hash="b", results_count=0,
+                             created_at=now - datetime.timedelta(minutes=3))
+    SearchLog.objects.create(term="desfibrilador", ip_hash="c", results_count=0,
+                             created_at=now - datetime.timedelta(minutes=3))
+
+    out = io.StringIO()
+    call_command('propose_synonyms', '--create', stdout=out)
+    text = out.getvalue()
+    assert 'unidade suporte avancado' in text
+    assert 'sigla' in text
+    pairs = set(Synonym.objects.filter(is_active=False).values_list('term', 'expansion'))
+    assert pairs == {('usa', 'unidade suporte avancado')}  # "desfibrilador" não tem sigla no manual
@@ -0,0 +1,77 @@
+import datetime
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from questions.models import SearchLog
+from questions.search_log import search_log_buffer
+
+
+@pytest.fixture
+def buffer(settings):
+    settings.SEARCH_LOG_BUFFER_SIZE = 5
+    settings.SEARCH_LOG_BUFFER_SECONDS = 3600
+    search_log_buffer.clear()
+    yield search_log_buffer
+    search_log_buffer.clear()
+
+
+def _post(client, payload):
+    return client.post('/api/search-log/', data=json.dumps(payload), content_type='application/json')
+
+
+@pytest.mark.django_db
+def test_buffered_post_does_not_touch_db(client, buffer):
+    with CaptureQueriesContext(connection) as ctx:
+        resp = _post(client, {'term': 'intubação difícil', 'results_count': 0})
+    assert resp.status_code == 202
+    assert resp.json()['buffered'] is True
+    assert resp.json()['queued'] == ['intubação', 'difícil'] and resp.json()['logged'] == []
+    assert len(ctx.captured_queries) == 0
+    assert SearchLog.objects.count() == 0 and len(buffer) == 2
+
+    # Mesmo termo de novo: descartado em memória (janela de 2h)
+    again = _post(client, {'term': 'DIFÍCIL'}).json()
+    assert again['logged'] == [] and again['ignored']['recent'] == ['DIFÍCIL']
+
+    assert buffer.flush() == 2
+    assert sorted(SearchLog.objects.values_list('term', flat=True)) == ['difícil', 'intubação']
+    # Depois do flush o termo continua "recente" para este worker
+    assert _post(client, {'term': 'intubação'}).json()['queued'] == []
+
+
+@pytest.mark.django_db
+def test_buffer_flushes_when_full(client, buffer):
+    _post(client, {'term': 'alfa1 beta22 gama3'})
+    assert SearchLog.objects.count() == 0
+    _post(client, {'term': 'delta4 epsilon5'})  # 5 termos: enche o buffer
+    assert SearchLog.objects.count() == 5 and len(buffer) == 0
+
+
+@pytest.mark.django_db
+def test_flush_skips_terms_logged_by_other_workers(client, buffer):
+    SearchLog.objects.create(term='Sedação', created_at=timezone.now() - datetime.timedelta(minutes=30))
+    _post(client, {'term': 'sedação analgesia'})
+    with CaptureQueriesContext(connection) as ctx:
+        assert buffer.flush() == 1
+    assert len(ctx.captured_queries) <= 4  # SELECT + INSERT (+ savepoint)
+    assert sorted(SearchLog.objects.values_list('term', flat=True)) == ['Sedação', 'analgesia']
+
+
+@pytest.mark.django_db
+def test_failed_flush_forgets_dropped_terms(client, buffer, monkeypatch):
+    _post(client, {'term': 'intubação'})
+
+    def boom(*args, **kwargs):
+        raise RuntimeError('db down')
+
+    monkeypatch.setattr(SearchLog.objects, 'bulk_create', boom)
+    assert buffer.flush() == 0
+    monkeypatch.undo()
+    # Não foi gravado: o mesmo termo volta a ser aceito em vez de "recente".
+    again = _post(client, {'term': 'intubação'}).json()
+    assert again['queued'] == ['intubação'] and again['ignored']['recent'] == []
+    assert buffer.flush() == 1
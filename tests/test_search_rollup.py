@@ -0,0 +1,85 @@
+import datetime
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from questions.models import SearchLog, SearchRollupState, SearchTermDaily
+from questions.search_rollup import prune_search_log, rollup_search_terms, top_missing_terms
+
+
+def _log(term, ip='', days_ago=0):
+    return SearchLog.objects.create(term=term, ip_hash=ip, created_at=timezone.now() - datetime.timedelta(days=days_ago))
+
+
+def _daily():
+    return sorted(SearchTermDaily.objects.values_list('day', 'term_norm', 'term', 'count', 'distinct_ips'))
+
+
+@pytest.mark.django_db
+def test_rollup_aggregates_by_day_and_normalized_term():
+    today = timezone.localdate()
+    _log('Intubação', 'a')
+    _log('intubacao', 'a')
+    _log('Intubação', 'b')
+    _log('sedação', '', days_ago=3)
+    result = rollup_search_terms()
+    assert result['rows'] == 4 and len(result['days']) == 2
+    assert _daily() == [
+        (today - datetime.timedelta(days=3), 'sedacao', 'sedação', 1, 0),
+        (today, 'intubacao', 'Intubação', 3, 2),
+    ]
+
+
+@pytest.mark.django_db
+def test_rollup_is_incremental():
+    _log('intubação', 'a')
+    rollup_search_terms()
+    assert rollup_search_terms() == {'rows': 0, 'days': [], 'watermark': SearchLog.objects.get().pk}
+    _log('intubação', 'b')
+    assert rollup_search_terms()['rows'] == 1
+    assert [(r[3], r[4]) for r in _daily()] == [(2, 2)]
+
+
+@pytest.mark.django_db
+def test_prune_keeps_rollup_and_unprocessed_rows():
+    _log('antigo', 'a', days_ago=10)
+    rollup_search_terms()
+    late = _log('atrasado', 'a', days_ago=10)  # ainda não agregado
+    deleted, _ = prune_search_log(7)
+    assert deleted == 1
+    assert list(SearchLog.objects.values_list('pk', flat=True)) == [late.pk]
+    # Dia já podado: a linha atrasada é somada ao rollup existente
+    rollup_search_terms()
+    assert [r[1] for r in _daily()] == ['antigo', 'atrasado']
+    assert SearchRollupState.objects.get().pruned_before == timezone.localdate() - datetime.timedelta(days=7)
+
+
+@pytest.mark.django_db
+def test_top_missing_terms_windows():
+    _log('intubação')
+    for _ in range(3):
+        _log('sedação', days_ago=5)
+    rollup_search_terms()
+    assert [t['label'] for t in top_missing_terms(1)] == ['intubação']
+    assert [(t['label'], t['total']) for t in top_missing_terms(7)] == [('sedação', 3), ('intubação', 1)]
+
+
+@pytest.mark.django_db
+def test_command_and_report_view(client, django_user_model):
+    _log('intubação', 'a')
+    call_command('rollup_search_terms', '--prune-days', '7')
+    staff = django_user_model.objects.create_user('staff', password='x', is_staff=True)
+    client.force_login(staff)
+    resp = client.get('/inbox/search-terms/')
+    assert resp.status_code == 200
+    assert 'intubação' in resp.content.decode()
+
+
+@pytest.mark.django_db
+def test_top_missing_terms_label_is_most_common_spelling():
+    for _ in range(3):
+        _log('Intubação')
+    _log('intubacao', days_ago=1)
+    rollup_search_terms()
+    assert [(t['label'], t['total']) for t in top_missing_terms(7)] == [('Intubação', 4)]
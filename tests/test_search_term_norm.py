@@ -0,0 +1,66 @@
+import importlib
+import json
+
+import pytest
+from django.apps import apps
+from django.utils import timezone
+
+from questions.models import AskedTerm, SearchLog
+
+migration = importlib.import_module("questions.migrations.0008_searchterm_norm")
+
+
+@pytest.mark.django_db
+def test_search_log_dedups_on_normalized_term(client):
+    client.post('/api/search-log/', data=json.dumps({'term': 'Intubação'}), content_type='application/json')
+    resp = client.post('/api/search-log/', data=json.dumps({'term': 'INTUBACAO intubacao'}), content_type='application/json')
+    assert resp.json()['logged'] == []
+    assert list(SearchLog.objects.values_list('term', 'term_norm')) == [('Intubação', 'intubacao')]
+
+
+@pytest.mark.django_db
+def test_asked_terms_share_one_row_per_normalized_term(client):
+    client.post('/ask/', {'text': 'Intubação em criança?'})
+    client.post('/ask/', {'text': 'intubacao de novo, INTUBAÇÃO sempre'})
+    row = AskedTerm.objects.get(term_norm='intubacao')
+    assert (row.term, row.count) == ('Intubação', 2)
+
+
+@pytest.mark.django_db
+def test_backfill_merges_spellings_and_fills_search_log():
+    now = timezone.now()
+    early = now - timezone.timedelta(days=3)
+    AskedTerm.objects.bulk_create([
+        AskedTerm(term='Intubação', term_norm='tmp1', count=5, first_seen=now, last_seen=now),
+        AskedTerm(term='intubacao', term_norm='tmp2', count=2, first_seen=early, last_seen=early),
+        AskedTerm(term='Sedação', term_norm='tmp3', count=1, first_seen=now, last_seen=now),
+    ])
+    SearchLog.objects.bulk_create([SearchLog(term='ÁCIDO'), SearchLog(term='Acido')])
+
+    migration.backfill_askedterm(apps, None)
+    migration.backfill_searchlog(apps, None)
+
+    assert sorted(AskedTerm.objects.values_list('term_norm', 'term', 'count')) == [
+        ('intubacao', 'Intubação', 7),
+        ('sedacao', 'Sedação', 1),
+    ]
+    merged = AskedTerm.objects.get(term_norm='intubacao')
+    assert merged.first_seen == early and merged.last_seen == now
+    assert set(SearchLog.objects.values_list('term_norm', flat=True)) == {'acido'}
+
+
+@pytest.mark.django_db
+def test_backfill_merges_across_batches(monkeypatch):
+    monkeypatch.setattr(migration, 'BATCH', 2)
+    now = timezone.now()
+    AskedTerm.objects.bulk_create([
+        AskedTerm(term='intubacao', term_norm='tmp1', count=2, first_seen=now, last_seen=now),
+        AskedTerm(term='Sedação', term_norm='tmp2', count=1, first_seen=now, last_seen=now),
+        AskedTerm(term='Intubação', term_norm='tmp3', count=5, first_seen=now, last_seen=now),
+        AskedTerm(term='INTUBAÇÃO', term_norm='tmp4', count=3, first_seen=now, last_seen=now),
+    ])
+    migration.backfill_askedterm(apps, None)
+    assert sorted(AskedTerm.objects.values_list('term_norm', 'term', 'count')) == [
+        ('intubacao', 'Intubação', 10),
+        ('sedacao', 'Sedação', 1),
+    ]